@@ -0,0 +1,127 @@
+"""
+Benchmark: section-aware chunking vs. the old raw-text + parsed-lists splitter
+
+The old chunker appended the parsed skills, projects, education and
+experience lists (substrings of the text) to the raw text and split the
+result with RecursiveCharacterTextSplitter(1000, 200), so most content was
+embedded two or three times, and one 1000-character chunk mixed several
+sections. The new chunker splits at section headings, keeps each bullet
+once and packs bullets up to the embedding model's word-piece window.
+
+Reported per chunker: chunk count, embedded characters (vs. the resume
+text), chunks longer than the model window, embedding time, and retrieval
+precision on section questions. A retrieved chunk counts as relevant when
+most of its words come from the section the question is about.
+
+Usage (from SAHAY_AI/):
+    python benchmarks/bench_chunking.py --pdf ../Aarav_Sharma_resume.pdf ../Rohan_Verma_Resume.pdf
+    python benchmarks/bench_chunking.py --offline   # hashing embeddings
+"""
+
+import os
+import sys
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from bench_vector_index import load_embeddings, timed  # noqa: E402
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: E402
+
+from rag.chunker import (  # noqa: E402
+    DEFAULT_TOKEN_WINDOW, MODEL_TOKEN_WINDOWS, chunk_resume, chunk_token_budget, estimate_tokens, normalize,
+    split_sections,
+)
+from rag.ingestion import ingest_resume  # noqa: E402
+from rag.vector_store import create_vector_store  # noqa: E402
+
+QUESTIONS = [
+    ("What technical skills and tools do I know?", "skills"),
+    ("Where have I worked and what were my responsibilities?", "experience"),
+    ("What projects have I built and what did they achieve?", "projects"),
+    ("What degree did I study and at which university?", "education"),
+    ("Summarize my professional background in a sentence.", "summary"),
+    ("What is my email address and location?", "profile"),
+]
+
+
+def legacy_chunks(raw_text, resume_data):
+    """The chunking build_vector_store used before the section-aware chunker"""
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200, length_function=len)
+    all_text = raw_text + "\n\n" + "\n".join(resume_data.get("skills", []))
+    for key in ("projects", "education", "experience"):
+        if resume_data.get(key):
+            all_text += "\n\n" + "\n".join(resume_data[key])
+    return text_splitter.split_text(all_text)
+
+
+def section_of(text, section_words):
+    """The section contributing most of a chunk's words"""
+    words = normalize(text).split()
+    scores = {label: sum(word in vocab for word in words) for label, vocab in section_words.items()}
+    return max(scores, key=scores.get) if scores else None
+
+
+def precision(vector_store, section_words, k):
+    relevant = retrieved = top1 = 0
+    for question, section in QUESTIONS:
+        if section not in section_words:
+            continue
+        docs = vector_store.similarity_search(question, k=k)
+        labels = [section_of(doc.page_content, section_words) for doc in docs]
+        relevant += labels.count(section)
+        retrieved += len(labels)
+        top1 += bool(labels) and labels[0] == section
+    questions = sum(section in section_words for _, section in QUESTIONS)
+    return relevant / max(retrieved, 1), top1 / max(questions, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", nargs="+",
+                        default=[os.path.join(os.path.dirname(__file__), "..", "..", "Aarav_Sharma_resume.pdf")])
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--offline", action="store_true", help="Use hashing embeddings instead of the model")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    embeddings = load_embeddings(args.model, args.offline)
+    if hasattr(embeddings, "service"):
+        embeddings.service.cache_path = None  # time real encoding, not the chunk-embedding cache
+    budget = chunk_token_budget(getattr(embeddings, "model_name", args.model))
+    window = MODEL_TOKEN_WINDOWS.get(args.model, DEFAULT_TOKEN_WINDOW)
+    print(f"Embeddings: {getattr(embeddings, 'model_name', args.model)}; chunk budget {budget} of {window} word-pieces")
+
+    totals = Counter()
+    for path in args.pdf:
+        artifact = ingest_resume(path)
+        section_words = {}
+        for label, body in split_sections(artifact.raw_text):
+            section_words.setdefault(label, set()).update(normalize(body).split())
+
+        chunkers = [
+            ("old", legacy_chunks(artifact.raw_text, artifact.parsed_data)),
+            ("new", [chunk.text for chunk in chunk_resume(artifact.raw_text, artifact.parsed_data, budget)]),
+        ]
+        print(f"\n{os.path.basename(path)}: {len(artifact.raw_text)} chars of text")
+        print(f"{'chunker':<9}{'chunks':>8}{'embedded':>10}{'vs text':>9}{'> window':>10}{'embed':>11}"
+              f"{'P@' + str(args.k):>8}{'top-1':>8}")
+        for name, texts in chunkers:
+            embed_time, store = timed(lambda: create_vector_store(texts, embeddings), args.repeats)
+            p_at_k, top1 = precision(store, section_words, args.k)
+            chars = sum(len(t) for t in texts)
+            over = sum(estimate_tokens(t) > window for t in texts)
+            print(f"{name:<9}{len(texts):>8}{chars:>10}{chars / len(artifact.raw_text):>8.1f}x{over:>10}"
+                  f"{embed_time * 1000:>9.1f}ms{p_at_k:>8.2f}{top1:>8.2f}")
+            totals[f"{name}_chunks"] += len(texts)
+            totals[f"{name}_chars"] += chars
+
+    if len(args.pdf) > 1:
+        print(f"\nAll resumes: {totals['old_chunks']} -> {totals['new_chunks']} chunks, "
+              f"{totals['old_chars']} -> {totals['new_chars']} embedded characters")
+
+
+if __name__ == "__main__":
+    main()
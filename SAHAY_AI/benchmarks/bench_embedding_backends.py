@@ -0,0 +1,128 @@
+"""
+Benchmark: embedding throughput and latency, torch vs. ONNX Runtime (float and int8) on CPU
+
+For each backend the script reports model load time (including the one-off
+ONNX export/quantization when the export is not cached yet), single-query
+latency (p50/p95, what a chat question pays) and batch throughput over
+resume-sized chunks at a few batch sizes, plus how closely each backend's
+vectors agree with torch (mean cosine similarity).
+
+Usage (from SAHAY_AI/):
+    python benchmarks/bench_embedding_backends.py --threads 4
+    python benchmarks/bench_embedding_backends.py --model /path/to/local/sentence-transformer --texts 2000
+
+Needs sentence-transformers, onnxruntime and onnx (for the export). Exports
+go to a temporary directory unless --onnx-dir is given, so the first run of
+each ONNX backend includes the export.
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from rag.embedding_service import BACKENDS, EmbeddingService  # noqa: E402
+
+CHUNK_TEMPLATES = [
+    "Skills: Python; SQL; Machine Learning; Data Analysis; {i} years of Excel and Tableau",
+    "Experience: Software Engineer at Company {i} | 2019 - Present; Built REST APIs in Django; "
+    "Led migration of {i} services to Kubernetes; Mentored junior developers",
+    "Projects: Resume parser {i} extracting sections with regular expressions and PyMuPDF; "
+    "Career chatbot answering questions with retrieval augmented generation",
+    "Education: Bachelor of Technology in Computer Science, University {i} | 2015 - 2019",
+]
+QUERIES = [
+    "What programming languages do I know?",
+    "Which projects involve data analysis?",
+    "What is my education background?",
+    "How many years of experience do I have?",
+]
+
+
+def corpus(n):
+    return [CHUNK_TEMPLATES[i % len(CHUNK_TEMPLATES)].format(i=i) for i in range(n)]
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--texts", type=int, default=512, help="Chunks embedded per throughput run")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--queries", type=int, default=50, help="Single-query latency samples")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads for torch and ONNX Runtime (0 = default)")
+    parser.add_argument("--onnx-dir", help="Reuse ONNX exports from this directory")
+    args = parser.parse_args()
+
+    onnx_dir = args.onnx_dir or tempfile.mkdtemp(prefix="bench_onnx_")
+    os.environ["ONNX_MODEL_DIR"] = onnx_dir
+    import rag.onnx_embeddings as onnx_embeddings
+    onnx_embeddings.DEFAULT_ONNX_DIR = onnx_dir
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    texts = corpus(args.texts)
+    results, reference = [], None
+    try:
+        for backend in args.backends:
+            service = EmbeddingService(args.model, cache_path=None, backend=backend)
+            start = time.perf_counter()
+            model = service.model
+            if args.threads and backend != "torch":
+                model = service._model = onnx_embeddings.OnnxSentenceEncoder(
+                    model.path, quantized=model.quantized, num_threads=args.threads)
+            load_time = time.perf_counter() - start
+            service.encode(texts[:8])  # warm-up: allocate buffers, first-run kernel selection
+
+            latencies = []
+            for i in range(args.queries):
+                start = time.perf_counter()
+                service.embed_query(QUERIES[i % len(QUERIES)])
+                latencies.append(time.perf_counter() - start)
+
+            throughput = {}
+            for batch_size in args.batch_sizes:
+                service.batch_size = batch_size
+                start = time.perf_counter()
+                vectors = service.encode(texts)
+                throughput[batch_size] = len(texts) / (time.perf_counter() - start)
+
+            if reference is None:
+                reference = vectors
+            agreement = float(np.mean(np.sum(vectors * reference, axis=1) /
+                                      (np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference, axis=1))))
+            results.append((backend, load_time, latencies, throughput, agreement))
+    finally:
+        if not args.onnx_dir:
+            shutil.rmtree(onnx_dir, ignore_errors=True)
+
+    print(f"Model: {args.model}; {args.texts} chunks; threads: {args.threads or 'default'}")
+    header = f"{'backend':<11}{'load':>9}{'query p50':>11}{'query p95':>11}"
+    header += "".join(f"{'bs=' + str(b) + ' /s':>11}" for b in args.batch_sizes)
+    print(header + f"{'cos vs ' + args.backends[0]:>16}")
+    for backend, load_time, latencies, throughput, agreement in results:
+        row = f"{backend:<11}{load_time:>8.1f}s{percentile(latencies, 50):>9.1f}ms{percentile(latencies, 95):>9.1f}ms"
+        row += "".join(f"{throughput[b]:>11.0f}" for b in args.batch_sizes)
+        print(row + f"{agreement:>16.4f}")
+    if len(results) > 1:
+        base = results[0]
+        for backend, _, latencies, throughput, _ in results[1:]:
+            speedups = ", ".join(f"bs={b} {throughput[b] / base[3][b]:.2f}x" for b in args.batch_sizes)
+            print(f"{backend} vs {base[0]}: query {statistics.median(base[2]) / statistics.median(latencies):.2f}x, "
+                  f"throughput {speedups}")
+
+
+if __name__ == "__main__":
+    main()
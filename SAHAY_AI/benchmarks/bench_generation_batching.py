@@ -0,0 +1,100 @@
+"""
+Benchmark: concurrent answer generation, one call at a time vs. micro-batched
+
+C client threads (concurrent chat / skills-gap requests) each generate R
+answers. "direct" calls the text-generation pipeline from every thread, as
+the chains did before; "batched" puts BatchingGenerator in front of it with
+each --wait-ms value. Reported per concurrency level: answers and new tokens
+per second, per-answer latency (p50/p95) and the mean batch size reached.
+
+Usage (from SAHAY_AI/):
+    python benchmarks/bench_generation_batching.py
+    python benchmarks/bench_generation_batching.py --model /path/to/local/gpt2 --backend int8 --concurrency 1 4 16
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from rag.batching import BatchingGenerator  # noqa: E402
+from rag.llm_backends import DEFAULT_LLM, DEFAULT_LLM_BACKEND, GENERATION_KWARGS, LLM_BACKENDS  # noqa: E402
+
+PROMPTS = [
+    "Skills: Python; SQL; Django\n\nQuestion: Which of my skills fit a data analyst role?\nHelpful Answer:",
+    "Experience: Software Engineer at Company 3 | 2019 - Present; Built REST APIs in Django; Led migration "
+    "of services to Kubernetes\n\nQuestion: How can I move into a senior role?\nHelpful Answer:",
+    "Education: Bachelor of Technology in Computer Science\n\nQuestion: Should I do a master's degree?\n"
+    "Helpful Answer:",
+    "Projects: Resume parser extracting sections with regular expressions\n\nQuestion: What should I build "
+    "next?\nHelpful Answer:",
+]
+
+
+def run(generator, concurrency, requests, new_tokens):
+    """Wall time and per-answer latencies for `concurrency` threads each generating `requests` answers"""
+    latencies, lock = [], threading.Lock()
+    kwargs = {"max_new_tokens": new_tokens, "min_new_tokens": new_tokens, "do_sample": False}
+
+    def client(index):
+        for i in range(requests):
+            start = time.perf_counter()
+            generator(PROMPTS[(index + i) % len(PROMPTS)], **kwargs)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_LLM)
+    parser.add_argument("--backend", default=DEFAULT_LLM_BACKEND, choices=LLM_BACKENDS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=3, help="Answers per client thread")
+    parser.add_argument("--new-tokens", type=int, default=24)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, nargs="+", default=[5, 20])
+    parser.add_argument("--threads", type=int, default=0, help="torch CPU threads (0 = default)")
+    args = parser.parse_args()
+
+    from rag.llm_backends import load_generation_pipeline
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    pipeline, info = load_generation_pipeline(args.model, args.backend, max_batch_size=1, **GENERATION_KWARGS)
+    modes = [("direct", lambda: pipeline)]
+    modes += [(f"batched {wait:g}ms", lambda wait=wait: BatchingGenerator(pipeline, args.max_batch, wait))
+              for wait in args.wait_ms]
+    run(pipeline, 1, 1, 2)  # warm-up
+
+    print(f"Model: {args.model} ({info['optimization']}); {args.requests} answers per client, "
+          f"{args.new_tokens} new tokens, max batch {args.max_batch}")
+    print(f"{'clients':>7}  {'mode':<14}{'answers/s':>10}{'tokens/s':>10}{'p50':>9}{'p95':>9}{'batch':>7}")
+    for concurrency in args.concurrency:
+        base = None
+        for name, make in modes:
+            generator = make()
+            wall, latencies = run(generator, concurrency, args.requests, args.new_tokens)
+            answers = concurrency * args.requests
+            batch = generator.stats()["mean_batch_size"] if isinstance(generator, BatchingGenerator) else 1.0
+            base = base or answers / wall
+            print(f"{concurrency:>7}  {name:<14}{answers / wall:>10.2f}{answers * args.new_tokens / wall:>10.1f}"
+                  f"{np.percentile(latencies, 50) * 1000:>7.0f}ms{np.percentile(latencies, 95) * 1000:>7.0f}ms"
+                  f"{batch:>7.1f}   {answers / wall / base:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: N worker processes with their own models vs. one shared inference server
+
+Simulates N Django workers, each embedding queries and generating answers
+at the same time. In-process, every worker loads MiniLM and DialoGPT; with
+the server they send the calls to one process over a Unix socket. Reported
+per mode: total memory (PSS, so shared library pages are not counted once
+per process), workers' and server's share of it, and median embed and
+generate latency.
+
+Usage (from SAHAY_AI/):
+    python benchmarks/bench_inference_server.py --workers 4
+    python benchmarks/bench_inference_server.py --embedding-model /path/to/st --llm /path/to/gpt2 --llm-backend int8
+
+Linux only (PSS comes from /proc/<pid>/smaps_rollup).
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from rag.embedding_service import DEFAULT_MODEL  # noqa: E402
+from rag.llm_backends import DEFAULT_LLM, DEFAULT_LLM_BACKEND, GENERATION_KWARGS  # noqa: E402
+
+QUERIES = [
+    "What programming languages do I know?",
+    "Which projects involve data analysis?",
+    "What is my education background?",
+]
+PROMPT = "Skills: Python; SQL; Django\n\nQuestion: Which of my skills fit a data analyst role?\nHelpful Answer:"
+
+
+def pss_mb(pid="self"):
+    with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def worker(args):
+    """One simulated Django worker: load (or connect), embed and generate, print timings as JSON"""
+    from rag.embedding_service import EmbeddingService
+    from rag.inference_client import RemoteGenerationPipeline, get_inference_client
+    from rag.llm_backends import load_generation_pipeline
+
+    client = get_inference_client(args.url) if args.url else None
+    embeddings = EmbeddingService(args.embedding_model, cache_path=None, use_server=False)
+    embeddings.remote = client
+
+    def load_local():
+        return load_generation_pipeline(args.llm, args.llm_backend, **GENERATION_KWARGS)[0]
+
+    generator = (RemoteGenerationPipeline(client, args.llm, args.llm_backend, GENERATION_KWARGS, load_local)
+                 if client else load_local())
+
+    embed, generate = [], []
+    for i in range(args.calls):
+        start = time.perf_counter()
+        embeddings.embed_query(f"{QUERIES[i % len(QUERIES)]} ({os.getpid()} {i})")
+        embed.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        generator(PROMPT, max_new_tokens=args.new_tokens, do_sample=False)
+        generate.append(time.perf_counter() - start)
+    print(json.dumps({"pss": pss_mb(), "embed": embed[1:], "generate": generate[1:]}))
+
+
+def run_mode(args, url):
+    """Start the server (when `url` is given) and the workers together; collect their reports"""
+    server = None
+    if url:
+        server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), "..", "src", "rag",
+                                                                 "inference_server.py"), "--url", url],
+                                  stderr=subprocess.DEVNULL)
+        from rag.inference_client import InferenceClient
+        client = InferenceClient(url)
+        while not client.is_available():
+            client._down_until = 0
+            time.sleep(0.5)
+        # Load the server's models before timing, as --preload would
+        client.embed(["warm-up"], args.embedding_model, "torch")
+        client.generate(PROMPT, args.llm, args.llm_backend, GENERATION_KWARGS, max_new_tokens=1)
+
+    command = [sys.executable, os.path.abspath(__file__), "--worker", "--embedding-model", args.embedding_model,
+               "--llm", args.llm, "--llm-backend", args.llm_backend, "--calls", str(args.calls),
+               "--new-tokens", str(args.new_tokens), "--url", url or ""]
+    env = {**os.environ, "INFERENCE_SERVER_URL": ""}
+    workers = [subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, env=env)
+               for _ in range(args.workers)]
+    reports = [json.loads(w.communicate()[0].strip().splitlines()[-1]) for w in workers]
+    server_pss = 0.0
+    if server:
+        server_pss = pss_mb(server.pid)
+        server.terminate()
+        server.wait()
+    return {
+        "workers_pss": sum(r["pss"] for r in reports),
+        "server_pss": server_pss,
+        "embed": statistics.median(t for r in reports for t in r["embed"]),
+        "generate": statistics.median(t for r in reports for t in r["generate"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--calls", type=int, default=6, help="Embed + generate calls per worker")
+    parser.add_argument("--new-tokens", type=int, default=16)
+    parser.add_argument("--embedding-model", default=DEFAULT_MODEL)
+    parser.add_argument("--llm", default=DEFAULT_LLM)
+    parser.add_argument("--llm-backend", default=DEFAULT_LLM_BACKEND)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(args)
+
+    url = f"unix://{os.path.join(tempfile.gettempdir(), f'bench_inference_{os.getpid()}.sock')}"
+    results = [("in-process", run_mode(args, None)), ("server", run_mode(args, url))]
+
+    print(f"{args.workers} workers x {args.calls} calls; embeddings {args.embedding_model}, "
+          f"LLM {args.llm} ({args.llm_backend}), {args.new_tokens} new tokens")
+    print(f"{'mode':<12}{'total PSS':>11}{'workers':>11}{'server':>10}{'embed p50':>11}{'generate p50':>14}")
+    for name, r in results:
+        print(f"{name:<12}{r['workers_pss'] + r['server_pss']:>9.0f}MB{r['workers_pss']:>9.0f}MB"
+              f"{r['server_pss']:>8.0f}MB{r['embed'] * 1000:>9.1f}ms{r['generate'] * 1000:>12.0f}ms")
+    local, shared = results[0][1], results[1][1]
+    print(f"Memory with the server: {(shared['workers_pss'] + shared['server_pss']) / local['workers_pss']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
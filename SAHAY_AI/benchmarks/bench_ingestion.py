@@ -0,0 +1,105 @@
+"""
+Benchmark: resume upload processing with one ingestion artifact vs. the old repeated parsing
+
+Before, processing an upload extracted and parsed the PDF in
+RAGService.initialize_rag, read the file again to hash it, and on an index
+miss build_vector_store extracted and parsed it a second time; when RAG
+failed, the fallback parsed it once more. Now ingest_resume reads, hashes,
+extracts and parses once and the artifact is passed along. The script times
+three cases per path (embedding runs in both index-miss cases; vector index
+loading and LLM start-up are excluded):
+
+    index miss   new resume: parse, chunk and embed
+    index hit    resume already indexed: only parsing is left
+    fallback     RAG unavailable: parse for the basic analysis
+
+Usage (from SAHAY_AI/):
+    python benchmarks/bench_ingestion.py --pdf ../Aarav_Sharma_resume.pdf --repeats 5
+    python benchmarks/bench_ingestion.py --offline   # hashing embeddings, parsing cost only
+"""
+
+import os
+import sys
+import hashlib
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from bench_vector_index import load_embeddings, timed  # noqa: E402
+
+from rag.chunker import chunk_resume  # noqa: E402
+from rag.ingestion import ingest_resume  # noqa: E402
+from rag.retriever import build_vector_store  # noqa: E402
+from rag.vector_store import create_vector_store  # noqa: E402
+from utils.pdf_parser import extract_text_from_pdf  # noqa: E402
+from utils.resume_parser import parse_resume  # noqa: E402
+
+
+def parse_pdf(path):
+    raw_text = extract_text_from_pdf(path)
+    return raw_text, parse_resume(raw_text)
+
+
+def hash_file(path):
+    with open(path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def old_index_miss(path, embeddings):
+    parse_pdf(path)                               # initialize_rag
+    hash_file(path)                               # _get_resume_hash
+    raw_text, resume_data = parse_pdf(path)       # build_vector_store
+    return create_vector_store([chunk.text for chunk in chunk_resume(raw_text, resume_data)], embeddings)
+
+
+def old_index_hit(path):
+    parse_pdf(path)
+    return hash_file(path)
+
+
+def old_fallback(path):
+    parse_pdf(path)                               # initialize_rag, before it failed
+    return parse_pdf(path)                        # process_resume_job fallback
+
+
+def new_index_miss(path, embeddings):
+    artifact = ingest_resume(path)
+    return build_vector_store(path, embeddings, artifact=artifact)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", default=os.path.join(os.path.dirname(__file__), "..", "..", "Aarav_Sharma_resume.pdf"))
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--offline", action="store_true", help="Use hashing embeddings instead of the model")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    embeddings = load_embeddings(args.model, args.offline)
+    if hasattr(embeddings, "service"):
+        embeddings.service.cache_path = None  # every run embeds, as for a never-seen resume
+
+    # Warm the OS page cache and lazy imports so the first case is not penalised
+    new_index_miss(args.pdf, embeddings)
+
+    cases = [
+        ("index miss", lambda: old_index_miss(args.pdf, embeddings), lambda: new_index_miss(args.pdf, embeddings)),
+        ("index hit", lambda: old_index_hit(args.pdf), lambda: ingest_resume(args.pdf)),
+        ("fallback", lambda: old_fallback(args.pdf), lambda: ingest_resume(args.pdf)),
+    ]
+
+    artifact = ingest_resume(args.pdf)
+    same = old_fallback(args.pdf)[1] == artifact.parsed_data
+    print(f"Embeddings: {getattr(embeddings, 'model_name', args.model)}; PDF: {os.path.getsize(args.pdf) / 1024:.0f} KB, "
+          f"{len(artifact.raw_text)} chars, {len(artifact.chunks)} chunks")
+    print(f"{'case':<14}{'before':>12}{'after':>12}{'saved':>12}")
+    for name, old, new in cases:
+        old_time, _ = timed(old, args.repeats)
+        new_time, _ = timed(new, args.repeats)
+        print(f"{name:<14}{old_time * 1000:>10.1f}ms{new_time * 1000:>10.1f}ms{(1 - new_time / old_time) * 100:>11.0f}%")
+    print(f"Ingestion breakdown: " + ", ".join(f"{k} {v:.1f} ms" for k, v in artifact.summary()["timings_ms"].items()))
+    print(f"Artifact parses the same resume data: {same}")
+
+
+if __name__ == "__main__":
+    main()
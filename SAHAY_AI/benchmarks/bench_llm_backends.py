@@ -0,0 +1,163 @@
+"""
+Benchmark: answer generation on CPU, float32 torch vs. int8 vs. ONNX Runtime
+
+Each backend is first loaded in one subprocess (which includes the one-off
+int8 quantization / ONNX export when --cache-dir is empty) and then measured
+in a fresh one, so resident memory covers only what serving that backend
+holds. Reported per backend: first load, load from the cached artifact, RSS
+once warmed up and peak RSS while generating, prompt-to-first-token latency,
+decode throughput in new tokens per second, and how many greedy tokens match
+the first backend's.
+
+Usage (from SAHAY_AI/):
+    python benchmarks/bench_llm_backends.py
+    python benchmarks/bench_llm_backends.py --model /path/to/local/gpt2 --new-tokens 64 --threads 4
+
+The onnx backend needs optimum[onnxruntime]; without it the script reports
+the int8 fallback that LLM_BACKEND=onnx would use. Converted models go to a
+temporary directory unless --cache-dir is given.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from rag.llm_backends import DEFAULT_LLM, LLM_BACKENDS  # noqa: E402
+
+PROMPTS = [
+    "Use the following pieces of context to answer the question.\n\nSkills: Python; SQL; Django; "
+    "Machine Learning\n\nQuestion: Which of my skills fit a data analyst role?\nHelpful Answer:",
+    "Use the following pieces of context to answer the question.\n\nExperience: Software Engineer at "
+    "Company 3 | 2019 - Present; Built REST APIs in Django\n\nQuestion: How can I move into a senior role?"
+    "\nHelpful Answer:",
+    "Use the following pieces of context to answer the question.\n\nEducation: Bachelor of Technology in "
+    "Computer Science\n\nQuestion: Should I do a master's degree?\nHelpful Answer:",
+]
+
+
+def rss_mb(field="VmRSS"):
+    """Resident set size of this process (VmHWM: the peak so far)"""
+    with open("/proc/self/status", "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def worker(args):
+    """Load one backend, generate, and print the measurements as JSON"""
+    import torch
+    import transformers  # noqa: F401  (library import time is not part of the load)
+    from rag.llm_backends import load_causal_lm
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    base_rss = rss_mb()
+
+    start = time.perf_counter()
+    model, tokenizer, backend = load_causal_lm(args.model, args.backend, args.cache_dir)
+    load_time = time.perf_counter() - start
+    if args.worker == "prepare":
+        print(json.dumps({"first_load": load_time}))
+        return
+
+    def generate(prompt, new_tokens):
+        inputs = tokenizer(prompt, return_tensors="pt")
+        with torch.no_grad():
+            output = model.generate(**inputs, max_new_tokens=new_tokens, min_new_tokens=new_tokens,
+                                    do_sample=False, pad_token_id=tokenizer.eos_token_id)
+        return output[0, inputs["input_ids"].shape[1]:].tolist()
+
+    generate(PROMPTS[0], 4)  # warm-up: kernel selection, first-run allocations
+    # After the warm-up every weight has been touched (mmap-ed float32 checkpoints are paged in lazily)
+    ready_rss = rss_mb()
+    first_token, decode, tokens = [], [], []
+    for i in range(args.repeats):
+        prompt = PROMPTS[i % len(PROMPTS)]
+        start = time.perf_counter()
+        generate(prompt, 1)
+        first_token.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        tokens.append(generate(prompt, args.new_tokens))
+        decode.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        "backend": backend,
+        "cached_load": load_time,
+        "ready_rss": ready_rss - base_rss,
+        "peak_rss": rss_mb("VmHWM") - base_rss,
+        "first_token": sorted(first_token)[len(first_token) // 2],
+        "tokens_per_second": args.new_tokens * len(decode) / sum(decode),
+        "tokens": tokens,
+    }))
+
+
+def run_worker(args, mode, backend, cache_dir):
+    command = [sys.executable, os.path.abspath(__file__), "--worker", mode, "--backend", backend,
+               "--model", args.model, "--cache-dir", cache_dir, "--new-tokens", str(args.new_tokens),
+               "--repeats", str(args.repeats), "--threads", str(args.threads)]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"{backend} failed:\n{result.stderr[-2000:]}")
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_backend(args, backend, cache_dir):
+    prepared = run_worker(args, "prepare", backend, cache_dir)
+    measured = prepared and run_worker(args, "measure", backend, cache_dir)
+    return measured and {**prepared, **measured}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_LLM)
+    parser.add_argument("--backends", nargs="+", default=list(LLM_BACKENDS), choices=LLM_BACKENDS)
+    parser.add_argument("--new-tokens", type=int, default=32, help="Tokens generated per answer")
+    parser.add_argument("--repeats", type=int, default=6, help="Answers generated per backend")
+    parser.add_argument("--threads", type=int, default=0, help="torch CPU threads (0 = default)")
+    parser.add_argument("--cache-dir", help="Reuse converted models from this directory")
+    parser.add_argument("--worker", choices=("prepare", "measure"), help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(args)
+
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="bench_llm_")
+    try:
+        results = [(name, run_backend(args, name, cache_dir)) for name in args.backends]
+    finally:
+        if not args.cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    results = [(name, result) for name, result in results if result]
+    if not results:
+        return
+
+    print(f"Model: {args.model}; {args.new_tokens} new tokens x {args.repeats} answers, greedy; "
+          f"threads: {args.threads or 'default'}")
+    print(f"{'backend':<15}{'1st load':>10}{'cached':>9}{'RSS ready':>11}{'RSS peak':>11}"
+          f"{'1st token':>11}{'tok/s':>8}{'same tokens':>13}")
+    reference = results[0][1]["tokens"]
+    for name, r in results:
+        label = name if r["backend"] == name else f"{name}->{r['backend']}"
+        same = sum(a == b for ours, ref in zip(r["tokens"], reference) for a, b in zip(ours, ref))
+        total = sum(len(ref) for ref in reference)
+        print(f"{label:<15}{r['first_load']:>9.1f}s{r['cached_load']:>8.1f}s{r['ready_rss']:>9.0f}MB"
+              f"{r['peak_rss']:>9.0f}MB{r['first_token'] * 1000:>9.0f}ms{r['tokens_per_second']:>8.1f}"
+              f"{same / max(total, 1) * 100:>12.0f}%")
+    base_name, base = results[0]
+    for name, r in results[1:]:
+        print(f"{name} vs {base_name}: {r['tokens_per_second'] / base['tokens_per_second']:.2f}x tokens/s, "
+              f"{r['ready_rss'] / max(base['ready_rss'], 1):.2f}x memory once warmed up")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: loading a persisted FAISS index vs. rebuilding it from the resume
+
+Rebuilding means extracting the PDF text, parsing, chunking and embedding
+every chunk (what every new CareerRAGPipeline did before). Loading reads
+the saved index (memory-mapped or fully read) plus its chunk texts. Both
+paths use an already-loaded embedding model, so model start-up is excluded.
+The script also checks that a loaded index answers queries exactly like a
+freshly built one.
+
+Usage (from SAHAY_AI/):
+    python benchmarks/bench_vector_index.py --pdf ../Aarav_Sharma_resume.pdf --repeats 5
+    python benchmarks/bench_vector_index.py --extra-chunks 20000   # larger index
+
+Without network access to download the sentence-transformers model, a
+hashing embedder is used; rebuild timings then exclude real model inference
+and understate the saving.
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from langchain.embeddings.base import Embeddings  # noqa: E402
+
+from rag.index_cache import VectorIndexCache  # noqa: E402
+from rag.retriever import build_vector_store  # noqa: E402
+from rag.vector_store import HuggingFaceEmbeddings  # noqa: E402
+
+QUERIES = [
+    "What programming languages do I know?",
+    "Which projects involve data analysis?",
+    "What is my education background?",
+]
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic offline stand-in: hashed bag of words, L2-normalised."""
+
+    model_name = "hashing-384"
+
+    def _embed(self, text):
+        vector = np.zeros(384, dtype=np.float32)
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 384] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def load_embeddings(model_name: str, offline: bool):
+    if not offline:
+        try:
+            embeddings = HuggingFaceEmbeddings(model_name)
+            embeddings.model  # the shared service loads lazily; fail here rather than mid-benchmark
+            return embeddings
+        except Exception as e:
+            print(f"Could not load {model_name} ({type(e).__name__}); using hashing embeddings")
+    return HashingEmbeddings()
+
+
+def timed(fn, repeats: int):
+    times, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def top_chunks(vector_store, k=3):
+    return [[doc.page_content for doc in vector_store.similarity_search(q, k=k)] for q in QUERIES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", default=os.path.join(os.path.dirname(__file__), "..", "..", "Aarav_Sharma_resume.pdf"))
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--offline", action="store_true", help="Use hashing embeddings instead of the model")
+    parser.add_argument("--extra-chunks", type=int, default=0,
+                        help="Add synthetic chunks to measure how load time scales with index size")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    embeddings = load_embeddings(args.model, args.offline)
+    if hasattr(embeddings, "service"):
+        embeddings.service.cache_path = None  # time real encoding, not the chunk-embedding cache
+    model_name = getattr(embeddings, "model_name", args.model)
+    root = tempfile.mkdtemp(prefix="bench_vector_index_")
+    cache = VectorIndexCache(root, mmap=True)
+    plain_cache = VectorIndexCache(root, mmap=False)
+
+    try:
+        def rebuild():
+            store = build_vector_store(args.pdf, embeddings)
+            if args.extra_chunks:
+                texts = [f"synthetic chunk {i} about skill {i % 97} and project {i % 31}" for i in range(args.extra_chunks)]
+                store.add_texts(texts)
+            return store
+
+        rebuild_time, built = timed(rebuild, args.repeats)
+        cache.save("bench", built, model_name)
+        index_bytes = os.path.getsize(os.path.join(root, "bench", "index.faiss"))
+
+        mmap_time, loaded = timed(lambda: cache.load("bench", embeddings, model_name), args.repeats)
+        read_time, _ = timed(lambda: plain_cache.load("bench", embeddings, model_name), args.repeats)
+
+        same = top_chunks(built) == top_chunks(loaded)
+        query_built, _ = timed(lambda: top_chunks(built), args.repeats)
+        query_loaded, _ = timed(lambda: top_chunks(loaded), args.repeats)
+
+        print(f"Embeddings: {model_name}; vectors: {built.index.ntotal}; index file: {index_bytes / 1024:.0f} KB")
+        print(f"{'rebuild (extract+chunk+embed)':<32}{rebuild_time * 1000:>10.1f} ms")
+        print(f"{'load (mmap)':<32}{mmap_time * 1000:>10.1f} ms   {rebuild_time / mmap_time:>6.1f}x faster")
+        print(f"{'load (read into memory)':<32}{read_time * 1000:>10.1f} ms   {rebuild_time / read_time:>6.1f}x faster")
+        print(f"{'3 queries, built index':<32}{query_built * 1000:>10.1f} ms")
+        print(f"{'3 queries, loaded index':<32}{query_loaded * 1000:>10.1f} ms")
+        print(f"Loaded index returns the same chunks: {same}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,41 @@
+import os
+import sys
+import logging
+
 from django.apps import AppConfig
 
+WARMUP_MODES = ('off', 'background', 'blocking')
+
+
+def _is_serving() -> bool:
+    """True in a process that will serve requests (not migrate, shell, ... or the autoreloader parent)"""
+    if not os.path.basename(sys.argv[0]).startswith('manage.py'):
+        return True  # gunicorn, uwsgi, or another WSGI/ASGI server
+    if len(sys.argv) < 2 or sys.argv[1] != 'runserver':
+        return False
+    return '--noreload' in sys.argv or os.environ.get('RUN_MAIN') == 'true'
+
 
 class CareerAdvisorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "career_advisor"
+
+    def ready(self):
+        from django.conf import settings
+
+        if not _is_serving():
+            return
+
+        # Resume jobs left queued or running by a previous process are picked up right away
+        from .jobs import job_queue
+        job_queue.start()
+
+        mode = settings.RAG_WARMUP
+        if mode not in WARMUP_MODES:
+            logging.warning(f"Unknown RAG_WARMUP {mode!r}; expected one of {', '.join(WARMUP_MODES)}")
+            return
+        if mode == 'off':
+            return
+
+        from .rag_service import rag_service
+        rag_service.start_warm_up(background=mode == 'background')
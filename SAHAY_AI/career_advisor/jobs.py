@@ -0,0 +1,48 @@
+import os
+import sys
+import logging
+from typing import Dict
+
+from django.conf import settings
+
+from .rag_service import rag_service
+
+# Add src to path for our existing modules, and the repository root for the modules shared with career_api
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from career_common.job_queue import JobQueue, JobContext
+from rag.ingestion import ingest_resume
+
+
+def process_resume_job(ctx: JobContext) -> Dict:
+    """Parse an uploaded resume and build its RAG index in the background"""
+    file_path = ctx.payload['file_path']
+
+    # Extract and parse the PDF once; the RAG pipeline and the fallback share the result
+    ctx.report('parsing', 0.1)
+    artifact = ingest_resume(file_path)
+    if not artifact.raw_text:
+        raise ValueError('Could not extract text from the uploaded PDF')
+
+    # Initialize RAG pipeline (builds or loads the vector index)
+    ctx.report('building_ai_index', 0.3)
+    # Index builds report no progress and can outlast the lease; keep it renewed so no other worker re-runs the job
+    with ctx.heartbeat():
+        rag_initialized = rag_service.initialize_rag(file_path, artifact=artifact)
+    if rag_initialized:
+        logging.info(f"RAG pipeline initialized for job {ctx.job_id}")
+    else:
+        logging.warning(f"RAG pipeline failed for job {ctx.job_id}, using basic parsing")
+
+    return {
+        'resume_data': artifact.parsed_data,
+        'resume_file': file_path,
+        'ingestion': artifact.summary(),
+        'rag_initialized': rag_initialized,
+    }
+
+
+# Global job queue; worker threads are started by CareerAdvisorConfig.ready() in serving processes
+job_queue = JobQueue(str(settings.JOB_QUEUE_DB), workers=settings.JOB_QUEUE_WORKERS)
+job_queue.register('process_resume', process_resume_job)
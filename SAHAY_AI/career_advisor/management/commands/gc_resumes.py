@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from career_advisor.storage import collect_resume_garbage
+
+
+class Command(BaseCommand):
+    help = 'Delete stored resumes that no session or queued job references after the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=float,
+                            help='Keep unreferenced resumes this long (default: RESUME_RETENTION_SECONDS)')
+
+    def handle(self, *args, **options):
+        retention = options['retention_days']
+        stats = collect_resume_garbage(None if retention is None else int(retention * 86400))
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {stats['blobs']} resumes: deleted {stats['deleted']} "
+            f"({stats['freed_bytes'] / 1024:.0f} KB), dropped {stats['dropped_references']} stale references"
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from career_advisor.rag_service import RAG_AVAILABLE
+
+
+class Command(BaseCommand):
+    help = ('Run the local inference server that owns the LLM and embedding model for all Django workers '
+            '(point them at it with INFERENCE_SERVER_URL)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='http://127.0.0.1:8765 or unix:///path/to.sock (default: INFERENCE_SERVER_URL)')
+        parser.add_argument('--preload', action='store_true', help='Load the default models before serving')
+
+    def handle(self, *args, **options):
+        if not RAG_AVAILABLE:
+            raise CommandError('RAG components are not available')
+        from rag.inference_server import DEFAULT_INFERENCE_URL, serve
+
+        url = options['url'] or DEFAULT_INFERENCE_URL
+        if not url:
+            raise CommandError('Give --url or set INFERENCE_SERVER_URL')
+        serve(url, preload=options['preload'])
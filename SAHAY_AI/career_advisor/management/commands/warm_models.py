@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from career_advisor.rag_service import rag_service
+
+
+class Command(BaseCommand):
+    help = ('Load the LLM and embedding model once and run a dummy inference, e.g. in a deploy step so '
+            'downloads and int8 / ONNX conversions are cached before the server starts')
+
+    def handle(self, *args, **options):
+        result = rag_service.warm_up()
+        if result['status'] != 'ready':
+            raise CommandError(f"Warm-up failed after {result['seconds']}s: {result.get('error')}")
+        timings = ', '.join(f"{name} {seconds}s" for name, seconds in result['timings'].items())
+        self.stdout.write(self.style.SUCCESS(f"Models ready in {result['seconds']}s ({timings})"))
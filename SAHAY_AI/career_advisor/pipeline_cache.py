@@ -0,0 +1,132 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Chain, LLM wrapper and retriever objects around the index and memory
+PIPELINE_OVERHEAD_BYTES = 64 * 1024
+
+
+def estimate_pipeline_bytes(pipeline) -> int:
+    """Approximate memory held by one CareerRAGPipeline: vectors, chunk texts and chat history"""
+    size = PIPELINE_OVERHEAD_BYTES
+    vector_store = getattr(getattr(pipeline, 'retriever', None), 'vectorstore', None)
+    if vector_store is not None:
+        index = getattr(vector_store, 'index', None)
+        if index is not None:
+            size += index.ntotal * index.d * 4
+        docs = getattr(getattr(vector_store, 'docstore', None), '_dict', {})
+        size += sum(len(doc.page_content) for doc in docs.values())
+    memory = getattr(getattr(pipeline, 'memory', None), 'chat_memory', None)
+    if memory is not None:
+        size += sum(len(str(message.content)) for message in memory.messages)
+    return size
+
+
+class PipelineCache:
+    """
+    LRU cache of RAG pipelines bounded by entry count and an approximate
+    byte budget. Sizes are re-estimated on every hit because conversation
+    memory grows while a pipeline is in use. Evicted pipelines are handed to
+    ``on_evict`` (e.g. to spill their index to disk) before being dropped.
+    """
+
+    def __init__(self, max_entries: int = 8, max_bytes: int = 256 * 1024 * 1024,
+                 on_evict: Optional[Callable[[str, Any], bool]] = None,
+                 sizeof: Callable[[Any], int] = estimate_pipeline_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.sizeof = sizeof
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _resize(self, key: str, size: int):
+        self._bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def get(self, key: str):
+        with self._lock:
+            pipeline = self._entries.get(key)
+            if pipeline is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        size = self.sizeof(pipeline)
+        with self._lock:
+            if key in self._entries:
+                self._resize(key, size)
+            evicted = self._evict_over_budget(keep=key)
+        self._spill(evicted)
+        return pipeline
+
+    def put(self, key: str, pipeline):
+        size = self.sizeof(pipeline)
+        with self._lock:
+            self._entries[key] = pipeline
+            self._entries.move_to_end(key)
+            self._resize(key, size)
+            evicted = self._evict_over_budget(keep=key)
+        self._spill(evicted)
+
+    def _evict_over_budget(self, keep: str):
+        """Pop least recently used entries until within budget (never the one just used)."""
+        evicted = []
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, pipeline = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self._bytes -= self._sizes.pop(key, 0)
+            self.evictions += 1
+            evicted.append((key, pipeline))
+        return evicted
+
+    def _spill(self, evicted):
+        # Outside the lock: spilling writes to disk
+        for key, pipeline in evicted:
+            logging.info(f"Evicted RAG pipeline {key} from memory")
+            if self.on_evict is None:
+                continue
+            try:
+                if self.on_evict(key, pipeline):
+                    with self._lock:
+                        self.spills += 1
+            except Exception as e:
+                logging.warning(f"Could not spill evicted pipeline {key}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'megabytes': round(self._bytes / (1024 * 1024), 1),
+                'max_megabytes': round(self.max_bytes / (1024 * 1024), 1),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(100 * self.hits / lookups, 1) if lookups else 0.0,
+                'evictions': self.evictions,
+                'spills': self.spills,
+            }
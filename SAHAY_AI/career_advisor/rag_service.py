@@ -4,7 +4,12 @@ import logging
 from typing import Dict, List, Optional
 import traceback
 import pickle
-import hashlib
+import threading
+import time
+
+from django.conf import settings
+
+from .pipeline_cache import PipelineCache
 
 # Fix the import path issue
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,8 +23,12 @@ if src_path not in sys.path:
 try:
     # Now try to import RAG components
     from rag.rag_pipeline import CareerRAGPipeline
-    from utils.pdf_parser import extract_text_from_pdf
-    from utils.resume_parser import parse_resume
+    from rag.index_cache import VectorIndexCache
+    from rag.embedding_service import get_embedding_service
+    from rag.ingestion import ingest_resume
+    from rag.llm_backends import BACKEND_LABELS, DEFAULT_LLM_BACKEND, GENERATION_KWARGS, load_generation_pipeline
+    from rag.inference_client import RemoteGenerationPipeline, get_inference_client
+    from rag.batching import BatchingGenerator
     RAG_AVAILABLE = True
     logging.info("RAG components imported successfully!")
 except ImportError as e:
@@ -37,84 +46,105 @@ class RAGService:
         self.rag_pipeline = None
         self.current_resume_path = None
         self.current_resume_data = None
-        self._model_cache = {}  # Cache for different resume hashes
+        self.current_artifact = None
+        # Pipelines per resume hash, LRU-evicted by count and approximate memory
+        self._model_cache = PipelineCache(
+            max_entries=settings.RAG_PIPELINE_CACHE_ENTRIES,
+            max_bytes=settings.RAG_PIPELINE_CACHE_MB * 1024 * 1024,
+            on_evict=self._spill_pipeline if settings.RAG_PIPELINE_CACHE_SPILL else None,
+        )
         self._global_model = None  # Global model instance
+        # Warm-up and job workers may ask for the model at the same time; load it once
+        self._global_model_lock = threading.Lock()
+        self._warmup = {"status": "not_started"}
         self._model_info = {}  # Track model performance info
+        # Vector indexes persisted per resume hash, so they survive restarts
+        self._index_cache = VectorIndexCache(str(settings.RAG_INDEX_DIR)) if RAG_AVAILABLE else None
         logging.info(f"RAGService initialized. RAG_AVAILABLE: {RAG_AVAILABLE}")
         
-    def _get_resume_hash(self, resume_path: str) -> str:
-        """Generate hash for resume content to enable caching"""
-        try:
-            with open(resume_path, 'rb') as f:
-                content = f.read()
-                return hashlib.md5(content).hexdigest()
-        except:
-            return resume_path
+    def _spill_pipeline(self, resume_hash: str, pipeline) -> bool:
+        """Make sure an evicted pipeline's vector index is on disk so it reloads without re-embedding"""
+        vector_store = getattr(pipeline.retriever, 'vectorstore', None)
+        embeddings = getattr(vector_store, 'embedding_function', None)
+        model_name = getattr(embeddings, 'cache_name', getattr(embeddings, 'model_name', None))
+        if self._index_cache is None or vector_store is None or model_name is None:
+            return False
+        self._index_cache.save(resume_hash, vector_store, model_name)
+        return True
     
     def _load_global_model(self):
-        """Load the CPU-optimized AI model once and keep it in memory"""
-        if self._global_model is None:
-            try:
-                logging.info("Loading CPU-optimized DialoGPT-small model into memory...")
-                # Import here to avoid circular imports
-                from transformers import pipeline
-                import torch
-                
-                # Load the CPU-optimized model
-                self._global_model = pipeline(
-                    "text-generation",
-                    model="microsoft/DialoGPT-small",  # Only 117M params vs 345M
-                    device=-1,  # Force CPU
-                    torch_dtype=torch.float32,  # Use float32 for CPU compatibility
-                    max_length=120,  # Reasonable response length
-                    do_sample=True,
-                    temperature=0.7,
-                    pad_token_id=50256,
-                    # CPU optimizations
-                    low_cpu_mem_usage=True,
-                    return_full_text=False,
-                )
-                
-                # Store model info
-                self._model_info = {
-                    "model_name": "microsoft/DialoGPT-small",
-                    "parameters": "117M",
-                    "optimization": "CPU-optimized",
-                    "memory_usage": "Low",
-                    "response_time": "Fast"
-                }
+        """Load the AI model once on the configured LLM backend and keep it in memory"""
+        with self._global_model_lock:
+            if self._global_model is None:
+                try:
+                    logging.info(f"Loading DialoGPT-small ({DEFAULT_LLM_BACKEND} backend) into memory...")
                 
-                logging.info("CPU-optimized DialoGPT-small model loaded successfully!")
-                logging.info(f"Model info: {self._model_info}")
+                    client = get_inference_client()
+                    if client is not None:
+                        # Generation runs on the shared inference server; a local copy loads only
+                        # if the server cannot be reached
+                        self._global_model = RemoteGenerationPipeline(
+                            client, "microsoft/DialoGPT-small", DEFAULT_LLM_BACKEND, GENERATION_KWARGS,
+                            load_local=lambda: load_generation_pipeline(
+                                "microsoft/DialoGPT-small", DEFAULT_LLM_BACKEND, **GENERATION_KWARGS)[0],
+                        )
+                        load_info = {
+                            "optimization": f"{BACKEND_LABELS[DEFAULT_LLM_BACKEND]} on the inference server",
+                            "backend": DEFAULT_LLM_BACKEND,
+                            "load_seconds": 0.0,
+                        }
+                    else:
+                        # Load the model on the configured backend (float32, int8 or ONNX Runtime)
+                        self._global_model, load_info = load_generation_pipeline(
+                            "microsoft/DialoGPT-small",  # Only 117M params vs 345M
+                            backend=DEFAULT_LLM_BACKEND,
+                            **GENERATION_KWARGS,  # max_length=120, sampling at temperature 0.7
+                        )
                 
-            except Exception as e:
-                logging.error(f"Failed to load global model: {e}")
-                self._global_model = None
-                # Try fallback to even smaller model
-                try:
-                    logging.info("Trying fallback to DistilGPT2...")
-                    self._global_model = pipeline(
-                        "text-generation",
-                        model="distilgpt2",  # Only 82M parameters
-                        device=-1,
-                        max_length=100,
-                        do_sample=True,
-                        temperature=0.7,
-                    )
+                    # Store model info
                     self._model_info = {
-                        "model_name": "distilgpt2",
-                        "parameters": "82M",
-                        "optimization": "Ultra-lightweight",
-                        "memory_usage": "Very Low",
-                        "response_time": "Very Fast"
+                        "model_name": "microsoft/DialoGPT-small",
+                        "parameters": "117M",
+                        "optimization": load_info["optimization"],
+                        "backend": load_info["backend"],
+                        "load_seconds": load_info["load_seconds"],
+                        "memory_usage": "Very Low" if load_info["backend"] != "torch" else "Low",
+                        "response_time": "Fast"
                     }
-                    logging.info("Fallback DistilGPT2 model loaded successfully!")
-                except Exception as fallback_e:
-                    logging.error(f"Fallback model also failed: {fallback_e}")
+                
+                    logging.info("DialoGPT-small model loaded successfully!")
+                    logging.info(f"Model info: {self._model_info}")
+                
+                except Exception as e:
+                    logging.error(f"Failed to load global model: {e}")
                     self._global_model = None
+                    # Try fallback to even smaller model
+                    try:
+                        logging.info("Trying fallback to DistilGPT2...")
+                        # Plain float32 weights: the failure may have come from the configured backend
+                        self._global_model, load_info = load_generation_pipeline(
+                            "distilgpt2",  # Only 82M parameters
+                            backend="torch",
+                            max_length=100,
+                            do_sample=True,
+                            temperature=0.7,
+                        )
+                        self._model_info = {
+                            "model_name": "distilgpt2",
+                            "parameters": "82M",
+                            "optimization": f"Ultra-lightweight, {load_info['optimization']}",
+                            "backend": load_info["backend"],
+                            "load_seconds": load_info["load_seconds"],
+                            "memory_usage": "Very Low",
+                            "response_time": "Very Fast"
+                        }
+                        logging.info("Fallback DistilGPT2 model loaded successfully!")
+                    except Exception as fallback_e:
+                        logging.error(f"Fallback model also failed: {fallback_e}")
+                        self._global_model = None
     
-    def initialize_rag(self, resume_path: str) -> bool:
-        """Initialize RAG pipeline with a resume"""
+    def initialize_rag(self, resume_path: str, artifact=None) -> bool:
+        """Initialize RAG pipeline with a resume (reusing its ingestion artifact when given)"""
         if not RAG_AVAILABLE:
             logging.warning("RAG not available, cannot initialize")
             return False
@@ -122,17 +152,16 @@ class RAGService:
         try:
             logging.info(f"Initializing RAG with resume: {resume_path}")
             
-            # Parse resume first
-            raw_text = extract_text_from_pdf(resume_path)
-            parsed_data = parse_resume(raw_text)
-            
-            # Generate resume hash for caching
-            resume_hash = self._get_resume_hash(resume_path)
+            # Extract and parse once; the pipeline reuses the same artifact
+            if artifact is None:
+                artifact = ingest_resume(resume_path)
+            resume_hash = artifact.content_hash
             
             # Check if we have cached pipeline for this resume
-            if resume_hash in self._model_cache:
+            cached_pipeline = self._model_cache.get(resume_hash)
+            if cached_pipeline is not None:
                 logging.info("Using cached RAG pipeline for this resume")
-                self.rag_pipeline = self._model_cache[resume_hash]
+                self.rag_pipeline = cached_pipeline
             else:
                 # Load global model if not already loaded
                 self._load_global_model()
@@ -143,14 +172,21 @@ class RAGService:
                 
                 # Create new RAG pipeline with cached model
                 logging.info("Creating new RAG pipeline with cached model...")
-                self.rag_pipeline = CareerRAGPipeline(resume_path, cached_model=self._global_model)
+                self.rag_pipeline = CareerRAGPipeline(
+                    resume_path,
+                    cached_model=self._global_model,
+                    index_cache=self._index_cache,
+                    cache_key=resume_hash,
+                    artifact=artifact,
+                )
                 
                 # Cache this pipeline
-                self._model_cache[resume_hash] = self.rag_pipeline
+                self._model_cache.put(resume_hash, self.rag_pipeline)
                 logging.info("RAG pipeline cached for future use")
             
             self.current_resume_path = resume_path
-            self.current_resume_data = parsed_data
+            self.current_resume_data = artifact.parsed_data
+            self.current_artifact = artifact
             
             logging.info("RAG pipeline initialized successfully!")
             return True
@@ -196,13 +232,100 @@ class RAGService:
         """Check if RAG is available"""
         return RAG_AVAILABLE and self.rag_pipeline is not None
     
+    def warm_up(self) -> Dict:
+        """
+        Load the generation and embedding models and run one dummy inference
+        through each, so the first request does not pay for download,
+        conversion, initialization or first-call allocations.
+        """
+        self._warmup = {"status": "warming", "started_at": time.time()}
+        timings = {}
+        try:
+            if not RAG_AVAILABLE:
+                raise RuntimeError("RAG components not available")
+            
+            start = time.time()
+            self._load_global_model()
+            if self._global_model is None:
+                raise RuntimeError("Global model failed to load")
+            timings["llm_load"] = time.time() - start
+            
+            start = time.time()
+            self._global_model("Hello", max_new_tokens=4)
+            timings["llm_inference"] = time.time() - start
+            
+            embedding_service = get_embedding_service()
+            if embedding_service.remote is None:
+                start = time.time()
+                embedding_service.model  # loads on first access
+                timings["embedding_load"] = time.time() - start
+            
+            start = time.time()
+            embedding_service.embed_query("warm-up")
+            timings["embedding_inference"] = time.time() - start
+            
+            status = {"status": "ready"}
+        except Exception as e:
+            logging.error(f"Model warm-up failed: {e}")
+            status = {"status": "failed", "error": str(e)}
+        
+        self._warmup = {
+            **status,
+            "started_at": self._warmup["started_at"],
+            "seconds": round(time.time() - self._warmup["started_at"], 2),
+            "timings": {name: round(seconds, 2) for name, seconds in timings.items()},
+        }
+        logging.info(f"Model warm-up finished: {self._warmup}")
+        return self._warmup
+    
+    def start_warm_up(self, background: bool = True):
+        """Warm up now, or in a daemon thread while the server starts accepting requests"""
+        if self._warmup["status"] == "warming":
+            return
+        if not background:
+            self.warm_up()
+            return
+        # Marked before the thread starts so health checks fail until it is done
+        self._warmup = {"status": "warming", "started_at": time.time()}
+        threading.Thread(target=self.warm_up, name="rag-warmup", daemon=True).start()
+    
+    def health(self) -> Dict:
+        """
+        Readiness for load balancers: not ready while a warm-up is running,
+        or after a failed one until a model has been loaded after all.
+        Without warm-up requests are served, loading models lazily.
+        """
+        status = self._warmup["status"]
+        failed = status == "failed" and self._global_model is None
+        return {
+            "ready": status != "warming" and not failed,
+            "warmup": self._warmup if status != "not_started" else {"status": "disabled"},
+            "rag_available": RAG_AVAILABLE,
+            "llm_loaded": self._global_model is not None,
+            "embedding_model_loaded": get_embedding_service().stats()["model_loaded"] if RAG_AVAILABLE else False,
+            "inference_server": self._inference_server_status(),
+        }
+    
+    def _inference_server_status(self) -> Optional[Dict]:
+        client = get_inference_client() if RAG_AVAILABLE else None
+        if client is None:
+            return None
+        return {**client.stats(), "available": client.is_available()}
+    
     def get_cache_info(self) -> Dict:
         """Get information about model caching and performance"""
         return {
             "global_model_loaded": self._global_model is not None,
             "cached_pipelines": len(self._model_cache),
+            "persisted_indexes": sum(1 for name in os.listdir(self._index_cache.root) if not name.startswith('.'))
+                                 if self._index_cache else 0,
+            "pipeline_cache": self._model_cache.stats(),
+            "embedding_service": get_embedding_service().stats() if RAG_AVAILABLE else {},
             "rag_available": self.is_available(),
             "model_info": self._model_info,
+            "generation_batching": self._global_model.stats()
+                                   if RAG_AVAILABLE and isinstance(self._global_model, BatchingGenerator) else None,
+            "warmup": self._warmup,
             "performance_tips": [
                 "Using CPU-optimized model for better performance",
                 "Model cached in memory for instant responses",
@@ -0,0 +1,43 @@
+import os
+import sys
+from importlib import import_module
+from typing import Dict
+
+from django.conf import settings
+
+from .jobs import job_queue
+
+# Add the repository root to path for the modules shared with career_api
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from career_common.blob_store import BlobStore
+
+
+# Content-addressed resume storage: identical uploads share one file
+resume_store = BlobStore(str(settings.RESUME_STORE_DIR), suffix='.pdf')
+
+
+def collect_resume_garbage(retention_seconds: int = None) -> Dict[str, int]:
+    """Delete stored resumes that no session or pending job has used within the retention window"""
+    if retention_seconds is None:
+        retention_seconds = settings.RESUME_RETENTION_SECONDS
+
+    pinned = set()
+    for payload in job_queue.active_payloads('process_resume'):
+        digest = resume_store.digest_for_path(payload.get('file_path', ''))
+        if digest:
+            pinned.add(digest)
+
+    def owner_alive(digest: str, session_key: str) -> bool:
+        session = import_module(settings.SESSION_ENGINE).SessionStore(session_key=session_key)
+        if not session.exists(session_key):
+            return False
+        path = resume_store.path(digest)
+        if session.get('resume_file') == path:
+            return True
+        # A finished job whose result the user has not picked up yet
+        job_id = session.get('resume_job_id')
+        job = job_queue.get(job_id) if job_id else None
+        return bool(job and (job.get('result') or {}).get('resume_file') == path)
+
+    return resume_store.collect_garbage(owner_alive, pinned=pinned, retention_seconds=retention_seconds)
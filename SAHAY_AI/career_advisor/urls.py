@@ -6,10 +6,12 @@ app_name = 'career_advisor'
 urlpatterns = [
     path('', views.home, name='home'),
     path('upload/', views.upload_resume, name='upload_resume'),
+    path('jobs/<str:job_id>/', views.job_status, name='job_status'),
     path('analyze/', views.analyze_resume, name='analyze_resume'),
     path('skills-gap/', views.skills_gap_analysis, name='skills_gap_analysis'),
     path('career-paths/', views.career_paths, name='career_paths'),
     path('chat/', views.career_chat, name='career_chat'),
     path('roadmap/', views.learning_roadmap, name='learning_roadmap'),
     path('performance/', views.performance_status, name='performance_status'),
+    path('health/', views.health, name='health'),
 ] 
\ No newline at end of file
@@ -1,26 +1,26 @@
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 import json
 import os
 import sys
+import logging
 
 # Import our RAG service
 from .rag_service import rag_service
+from .jobs import job_queue
+from .storage import resume_store
 
 # Add src to path for our existing modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from utils.pdf_parser import extract_text_from_pdf
-from utils.resume_parser import parse_resume
-
 def home(request):
     """Home page view"""
     return render(request, 'career_advisor/home.html')
 
 def upload_resume(request):
-    """Handle resume upload"""
+    """Handle resume upload - processing runs as a background job"""
     if request.method == 'POST':
         print(f"DEBUG: POST request received")
         print(f"DEBUG: Files in request: {list(request.FILES.keys())}")
@@ -29,45 +29,33 @@ def upload_resume(request):
             resume_file = request.FILES['resume']
             print(f"DEBUG: Resume file found: {resume_file.name}")
             
-            # Save file temporarily
-            file_path = os.path.join('media', 'resumes', resume_file.name)
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            if not request.session.session_key:
+                request.session.save()
             
-            with open(file_path, 'wb+') as destination:
+            # Store by content hash; re-uploading the same file only adds a reference
+            writer = resume_store.writer()
+            try:
                 for chunk in resume_file.chunks():
-                    destination.write(chunk)
+                    writer.write(chunk)
+            except Exception:
+                writer.abort()
+                raise
+            digest, deduplicated = writer.commit(owner=request.session.session_key)
+            file_path = resume_store.path(digest)
+            
+            logging.debug(f"Resume stored at {file_path} (duplicate: {deduplicated})")
             
-            print(f"DEBUG: File saved to: {file_path}")
+            # Queue parsing + RAG indexing; the status page polls until it finishes
+            try:
+                priority = int(request.POST.get('priority', 0))
+            except ValueError:
+                priority = 0
+            job_id = job_queue.submit('process_resume', {'file_path': file_path},
+                                      priority=priority, owner=request.session.session_key)
+            request.session['resume_job_id'] = job_id
             
-            # Initialize RAG pipeline
-            if rag_service.initialize_rag(file_path):
-                print(f"DEBUG: RAG pipeline initialized successfully")
-                messages.success(request, 'Resume uploaded and AI analysis initialized successfully!')
-                return redirect('career_advisor:analyze_resume')
-            else:
-                print(f"DEBUG: RAG pipeline failed, trying fallback")
-                # Fallback to basic parsing if RAG fails
-                try:
-                    import sys
-                    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-                    from utils.pdf_parser import extract_text_from_pdf
-                    from utils.resume_parser import parse_resume
-                    
-                    raw_text = extract_text_from_pdf(file_path)
-                    parsed_data = parse_resume(raw_text)
-                    
-                    # Store in session for analysis
-                    request.session['resume_data'] = parsed_data
-                    request.session['resume_file'] = file_path
-                    
-                    print(f"DEBUG: Fallback parsing successful")
-                    messages.warning(request, 'Resume uploaded with basic analysis. AI features may be limited.')
-                    return redirect('career_advisor:analyze_resume')
-                    
-                except Exception as e:
-                    print(f"DEBUG: Error in fallback parsing: {e}")
-                    messages.error(request, f'Error processing resume: {str(e)}')
-                    return redirect('career_advisor:home')
+            logging.info(f"Queued resume job {job_id}")
+            return redirect('career_advisor:job_status', job_id=job_id)
         else:
             print(f"DEBUG: No resume file in request")
             messages.error(request, 'No resume file uploaded.')
@@ -76,6 +64,34 @@ def upload_resume(request):
     print(f"DEBUG: GET request, rendering upload form")
     return render(request, 'career_advisor/upload.html')
 
+def job_status(request, job_id):
+    """Show (or return as JSON with ?format=json) the progress of a resume job"""
+    job = job_queue.get(job_id, owner=request.session.session_key or '')
+    if not job:
+        raise Http404('Job not found')
+    
+    if request.GET.get('format') == 'json':
+        return JsonResponse({k: v for k, v in job.items() if k != 'result'})
+    
+    if job['status'] == 'succeeded':
+        result = job['result']
+        # Only the latest upload updates the session
+        if request.session.get('resume_job_id') == job_id:
+            request.session['resume_data'] = result['resume_data']
+            request.session['resume_file'] = result['resume_file']
+            request.session['resume_ingestion'] = result.get('ingestion')
+        if result['rag_initialized']:
+            messages.success(request, 'Resume uploaded and AI analysis initialized successfully!')
+        else:
+            messages.warning(request, 'Resume uploaded with basic analysis. AI features may be limited.')
+        return redirect('career_advisor:analyze_resume')
+    
+    if job['status'] == 'failed':
+        messages.error(request, f"Error processing resume: {job['error']}")
+        return redirect('career_advisor:home')
+    
+    return render(request, 'career_advisor/job_status.html', {'job': job})
+
 def analyze_resume(request):
     """Show resume analysis"""
     # Try to get data from RAG service first
@@ -214,6 +230,11 @@ def performance_status(request):
     
     return render(request, 'career_advisor/performance.html', context)
 
+def health(request):
+    """Readiness probe: 503 while models are warming up or after a failed warm-up, 200 once requests can be served"""
+    status = rag_service.health()
+    return JsonResponse(status, status=200 if status['ready'] else 503)
+
 # Fallback functions (when RAG is not available)
 def analyze_skills_gap_fallback(resume_data, target_role):
     """Analyze skills gap for a specific role (fallback)"""
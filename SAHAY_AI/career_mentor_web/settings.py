@@ -130,3 +130,24 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Background resume processing (persistent SQLite job queue)
+JOB_QUEUE_DB = os.getenv('JOB_QUEUE_DB', os.path.join(BASE_DIR, 'jobs.sqlite3'))
+JOB_QUEUE_WORKERS = int(os.getenv('JOB_QUEUE_WORKERS', '1'))
+
+# Uploaded resumes are stored once per distinct content under media/resumes/blobs/
+RESUME_STORE_DIR = os.getenv('RESUME_STORE_DIR', os.path.join(MEDIA_ROOT, 'resumes'))
+RESUME_RETENTION_SECONDS = int(os.getenv('RESUME_RETENTION_SECONDS', str(7 * 86400)))
+
+# FAISS vector indexes saved per resume content hash (loaded memory-mapped after restarts)
+RAG_INDEX_DIR = os.getenv('RAG_INDEX_DIR', os.path.join(BASE_DIR, 'cache', 'vector_indexes'))
+
+# In-memory RAG pipeline cache (LRU); evicted indexes are spilled to RAG_INDEX_DIR
+RAG_PIPELINE_CACHE_ENTRIES = int(os.getenv('RAG_PIPELINE_CACHE_ENTRIES', '8'))
+RAG_PIPELINE_CACHE_MB = int(os.getenv('RAG_PIPELINE_CACHE_MB', '256'))
+RAG_PIPELINE_CACHE_SPILL = os.getenv('RAG_PIPELINE_CACHE_SPILL', 'true').lower() == 'true'
+
+# Preload the LLM and embedding model when the server starts: off, background (health
+# endpoint reports not ready until done) or blocking (before serving; with gunicorn
+# --preload the loaded models are shared copy-on-write by the forked workers)
+RAG_WARMUP = os.getenv('RAG_WARMUP', 'off').lower()
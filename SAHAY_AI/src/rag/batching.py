@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, List
+
+# Concurrent generation calls are collected for up to GENERATION_BATCH_WAIT_MS (or until
+# GENERATION_MAX_BATCH prompts are waiting) and run as one padded batch; 1 disables batching
+GENERATION_MAX_BATCH = int(os.getenv("GENERATION_MAX_BATCH", "8"))
+GENERATION_BATCH_WAIT_MS = float(os.getenv("GENERATION_BATCH_WAIT_MS", "10"))
+# A caller gives up on its prompt after this long (below the inference client's 120 s timeout)
+GENERATION_TIMEOUT_SECONDS = float(os.getenv("GENERATION_TIMEOUT_SECONDS", "90"))
+
+
+class PerRowTokenBudget:
+    """
+    Stopping criterion that ends each row of a left-padded batch after its
+    own number of new tokens. With `max_length` every row would share the
+    padded length, so shorter prompts would get fewer new tokens than they
+    get when generated alone.
+    """
+
+    def __init__(self, budgets: List[int]):
+        self.budgets = budgets
+        self._start = None
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+
+        if self._start is None:
+            self._start = input_ids.shape[1] - 1  # called once the first new token is appended
+        generated = input_ids.shape[1] - self._start
+        return torch.tensor([generated >= budget for budget in self.budgets], device=input_ids.device)
+
+
+class BatchingGenerator:
+    """
+    Micro-batching in front of a text-generation pipeline. Callers block as
+    with the pipeline itself; a scheduler thread takes the first waiting
+    prompt, gathers whatever else arrives within `max_wait_ms` (up to
+    `max_batch_size` prompts), and runs prompts with the same generation
+    arguments through the pipeline as one padded batch. On a CPU, one batch
+    of N short generations costs much less than N generations one at a time.
+
+    If a batch fails, its prompts are retried one at a time, so only the
+    caller whose prompt is at fault sees the error. Callers wait at most
+    `timeout` seconds.
+    """
+
+    task = "text-generation"
+
+    def __init__(self, generator, max_batch_size: int = GENERATION_MAX_BATCH,
+                 max_wait_ms: float = GENERATION_BATCH_WAIT_MS, timeout: float = GENERATION_TIMEOUT_SECONDS):
+        self.generator = generator
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.prompts = 0
+        self.largest_batch = 0
+        self.fallbacks = 0
+
+    def __getattr__(self, name):
+        # model, tokenizer, ... of the wrapped pipeline
+        generator = self.__dict__.get("generator")
+        if generator is None:
+            raise AttributeError(name)
+        return getattr(generator, name)
+
+    def _ensure_scheduler(self):
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._schedule, name="generation-batcher", daemon=True)
+                    self._thread.start()
+
+    def __call__(self, prompts, **kwargs):
+        single = isinstance(prompts, str)
+        if self.max_batch_size <= 1:
+            return self.generator(prompts, **kwargs)
+        self._ensure_scheduler()
+        # Only prompts with identical generation arguments can share a batch
+        key = json.dumps(kwargs, sort_keys=True, default=str)
+        futures = []
+        for prompt in ([prompts] if single else prompts):
+            future = Future()
+            self._queue.put((key, prompt, kwargs, future))
+            futures.append(future)
+        deadline = time.monotonic() + self.timeout
+        try:
+            results = [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+        except FutureTimeout:
+            for future in futures:
+                future.cancel()  # prompts not started yet are dropped by the scheduler
+            raise TimeoutError(f"Generation did not finish within {self.timeout:g}s") from None
+        return results[0] if single else results
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _schedule(self):
+        while True:
+            groups: Dict[str, List[tuple]] = {}
+            for item in self._collect():
+                groups.setdefault(item[0], []).append(item)
+            for items in groups.values():
+                self._run(items)
+
+    def _batch_kwargs(self, prompts: List, kwargs: Dict) -> Dict:
+        """
+        The unbatched call's arguments, with a `max_length` limit turned into
+        per-prompt budgets of new tokens (what each prompt would get alone).
+        """
+        tokenizer = getattr(self.generator, "tokenizer", None)
+        config = getattr(self.generator, "generation_config", None)
+        max_length = kwargs.get("max_length", getattr(config, "max_length", None))
+        if ("max_new_tokens" in kwargs or getattr(config, "max_new_tokens", None) is not None or max_length is None
+                or tokenizer is None or "stopping_criteria" in kwargs or not all(isinstance(p, str) for p in prompts)):
+            return kwargs
+        budgets = [max(1, max_length - len(tokenizer(prompt, add_special_tokens=False).input_ids))
+                   for prompt in prompts]
+        if len(set(budgets)) == 1:
+            return kwargs  # no padding, so max_length already means the same thing
+        return {**kwargs, "max_new_tokens": max(budgets), "stopping_criteria": [PerRowTokenBudget(budgets)]}
+
+    def _run(self, items: List[tuple]):
+        # Callers that timed out have cancelled their futures; skip their prompts
+        items = [item for item in items if item[3].set_running_or_notify_cancel()]
+        if not items:
+            return
+        prompts = [prompt for _, prompt, _, _ in items]
+        try:
+            outputs = self.generator(prompts, batch_size=len(prompts), **self._batch_kwargs(prompts, items[0][2]))
+            if len(outputs) != len(prompts):
+                raise RuntimeError(f"Pipeline returned {len(outputs)} outputs for {len(prompts)} prompts")
+        except Exception as e:
+            logging.error(f"Batched generation of {len(prompts)} prompts failed: {e}")
+            self._run_one_by_one(items, e)
+            return
+        with self._stats_lock:
+            self.batches += 1
+            self.prompts += len(prompts)
+            self.largest_batch = max(self.largest_batch, len(prompts))
+        for (*_, future), output in zip(items, outputs):
+            future.set_result(output)
+
+    def _run_one_by_one(self, items: List[tuple], error: Exception):
+        if len(items) == 1:
+            items[0][3].set_exception(error)
+            return
+        with self._stats_lock:
+            self.fallbacks += 1
+        for _, prompt, kwargs, future in items:
+            try:
+                future.set_result(self.generator(prompt, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+    def stats(self) -> Dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "prompts": self.prompts,
+            "mean_batch_size": round(self.prompts / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "fallbacks": self.fallbacks,
+        }
@@ -0,0 +1,177 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Section label -> headings that open it, matched in Title Case or UPPER CASE only
+# so ordinary prose ("years of experience") is not mistaken for a heading
+SECTION_HEADINGS = {
+    'summary': ['Professional Summary', 'Career Summary', 'Summary', 'Profile', 'Career Objective', 'Objective',
+                'About Me'],
+    'skills': ['Technical Skills', 'Core Competencies', 'Key Skills', 'Skills'],
+    'experience': ['Professional Experience', 'Work Experience', 'Employment History', 'Experience', 'Internships'],
+    'projects': ['Academic Projects', 'Personal Projects', 'Key Projects', 'Projects'],
+    'education': ['Academic Background', 'Education', 'Qualifications'],
+    'certifications': ['Certifications', 'Certificates', 'Courses'],
+    'achievements': ['Achievements', 'Awards', 'Honors', 'Honours'],
+    'publications': ['Publications'],
+    'extracurricular': ['Extracurricular Activities', 'Extracurricular', 'Volunteering'],
+}
+
+# Parsed-data keys whose items may hold text the headings did not catch
+PARSED_SECTIONS = ['skills', 'experience', 'projects', 'education', 'certifications', 'achievements',
+                   'extracurricular']
+
+# A parsed item is treated as already in the text when this share of its words is
+KNOWN_TEXT_COVERAGE = 0.8
+
+# Text before the first heading: name and contact details
+HEADER_SECTION = 'profile'
+
+# Bullet glyphs PDF extraction leaves in the text (\uf0b7 is the Symbol-font bullet)
+BULLET_PATTERN = re.compile(r'[\uf0b7\u2022\u25cf\u25aa\u25e6\u2023\u2043\u27a2]|\n')
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Word-piece windows of the embedding models in use; text beyond them is truncated
+MODEL_TOKEN_WINDOWS = {
+    'all-MiniLM-L6-v2': 256,
+    'sentence-transformers/all-MiniLM-L6-v2': 256,
+}
+DEFAULT_TOKEN_WINDOW = 256
+# [CLS]/[SEP] plus slack for the token estimate below
+WINDOW_MARGIN = 0.85
+
+
+@dataclass(frozen=True)
+class Chunk:
+    text: str
+    section: str
+    metadata: Dict = field(default_factory=dict, compare=False)
+
+
+def chunk_token_budget(model_name: Optional[str] = None) -> int:
+    """Largest chunk, in estimated word-pieces, the embedding model encodes without truncating"""
+    return int(MODEL_TOKEN_WINDOWS.get(model_name, DEFAULT_TOKEN_WINDOW) * WINDOW_MARGIN)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate word-piece count: one per word or symbol, plus one per 7 characters of long words"""
+    return sum(1 + len(piece) // 7 for piece in TOKEN_PATTERN.findall(text))
+
+
+def normalize(text: str) -> str:
+    """Lowercased alphanumerics only, for matching text across parser clean-ups"""
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower()))
+
+
+def _heading_pattern() -> re.Pattern:
+    variants = []
+    for headings in SECTION_HEADINGS.values():
+        for heading in headings:
+            variants.extend([re.escape(heading), re.escape(heading.upper())])
+    # Longest first so "Professional Experience" wins over "Experience"
+    variants.sort(key=len, reverse=True)
+    return re.compile(r'(?<![\w])(' + '|'.join(variants) + r')(?![\w])')
+
+
+HEADING_PATTERN = _heading_pattern()
+HEADING_LABELS = {heading.lower(): label for label, headings in SECTION_HEADINGS.items() for heading in headings}
+
+
+def split_sections(raw_text: str) -> List[Tuple[str, str]]:
+    """
+    Partition the resume text at section headings into (label, body) pairs.
+    Works on multi-line text and on the single-line text PyMuPDF often
+    returns; a repeated label continues the earlier section.
+    """
+    sections: List[Tuple[str, str]] = []
+    label, start = HEADER_SECTION, 0
+    for match in HEADING_PATTERN.finditer(raw_text):
+        sections.append((label, raw_text[start:match.start()]))
+        label, start = HEADING_LABELS[match.group(1).lower()], match.end()
+    sections.append((label, raw_text[start:]))
+    return [(label, body.strip(' \t\n:|')) for label, body in sections if body.strip(' \t\n:|')]
+
+
+def _units(text: str) -> List[str]:
+    """Bullets and lines of a section body, whitespace-collapsed"""
+    units = []
+    for unit in BULLET_PATTERN.split(text):
+        unit = re.sub(r'^[-*]\s+', '', re.sub(r'\s+', ' ', unit).strip(' ,;|'))
+        if unit:
+            units.append(unit)
+    return units
+
+
+def _fit(unit: str, budget: int) -> List[str]:
+    """Split a unit longer than the budget at sentences, then at words"""
+    if estimate_tokens(unit) <= budget:
+        return [unit]
+    pieces = []
+    for sentence in SENTENCE_PATTERN.split(unit):
+        if estimate_tokens(sentence) <= budget:
+            pieces.append(sentence)
+            continue
+        words, current = sentence.split(), []
+        for word in words:
+            if current and estimate_tokens(' '.join(current + [word])) > budget:
+                pieces.append(' '.join(current))
+                current = []
+            current.append(word)
+        if current:
+            pieces.append(' '.join(current))
+    return pieces
+
+
+def chunk_resume(raw_text: str, resume_data: Optional[Dict] = None, max_tokens: Optional[int] = None) -> List[Chunk]:
+    """
+    Build labelled, non-overlapping chunks from a resume's sections.
+
+    The text is split at section headings and into bullets; repeated bullets
+    are kept once, and parsed items are only added when the raw text does not
+    already contain them (the parser's lists are mostly substrings of it).
+    Bullets are packed into chunks of at most `max_tokens` estimated
+    word-pieces, never mixing sections, and each chunk starts with its
+    section label so the label is embedded with the content.
+    """
+    max_tokens = max_tokens or chunk_token_budget()
+
+    sections: Dict[str, List[str]] = {}
+    seen = set()
+    known_words = set(normalize(raw_text).split())
+
+    def add(label: str, unit: str):
+        key = normalize(unit)
+        if key and key not in seen:
+            seen.add(key)
+            sections.setdefault(label, []).append(unit)
+
+    for label, body in split_sections(raw_text):
+        for unit in _units(body):
+            add(label, unit)
+
+    for label in PARSED_SECTIONS:
+        for item in (resume_data or {}).get(label) or []:
+            for unit in _units(str(item)):
+                # The parser reshapes text (drops years, symbols), so compare by vocabulary
+                words = normalize(unit).split()
+                if words and sum(word in known_words for word in words) / len(words) < KNOWN_TEXT_COVERAGE:
+                    add(label, unit)
+
+    chunks = []
+    for label, units in sections.items():
+        prefix = f"{label.title()}: "
+        budget = max(16, max_tokens - estimate_tokens(prefix))
+        current = ''
+        for unit in units:
+            for i, piece in enumerate(_fit(unit, budget)):
+                # Pieces of one long bullet continue with a space, bullets are separated by "; "
+                joined = f"{current}{' ' if i else '; '}{piece}" if current else piece
+                if current and estimate_tokens(joined) > budget:
+                    chunks.append(Chunk(prefix + current, label))
+                    joined = piece
+                current = joined
+        if current:
+            chunks.append(Chunk(prefix + current, label))
+
+    return [Chunk(chunk.text, chunk.section, {'section': chunk.section, 'chunk': i}) for i, chunk in enumerate(chunks)]
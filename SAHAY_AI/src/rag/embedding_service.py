@@ -0,0 +1,198 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import importlib.util
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .inference_client import InferenceServerUnavailable, get_inference_client
+except ImportError:
+    from rag.inference_client import InferenceServerUnavailable, get_inference_client
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+# torch: SentenceTransformer; onnx / onnx-int8: exported model on ONNX Runtime (see onnx_embeddings.py)
+BACKENDS = ("torch", "onnx", "onnx-int8")
+DEFAULT_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+DEFAULT_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 "cache", "embeddings.sqlite3"),
+)
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+)
+"""
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingService:
+    """
+    One sentence-transformers model per process, loaded on first use, with
+    chunk embeddings cached persistently in SQLite by (model, sha256(text)).
+    Chunks that were embedded before, for any resume or in an earlier run,
+    are read back instead of being encoded again.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 batch_size: int = 32, backend: str = DEFAULT_BACKEND, use_server: bool = True):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+        if backend != "torch" and importlib.util.find_spec("onnxruntime") is None:
+            logging.warning(f"onnxruntime is not installed; using the torch embedding backend instead of {backend}")
+            backend = "torch"
+        self.model_name = model_name
+        self.backend = backend
+        # int8 vectors differ slightly from float ones, so they are cached (and indexed) separately
+        self.cache_name = f"{model_name}@int8" if backend == "onnx-int8" else model_name
+        self.cache_path = cache_path
+        self.batch_size = batch_size
+        self._model = None
+        # With INFERENCE_SERVER_URL set, encoding runs on the shared server; the model loads here only without it
+        self.remote = get_inference_client() if use_server else None
+        self._model_lock = threading.Lock()
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.model_load_seconds = None
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            self._conn().execute(SCHEMA)
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    start = time.time()
+                    if self.backend == "torch":
+                        from sentence_transformers import SentenceTransformer
+                        self._model = SentenceTransformer(self.model_name)
+                    else:
+                        try:
+                            from .onnx_embeddings import load_onnx_encoder
+                        except ImportError:
+                            from rag.onnx_embeddings import load_onnx_encoder
+                        self._model = load_onnx_encoder(self.model_name, quantize=self.backend == "onnx-int8")
+                    self.model_load_seconds = time.time() - start
+                    logging.info(f"Loaded embedding model {self.model_name} ({self.backend}) "
+                                 f"in {self.model_load_seconds:.1f}s")
+        return self._model
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.cache_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts with the model directly (no cache), on the inference server when one is reachable."""
+        if self.remote is not None:
+            try:
+                return self.remote.embed(texts, self.model_name, self.backend)
+            except InferenceServerUnavailable:
+                pass  # logged by the client; embed in this process
+        return np.asarray(self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True),
+                          dtype=np.float32)
+
+    def _lookup(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        for start in range(0, len(hashes), LOOKUP_BATCH):
+            batch = hashes[start:start + LOOKUP_BATCH]
+            rows = self._conn().execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN "
+                f"({', '.join('?' * len(batch))})",
+                (self.cache_name, *batch),
+            ).fetchall()
+            for digest, blob in rows:
+                found[digest] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def _store(self, items: Dict[str, np.ndarray]):
+        now = time.time()
+        self._conn().executemany(
+            "INSERT OR IGNORE INTO embeddings (model, text_hash, dim, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+            [(self.cache_name, digest, len(vector), vector.astype(np.float32).tobytes(), now)
+             for digest, vector in items.items()],
+        )
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embeddings for texts, encoding only those not already cached."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if not self.cache_path:
+            with self._stats_lock:
+                self.misses += len(texts)
+            return self.encode(texts)
+
+        hashes = [text_hash(t) for t in texts]
+        cached = self._lookup(list(set(hashes)))
+        missing = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in cached:
+                missing.setdefault(digest, text)
+        if missing:
+            encoded = self.encode(list(missing.values()))
+            new = dict(zip(missing.keys(), encoded))
+            self._store(new)
+            cached.update(new)
+        with self._stats_lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        return np.stack([cached[digest] for digest in hashes])
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.encode([text])[0]
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "model_name": self.model_name,
+            "backend": self.backend,
+            "model_loaded": self._model is not None,
+            "model_load_seconds": round(self.model_load_seconds, 2) if self.model_load_seconds else None,
+            "chunk_cache_hits": self.hits,
+            "chunk_cache_misses": self.misses,
+            "chunk_cache_hit_rate": round(100 * self.hits / lookups, 1) if lookups else 0.0,
+            "inference_server": self.remote.stats() if self.remote is not None else None,
+        }
+
+
+_services: Dict[tuple, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: str = DEFAULT_MODEL, backend: str = DEFAULT_BACKEND) -> EmbeddingService:
+    """The process-wide embedding service for a model and backend (the model itself loads on first use)."""
+    with _services_lock:
+        service = _services.get((model_name, backend))
+        if service is None:
+            service = _services[(model_name, backend)] = EmbeddingService(model_name, backend=backend)
+        return service
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import shutil
+import logging
+import tempfile
+from typing import Optional
+
+import faiss
+from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+
+# Bump when the on-disk layout or the chunking changes; older entries are rebuilt
+INDEX_FORMAT = 2
+
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.json"
+META_FILE = "meta.json"
+
+
+def _read_flags(mmap: bool) -> int:
+    if not mmap:
+        return 0
+    # IO_FLAG_MMAP_IFC maps flat (IndexFlat*) code arrays; older faiss only has IO_FLAG_MMAP
+    return getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+
+
+class VectorIndexCache:
+    """
+    FAISS vector stores saved on disk, one directory per resume content hash:
+
+        <root>/<resume_hash>/index.faiss   raw FAISS index (memory-mapped on load)
+        <root>/<resume_hash>/chunks.json   chunk texts and metadata, in index order
+        <root>/<resume_hash>/meta.json     format version and embedding model
+
+    Entries are written to a temporary directory and renamed into place, so
+    concurrent builders never expose a half-written index. Chunks are kept as
+    JSON rather than LangChain's pickle so loading never unpickles files.
+    """
+
+    def __init__(self, root: str, mmap: bool = True):
+        self.root = root
+        self.mmap = mmap
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def _meta(self, key: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self._path(key), META_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _is_current(self, meta: Optional[dict], model_name: str) -> bool:
+        return bool(meta) and meta.get("format") == INDEX_FORMAT and meta.get("model") == model_name
+
+    def exists(self, key: str, model_name: str) -> bool:
+        return self._is_current(self._meta(key), model_name)
+
+    def load(self, key: str, embeddings, model_name: str) -> Optional[FAISS]:
+        """The cached vector store for `key`, or None if missing or built differently."""
+        path = self._path(key)
+        meta = self._meta(key)
+        if meta is None:
+            return None
+        if not self._is_current(meta, model_name):
+            logging.info(f"Ignoring stale vector index {key} ({meta.get('model')}, format {meta.get('format')})")
+            return None
+
+        start = time.time()
+        index_path = os.path.join(path, INDEX_FILE)
+        try:
+            index = faiss.read_index(index_path, _read_flags(self.mmap))
+        except RuntimeError:
+            # Index types without mmap support are read into memory instead
+            index = faiss.read_index(index_path)
+        with open(os.path.join(path, CHUNKS_FILE), "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+
+        docstore = InMemoryDocstore({
+            str(i): Document(page_content=chunk["text"], metadata=chunk.get("metadata", {}))
+            for i, chunk in enumerate(chunks)
+        })
+        vector_store = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id={i: str(i) for i in range(len(chunks))},
+        )
+        os.utime(os.path.join(path, META_FILE), None)
+        logging.info(f"Loaded vector index {key} ({index.ntotal} vectors) in {time.time() - start:.3f}s")
+        return vector_store
+
+    def save(self, key: str, vector_store: FAISS, model_name: str):
+        """Persist a vector store under `key`; a no-op if another process saved it first."""
+        if self.exists(key, model_name):
+            return
+        if self._meta(key) is not None:
+            self.delete(key)  # built by another model or format version
+        tmp_path = tempfile.mkdtemp(dir=self.root, prefix=f".{key}.")
+        try:
+            faiss.write_index(vector_store.index, os.path.join(tmp_path, INDEX_FILE))
+            chunks = []
+            for i in range(vector_store.index.ntotal):
+                doc = vector_store.docstore.search(vector_store.index_to_docstore_id[i])
+                chunks.append({"text": doc.page_content, "metadata": doc.metadata})
+            with open(os.path.join(tmp_path, CHUNKS_FILE), "w", encoding="utf-8") as f:
+                json.dump(chunks, f)
+            with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+                json.dump({"format": INDEX_FORMAT, "model": model_name, "vectors": vector_store.index.ntotal,
+                           "created_at": time.time()}, f)
+            os.rename(tmp_path, self._path(key))
+            logging.info(f"Saved vector index {key} ({vector_store.index.ntotal} vectors)")
+        except OSError as e:
+            # Lost the race to another builder (rename onto a non-empty dir) or disk trouble
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not self.exists(key, model_name):
+                logging.warning(f"Could not save vector index {key}: {e}")
+
+    def delete(self, key: str):
+        shutil.rmtree(self._path(key), ignore_errors=True)
@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import base64
+import queue
+import select
+import socket
+import logging
+import threading
+import http.client
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+# http://127.0.0.1:8765 or unix:///path/to/inference.sock; empty: every process runs its own models
+DEFAULT_INFERENCE_URL = os.getenv("INFERENCE_SERVER_URL", "")
+# After a failed connection the server is not tried again for this long; calls run in-process meanwhile
+RETRY_AFTER_SECONDS = 30
+
+
+def encode_vectors(vectors: np.ndarray) -> Dict:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    return {"shape": list(vectors.shape), "data": base64.b64encode(vectors.tobytes()).decode("ascii")}
+
+
+def decode_vectors(payload: Dict) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(payload["data"]), dtype=np.float32).reshape(payload["shape"])
+
+
+class InferenceServerUnavailable(ConnectionError):
+    """The inference server could not be reached; callers fall back to in-process inference"""
+
+
+class InferenceServerError(RuntimeError):
+    """The server was reached but the model call failed"""
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.unix_path)
+        self.sock = sock
+
+
+class InferenceClient:
+    """
+    Embedding and generation calls to the local inference server over a pool
+    of keep-alive connections (one per concurrent caller, up to `pool_size`
+    kept open). Unreachable servers raise InferenceServerUnavailable and are
+    skipped for RETRY_AFTER_SECONDS, so fallbacks do not wait on timeouts.
+    """
+
+    def __init__(self, url: str, pool_size: int = 4, timeout: float = 120.0):
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "unix"):
+            raise ValueError(f"Unsupported inference server URL {url!r}; use http://host:port or unix:///path")
+        self.url = url
+        self._parsed = parsed
+        self.timeout = timeout
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=pool_size)
+        self._down_until = 0.0
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._parsed.scheme == "unix":
+            return UnixHTTPConnection(self._parsed.path, self.timeout)
+        return http.client.HTTPConnection(self._parsed.hostname or "127.0.0.1", self._parsed.port or 80,
+                                          timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _pooled(self) -> Optional[http.client.HTTPConnection]:
+        """An idle pooled connection that the server has not closed, if any"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return None
+            # A connection the server closed (e.g. on restart) reads as EOF; drop it before sending anything
+            if conn.sock is not None and not select.select([conn.sock], [], [], 0)[0]:
+                return conn
+            conn.close()
+
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        if time.time() < self._down_until:
+            raise InferenceServerUnavailable(f"Inference server {self.url} is marked down")
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        conn = self._pooled()
+        try:
+            if conn is not None:
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                except (OSError, http.client.HTTPException):
+                    # Closed while idle and the request was not sent, so it is safe to send again. Failures
+                    # after sending (e.g. a read timeout) are not retried: /generate would run twice.
+                    conn.close()
+                    conn = None
+            if conn is None:
+                conn = self._connect()
+                conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            status, data = response.status, response.read()
+        except (OSError, http.client.HTTPException) as e:
+            if conn is not None:
+                conn.close()
+            with self._stats_lock:
+                self.failures += 1
+            self._down_until = time.time() + RETRY_AFTER_SECONDS
+            logging.warning(f"Inference server {self.url} unavailable ({e}); running in-process for "
+                            f"{RETRY_AFTER_SECONDS}s")
+            raise InferenceServerUnavailable(f"Inference server {self.url} unavailable: {e}") from e
+
+        self._release(conn)
+        with self._stats_lock:
+            self.calls += 1
+        result = json.loads(data)
+        if status != 200:
+            raise InferenceServerError(result.get("error", f"HTTP {status}"))
+        return result
+
+    def health(self) -> Dict:
+        return self._request("GET", "/health")
+
+    def is_available(self) -> bool:
+        try:
+            self.health()
+            return True
+        except InferenceServerUnavailable:
+            return False
+
+    def embed(self, texts: List[str], model_name: str, backend: str) -> np.ndarray:
+        result = self._request("POST", "/embed", {"texts": list(texts), "model": model_name, "backend": backend})
+        return decode_vectors(result["vectors"])
+
+    def generate(self, prompts, model_name: str, backend: str, load_kwargs: Dict, **kwargs) -> List:
+        result = self._request("POST", "/generate", {
+            "prompts": prompts, "model": model_name, "backend": backend,
+            "load_kwargs": load_kwargs, "kwargs": kwargs,
+        })
+        return result["outputs"]
+
+    def stats(self) -> Dict:
+        return {
+            "url": self.url,
+            "calls": self.calls,
+            "failures": self.failures,
+            "marked_down": time.time() < self._down_until,
+        }
+
+
+class RemoteGenerationPipeline:
+    """
+    Stands in for a transformers text-generation pipeline (what LangChain's
+    HuggingFacePipeline calls): generation runs on the inference server, or
+    on a pipeline loaded in-process by `load_local` while it is unavailable.
+    """
+
+    task = "text-generation"
+
+    def __init__(self, client: InferenceClient, model_name: str, backend: str, load_kwargs: Dict,
+                 load_local: Callable[[], object]):
+        self.client = client
+        self.model_name = model_name
+        self.backend = backend
+        self.load_kwargs = load_kwargs
+        self._load_local = load_local
+        self._local = None
+        self._local_lock = threading.Lock()
+
+    @property
+    def local(self):
+        if self._local is None:
+            with self._local_lock:
+                if self._local is None:
+                    logging.warning(f"Inference server unavailable; loading {self.model_name} in this process")
+                    self._local = self._load_local()
+        return self._local
+
+    def __call__(self, prompts, **kwargs):
+        try:
+            return self.client.generate(prompts, self.model_name, self.backend, self.load_kwargs, **kwargs)
+        except InferenceServerUnavailable:
+            return self.local(prompts, **kwargs)
+
+
+_client: Optional[InferenceClient] = None
+_client_lock = threading.Lock()
+
+
+def get_inference_client(url: str = DEFAULT_INFERENCE_URL) -> Optional[InferenceClient]:
+    """The process-wide client for the configured server, or None when INFERENCE_SERVER_URL is not set"""
+    global _client
+    if not url:
+        return None
+    with _client_lock:
+        if _client is None or _client.url != url:
+            _client = InferenceClient(url)
+        return _client
@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+try:
+    from .batching import BatchingGenerator
+    from .embedding_service import BACKENDS, DEFAULT_BACKEND, DEFAULT_MODEL, EmbeddingService
+    from .inference_client import DEFAULT_INFERENCE_URL, encode_vectors
+    from .llm_backends import (
+        DEFAULT_LLM, DEFAULT_LLM_BACKEND, GENERATION_KWARGS, LLM_BACKENDS, load_generation_pipeline,
+    )
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from rag.batching import BatchingGenerator
+    from rag.embedding_service import BACKENDS, DEFAULT_BACKEND, DEFAULT_MODEL, EmbeddingService
+    from rag.inference_client import DEFAULT_INFERENCE_URL, encode_vectors
+    from rag.llm_backends import (
+        DEFAULT_LLM, DEFAULT_LLM_BACKEND, GENERATION_KWARGS, LLM_BACKENDS, load_generation_pipeline,
+    )
+
+
+def _name_list(value: str):
+    return tuple(name.strip() for name in value.split(",") if name.strip())
+
+
+# Only these models are ever loaded, whatever a client asks for (comma-separated)
+INFERENCE_EMBEDDING_MODELS = _name_list(os.getenv("INFERENCE_EMBEDDING_MODELS", DEFAULT_MODEL))
+INFERENCE_GENERATION_MODELS = _name_list(os.getenv("INFERENCE_GENERATION_MODELS", DEFAULT_LLM))
+# Pipeline arguments a client may choose; anything else (trust_remote_code, device, ...) is refused
+GENERATION_LOAD_KWARGS = frozenset(GENERATION_KWARGS) | {"max_new_tokens"}
+# Loaded models kept per kind; the least recently used one is dropped beyond this
+INFERENCE_MAX_MODELS = int(os.getenv("INFERENCE_MAX_MODELS", "2"))
+
+
+class ModelNotAllowed(ValueError):
+    """A request named a model, backend or pipeline argument this server does not serve"""
+
+
+class InferenceModels:
+    """
+    The models one server process owns, loaded on first use: an embedding
+    model per (model, backend) and a generation pipeline per (model, backend,
+    pipeline arguments), so every client gets the pipeline it would have
+    built in-process.
+
+    Only the configured model names, known backends and GENERATION_LOAD_KWARGS
+    are accepted, and at most `max_models` of each kind stay loaded.
+    """
+
+    def __init__(self, embedding_models=INFERENCE_EMBEDDING_MODELS, generation_models=INFERENCE_GENERATION_MODELS,
+                 max_models: int = INFERENCE_MAX_MODELS):
+        self.embedding_models = frozenset(embedding_models)
+        self.generation_models = frozenset(generation_models)
+        self.max_models = max(1, max_models)
+        self._embedders: "OrderedDict[tuple, EmbeddingService]" = OrderedDict()
+        self._generators: "OrderedDict[tuple, object]" = OrderedDict()
+        # _lock only guards the dicts and counters; each model loads under its own lock, so a slow
+        # generation pipeline load does not hold up /embed calls
+        self._lock = threading.Lock()
+        self._load_locks: Dict[tuple, threading.Lock] = {}
+        self.started_at = time.time()
+        self.requests = {"embed": 0, "generate": 0}
+
+    def _get_or_load(self, models: "OrderedDict[tuple, object]", key: tuple, load: Callable[[], object]):
+        with self._lock:
+            if key in models:
+                models.move_to_end(key)
+                return models[key]
+            load_lock = self._load_locks.setdefault((id(models), key), threading.Lock())
+        with load_lock:
+            with self._lock:
+                model = models.get(key)
+            if model is None:
+                model = load()
+            with self._lock:
+                models[key] = model
+                models.move_to_end(key)
+                while len(models) > self.max_models:
+                    evicted, _ = models.popitem(last=False)
+                    self._load_locks.pop((id(models), evicted), None)
+                    logging.info(f"Unloaded inference model {evicted[:2]} (over {self.max_models} loaded)")
+            # Callers already holding an evicted model finish with it; it is freed afterwards
+            return model
+
+    def _count(self, kind: str):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def embedder(self, model_name: str, backend: str) -> EmbeddingService:
+        if model_name not in self.embedding_models or backend not in BACKENDS:
+            raise ModelNotAllowed(f"Embedding model {model_name!r} ({backend}) is not served here")
+        # Clients look up and fill the shared chunk-embedding cache themselves
+        return self._get_or_load(self._embedders, (model_name, backend), lambda: EmbeddingService(
+            model_name, cache_path=None, backend=backend, use_server=False))
+
+    def generator(self, model_name: str, backend: str, load_kwargs: Dict):
+        if model_name not in self.generation_models or backend not in LLM_BACKENDS:
+            raise ModelNotAllowed(f"Generation model {model_name!r} ({backend}) is not served here")
+        refused = sorted(set(load_kwargs) - GENERATION_LOAD_KWARGS)
+        if refused:
+            raise ModelNotAllowed(f"Pipeline arguments not accepted: {', '.join(refused)}")
+        key = (model_name, backend, json.dumps(load_kwargs, sort_keys=True))
+        return self._get_or_load(self._generators, key,
+                                 lambda: load_generation_pipeline(model_name, backend, **load_kwargs)[0])
+
+    def embed(self, request: Dict) -> Dict:
+        self._count("embed")
+        service = self.embedder(request.get("model", DEFAULT_MODEL), request.get("backend", DEFAULT_BACKEND))
+        return {"vectors": encode_vectors(service.encode(request["texts"]))}
+
+    def generate(self, request: Dict) -> Dict:
+        self._count("generate")
+        generator = self.generator(request.get("model", DEFAULT_LLM), request.get("backend", DEFAULT_LLM_BACKEND),
+                                   request.get("load_kwargs", {}))
+        outputs = generator(request["prompts"], **request.get("kwargs", {}))
+        return {"outputs": outputs}
+
+    def health(self) -> Dict:
+        with self._lock:
+            embedders, generators = list(self._embedders), dict(self._generators)
+            requests = dict(self.requests)
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "embedding_models": [f"{name} ({backend})" for name, backend in embedders],
+            "generation_models": [f"{name} ({backend})" for name, backend, _ in generators],
+            "generation_batching": [generator.stats() for generator in generators.values()
+                                    if isinstance(generator, BatchingGenerator)],
+            "requests": requests,
+        }
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so pooled client connections are reused across calls
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # Headers and body go out in separate writes; without TCP_NODELAY each reply waits on a
+        # delayed ACK (Unix sockets have no such option)
+        self.disable_nagle_algorithm = self.request.family != socket.AF_UNIX
+        super().setup()
+
+    def _reply(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, self.server.models.health())
+        else:
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        routes = {"/embed": self.server.models.embed, "/generate": self.server.models.generate}
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path not in routes:
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            result = routes[self.path](request)
+        except ModelNotAllowed as e:
+            self._reply(403, {"error": str(e)})
+            return
+        except Exception as e:
+            logging.error(f"Inference request {self.path} failed: {e}")
+            self._reply(500, {"error": str(e)})
+            return
+        try:
+            self._reply(200, result)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client timed out and fell back to in-process inference
+            logging.info(f"Client disconnected before the {self.path} reply was sent")
+
+    def log_message(self, format, *args):
+        # client_address is empty on a Unix socket, which the default implementation does not expect
+        logging.debug(f"{self.command} {self.path}: " + format % args)
+
+
+class UnixInferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(url: str, models: Optional[InferenceModels] = None):
+    """An HTTP server for `url` (http://host:port or unix:///path) serving `models`"""
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        if os.path.exists(parsed.path):
+            os.remove(parsed.path)  # left behind by a server that did not shut down cleanly
+        server = UnixInferenceServer(parsed.path, InferenceHandler)
+    elif parsed.scheme == "http":
+        server = ThreadingHTTPServer((parsed.hostname or "127.0.0.1", parsed.port or 80), InferenceHandler)
+        server.daemon_threads = True
+    else:
+        raise ValueError(f"Unsupported inference server URL {url!r}; use http://host:port or unix:///path")
+    server.models = models or InferenceModels()
+    return server
+
+
+def serve(url: str = DEFAULT_INFERENCE_URL, preload: bool = False):
+    """Run the inference server until interrupted"""
+    if not url:
+        raise ValueError("No inference server URL given (set INFERENCE_SERVER_URL)")
+    models = InferenceModels()
+    if preload:
+        models.embedder(DEFAULT_MODEL, DEFAULT_BACKEND).encode(["warm-up"])
+        models.generator(DEFAULT_LLM, DEFAULT_LLM_BACKEND, GENERATION_KWARGS)("Hello", max_new_tokens=4)
+    server = create_server(url, models)
+    logging.info(f"Inference server listening on {url} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if urlparse(url).scheme == "unix" and os.path.exists(urlparse(url).path):
+            os.remove(urlparse(url).path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve embedding and generation models to local processes")
+    parser.add_argument("--url", default=DEFAULT_INFERENCE_URL or "http://127.0.0.1:8765")
+    parser.add_argument("--preload", action="store_true", help="Load the default models before serving")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    serve(args.url, args.preload)
@@ -0,0 +1,74 @@
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+try:
+    from .chunker import Chunk, chunk_resume
+    from ..utils.pdf_parser import extract_text_from_pdf
+    from ..utils.resume_parser import parse_resume
+except (ImportError, ValueError):
+    from rag.chunker import Chunk, chunk_resume
+    from utils.pdf_parser import extract_text_from_pdf
+    from utils.resume_parser import parse_resume
+
+
+@dataclass
+class ResumeArtifact:
+    """
+    Everything derived from one uploaded resume: its content hash, extracted
+    text, parsed sections and (on first use) the chunks to embed. Built once
+    per upload and handed to the RAG pipeline, the fallback path and the
+    session, so the PDF is read and parsed a single time.
+    """
+
+    source_path: str
+    content_hash: str
+    raw_text: str
+    parsed_data: Dict
+    timings: Dict[str, float] = field(default_factory=dict)
+    _chunks: Dict[int, List[Chunk]] = field(default_factory=dict, repr=False)
+
+    def chunks_for(self, max_tokens: Optional[int] = None) -> List[Chunk]:
+        """Section chunks sized for an embedding window (computed once per size, only on an index miss)"""
+        key = max_tokens or 0
+        if key not in self._chunks:
+            start = time.perf_counter()
+            self._chunks[key] = chunk_resume(self.raw_text, self.parsed_data, max_tokens)
+            self.timings['chunk'] = time.perf_counter() - start
+        return self._chunks[key]
+
+    @property
+    def chunks(self) -> List[Chunk]:
+        return self.chunks_for()
+
+    def summary(self) -> Dict:
+        """JSON-friendly description for job results and the session"""
+        return {
+            'resume_hash': self.content_hash,
+            'text_chars': len(self.raw_text),
+            'chunks': len(list(self._chunks.values())[-1]) if self._chunks else None,
+            'timings_ms': {name: round(seconds * 1000, 1) for name, seconds in self.timings.items()},
+        }
+
+
+def ingest_resume(pdf_path: str) -> ResumeArtifact:
+    """Read a resume PDF once: hash its bytes, extract the text and parse it"""
+    timings = {}
+    start = time.perf_counter()
+    with open(pdf_path, 'rb') as f:
+        data = f.read()
+    content_hash = hashlib.md5(data).hexdigest()
+    timings['read'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    raw_text = extract_text_from_pdf(pdf_path, data=data)
+    timings['extract'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed_data = parse_resume(raw_text)
+    timings['parse'] = time.perf_counter() - start
+
+    logging.info(f"Ingested resume {pdf_path} ({content_hash}, {len(raw_text)} chars)")
+    return ResumeArtifact(pdf_path, content_hash, raw_text, parsed_data, timings)
@@ -0,0 +1,312 @@
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import tempfile
+import importlib.util
+from typing import Dict, Optional, Tuple
+
+try:
+    from .batching import GENERATION_MAX_BATCH, BatchingGenerator
+except ImportError:
+    from rag.batching import GENERATION_MAX_BATCH, BatchingGenerator
+
+DEFAULT_LLM = "microsoft/DialoGPT-small"
+# torch: float32 as published; int8: Linear/Conv1D weights dynamically quantized to int8;
+# onnx: exported to ONNX Runtime through optimum, generating with the KV cache
+LLM_BACKENDS = ("torch", "int8", "onnx")
+DEFAULT_LLM_BACKEND = os.getenv("LLM_BACKEND", "torch")
+DEFAULT_LLM_CACHE_DIR = os.getenv(
+    "LLM_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "cache", "llm"),
+)
+
+# Pipeline arguments the career advisor generates with (DialoGPT's eos doubles as padding)
+GENERATION_KWARGS = {
+    "max_length": 120,
+    "do_sample": True,
+    "temperature": 0.7,
+    "pad_token_id": 50256,
+    "return_full_text": False,
+}
+
+# Bump when the converted artifacts change; older ones are rebuilt
+LLM_FORMAT = 1
+
+QUANTIZED_WEIGHTS = "model.int8.safetensors"
+META_FILE = "meta.json"
+
+
+def _artifact_dir(root: str, model_name: str, backend: str) -> str:
+    safe_name = re.sub(r"[^\w.-]+", "__", model_name).strip("_")
+    return os.path.join(root, f"{safe_name}__{backend}")
+
+
+def _is_current(path: str) -> bool:
+    try:
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("format") == LLM_FORMAT
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+
+
+def _build_artifact(path: str, build):
+    """Run `build(tmp_dir)` and rename the result to `path`, tolerating a concurrent builder"""
+    root = os.path.dirname(path)
+    os.makedirs(root, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=root, prefix=f".{os.path.basename(path)}.")
+    try:
+        build(tmp_path)
+        with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"format": LLM_FORMAT, "created_at": time.time()}, f)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)  # built by an older format
+        os.rename(tmp_path, path)
+    except OSError:
+        if not _is_current(path):
+            raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def _conv1d_to_linear(model):
+    """
+    GPT-2 style models use transformers' Conv1D (a transposed Linear), which
+    dynamic quantization skips; swap each for an equivalent nn.Linear.
+    """
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    for module in list(model.modules()):
+        for name, child in list(module.named_children()):
+            if isinstance(child, Conv1D):
+                in_features, out_features = child.weight.shape
+                linear = torch.nn.Linear(in_features, out_features, bias=child.bias is not None)
+                linear.weight.data = child.weight.data.t().contiguous()
+                if child.bias is not None:
+                    linear.bias.data = child.bias.data
+                setattr(module, name, linear)
+    return model
+
+
+def _quantize(model):
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+
+    model = _conv1d_to_linear(model).eval()
+    return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _quantized_skeleton(config):
+    """
+    The quantized model's structure without weights: built on the meta device
+    (no random init, no float32 allocation) with empty int8 Linears in place of
+    Conv1D/Linear, ready for _load_quantized. Much faster than initialising
+    and quantizing.
+    """
+    import torch
+    from torch.ao.nn.quantized.dynamic import Linear as DynamicQuantizedLinear
+    from transformers import AutoModelForCausalLM
+    from transformers.pytorch_utils import Conv1D
+
+    with torch.device("meta"):
+        model = AutoModelForCausalLM.from_config(config)
+    persistent = set(model.state_dict())
+    if any(name not in persistent for name, _ in model.named_buffers()):
+        # Non-persistent buffers (e.g. rotary frequencies) are not saved, so they must be initialised
+        model = AutoModelForCausalLM.from_config(config)
+    for module in list(model.modules()):
+        for name, child in list(module.named_children()):
+            if isinstance(child, Conv1D):
+                in_features, out_features = child.weight.shape
+            elif type(child) is torch.nn.Linear:
+                out_features, in_features = child.weight.shape
+            else:
+                continue
+            setattr(module, name, DynamicQuantizedLinear(in_features, out_features, bias_=child.bias is not None,
+                                                         dtype=torch.qint8))
+    return model.eval()
+
+
+def _quantized_linears(model):
+    from torch.ao.nn.quantized.dynamic import Linear as DynamicQuantizedLinear
+
+    return [(name, module) for name, module in model.named_modules() if isinstance(module, DynamicQuantizedLinear)]
+
+
+def _float_tensors(model) -> Dict:
+    """Parameters and persistent buffers outside the quantized Linears (embeddings, layer norms)"""
+    quantized = tuple(f"{name}." for name, _ in _quantized_linears(model))
+    tensors = dict(model.named_parameters())
+    tensors.update(model.named_buffers())
+    persistent = set(model.state_dict())
+    return {key: value for key, value in tensors.items() if key in persistent and not key.startswith(quantized)}
+
+
+def _save_quantized(model, path: str):
+    """
+    Store int8 weights as plain tensors (values, scales, zero points) in
+    safetensors: no pickle on load, and no pickling of quantized dtypes.
+    """
+    import torch
+    from safetensors.torch import save_file
+
+    tensors = {}
+    for name, module in _quantized_linears(model):
+        weight, bias = module._weight_bias()
+        tensors[f"{name}.weight.int8"] = weight.int_repr()
+        if weight.qscheme() == torch.per_tensor_affine:
+            tensors[f"{name}.weight.scale"] = torch.tensor([weight.q_scale()], dtype=torch.float64)
+            tensors[f"{name}.weight.zero_point"] = torch.tensor([weight.q_zero_point()], dtype=torch.int64)
+        else:
+            tensors[f"{name}.weight.scale"] = weight.q_per_channel_scales()
+            tensors[f"{name}.weight.zero_point"] = weight.q_per_channel_zero_points()
+            tensors[f"{name}.weight.axis"] = torch.tensor([weight.q_per_channel_axis()], dtype=torch.int64)
+        if bias is not None:
+            tensors[f"{name}.weight.bias"] = bias
+    for key, value in _float_tensors(model).items():
+        tensors[key] = value
+    save_file({key: value.detach().contiguous().clone() for key, value in tensors.items()}, path)
+
+
+def _load_quantized(model, path: str):
+    import torch
+    from safetensors.torch import load_file
+
+    tensors = load_file(path)
+    for name, module in _quantized_linears(model):
+        values = tensors.pop(f"{name}.weight.int8")
+        scale = tensors.pop(f"{name}.weight.scale")
+        zero_point = tensors.pop(f"{name}.weight.zero_point")
+        axis = tensors.pop(f"{name}.weight.axis", None)
+        if axis is None:
+            weight = torch._make_per_tensor_quantized_tensor(values, scale.item(), int(zero_point.item()))
+        else:
+            weight = torch._make_per_channel_quantized_tensor(values, scale, zero_point, int(axis.item()))
+        module.set_weight_bias(weight, tensors.pop(f"{name}.weight.bias", None))
+    # Quantized Linears reject load_state_dict without their packed weights, so set the rest
+    # directly; assigning (rather than copying into) the skeleton's meta tensors allocates them once
+    targets = _float_tensors(model)
+    missing, unexpected = sorted(set(targets) - set(tensors)), sorted(set(tensors) - set(targets))
+    if missing or unexpected:
+        raise ValueError(f"Quantized weights in {path} do not match the model: "
+                         f"missing {missing[:5]}, unexpected {unexpected[:5]}")
+    for key, value in tensors.items():
+        module_name, _, attr = key.rpartition(".")
+        module = model.get_submodule(module_name)
+        if attr in module._parameters:
+            module._parameters[attr] = torch.nn.Parameter(value, requires_grad=False)
+        else:
+            module._buffers[attr] = value
+    return model
+
+
+def _load_int8(model_name: str, root: str):
+    """
+    Quantize once and keep the int8 weights on disk; later loads build the
+    model skeleton from its config and read the quantized weights directly,
+    without loading (or downloading) the float32 checkpoint again.
+    """
+    import torch
+    from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+
+    path = _artifact_dir(root, model_name, "int8")
+    if not _is_current(path):
+        def build(tmp_path):
+            start = time.time()
+            model = AutoModelForCausalLM.from_pretrained(model_name, dtype=torch.float32, low_cpu_mem_usage=True)
+            model.config.save_pretrained(tmp_path)
+            model.generation_config.save_pretrained(tmp_path)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp_path)
+            _save_quantized(_quantize(model), os.path.join(tmp_path, QUANTIZED_WEIGHTS))
+            logging.info(f"Quantized {model_name} to int8 in {time.time() - start:.1f}s")
+        _build_artifact(path, build)
+
+    model = _load_quantized(_quantized_skeleton(AutoConfig.from_pretrained(path)),
+                            os.path.join(path, QUANTIZED_WEIGHTS))
+    return model.eval(), AutoTokenizer.from_pretrained(path)
+
+
+def _load_onnx(model_name: str, root: str):
+    """Export with optimum once (decoder with past key/values), then load the saved ONNX model"""
+    from optimum.onnxruntime import ORTModelForCausalLM
+    from transformers import AutoTokenizer
+
+    path = _artifact_dir(root, model_name, "onnx")
+    if not _is_current(path):
+        def build(tmp_path):
+            start = time.time()
+            ORTModelForCausalLM.from_pretrained(model_name, export=True, use_cache=True).save_pretrained(tmp_path)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp_path)
+            logging.info(f"Exported {model_name} to ONNX in {time.time() - start:.1f}s")
+        _build_artifact(path, build)
+
+    return ORTModelForCausalLM.from_pretrained(path, use_cache=True), AutoTokenizer.from_pretrained(path)
+
+
+def resolve_backend(backend: str) -> str:
+    """The backend that will actually run: onnx needs optimum, and falls back to int8 without it"""
+    if backend not in LLM_BACKENDS:
+        raise ValueError(f"Unknown LLM backend {backend!r}; expected one of {', '.join(LLM_BACKENDS)}")
+    if backend == "onnx" and (importlib.util.find_spec("optimum") is None
+                              or importlib.util.find_spec("onnxruntime") is None):
+        logging.warning("optimum[onnxruntime] is not installed; using the int8 LLM backend instead of onnx")
+        return "int8"
+    return backend
+
+
+def load_causal_lm(model_name: str = DEFAULT_LLM, backend: str = DEFAULT_LLM_BACKEND,
+                   cache_dir: Optional[str] = None) -> Tuple[object, object, str]:
+    """(model, tokenizer, backend actually used) for a causal LM on CPU"""
+    cache_dir = cache_dir or DEFAULT_LLM_CACHE_DIR
+    backend = resolve_backend(backend)
+    if backend == "int8":
+        model, tokenizer = _load_int8(model_name, cache_dir)
+    elif backend == "onnx":
+        model, tokenizer = _load_onnx(model_name, cache_dir)
+    else:
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+        model = AutoModelForCausalLM.from_pretrained(model_name, dtype=torch.float32, low_cpu_mem_usage=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return model, tokenizer, backend
+
+
+BACKEND_LABELS = {
+    "torch": "float32 (torch)",
+    "int8": "dynamic int8 quantization (torch)",
+    "onnx": "ONNX Runtime with KV cache",
+}
+
+
+def load_generation_pipeline(model_name: str = DEFAULT_LLM, backend: str = DEFAULT_LLM_BACKEND,
+                             cache_dir: Optional[str] = None, max_batch_size: int = GENERATION_MAX_BATCH,
+                             **generate_kwargs) -> Tuple[object, Dict]:
+    """
+    A transformers text-generation pipeline on CPU for the configured backend,
+    plus a description of what was loaded. `generate_kwargs` (max_length,
+    temperature, ...) are passed to the pipeline as before. Unless
+    `max_batch_size` is 1, concurrent calls are micro-batched (see batching.py).
+    """
+    from transformers import pipeline
+
+    start = time.time()
+    model, tokenizer, backend = load_causal_lm(model_name, backend, cache_dir)
+    # Batched prompts are padded on the left, so every row continues from its own last token
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    generator = pipeline("text-generation", model=model, tokenizer=tokenizer, device=-1, **generate_kwargs)
+    if max_batch_size > 1:
+        generator = BatchingGenerator(generator, max_batch_size=max_batch_size)
+    info = {
+        "model_name": model_name,
+        "backend": backend,
+        "optimization": BACKEND_LABELS[backend],
+        "max_batch_size": max_batch_size,
+        "load_seconds": round(time.time() - start, 2),
+    }
+    logging.info(f"Loaded {model_name} for generation ({info['optimization']}) in {info['load_seconds']}s")
+    return generator, info
@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_ONNX_DIR = os.getenv(
+    "ONNX_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "cache", "onnx"),
+)
+
+# Bump when the export changes; older exports are redone
+ONNX_FORMAT = 1
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+META_FILE = "meta.json"
+
+OPSET = 17
+POOLING_MODES = ("mean", "cls", "max")
+
+
+def _model_dir(root: str, model_name: str) -> str:
+    return os.path.join(root, re.sub(r"[^\w.-]+", "__", model_name).strip("_"))
+
+
+def _read_meta(path: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return meta if meta.get("format") == ONNX_FORMAT else None
+
+
+def _export(model_name: str, path: str):
+    """Export a sentence-transformers model's transformer to ONNX, with its tokenizer and pooling settings"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    start = time.time()
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer = st[0]
+    # Matched by class name: the modules moved between sentence-transformers releases
+    module_types = [type(m).__name__ for m in st]
+    pooling = next((m for m in st if type(m).__name__ == "Pooling"), None)
+    if pooling is None:
+        pooling_mode = "mean"
+    elif isinstance(getattr(pooling, "pooling_mode", None), str):
+        pooling_mode = pooling.pooling_mode
+    else:
+        pooling_mode = pooling.get_pooling_mode_str()
+    if pooling_mode not in POOLING_MODES:
+        raise ValueError(f"Unsupported pooling mode for ONNX export: {pooling_mode}")
+
+    tokenizer = transformer.tokenizer
+    sample = tokenizer(["export sample", "a longer export sample sentence"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class Encoder(torch.nn.Module):
+        # Keyword call: positional forward() arguments differ between transformers versions
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)))[0]
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            Encoder(transformer.auto_model).eval(),
+            tuple(sample[name] for name in input_names),
+            os.path.join(path, MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=OPSET,
+            dynamo=False,
+        )
+    tokenizer.save_pretrained(path)
+    if not os.path.exists(os.path.join(path, TOKENIZER_FILE)):
+        raise ValueError(f"{model_name} has no fast tokenizer; cannot run it without transformers")
+
+    meta = {
+        "format": ONNX_FORMAT,
+        "model": model_name,
+        "inputs": input_names,
+        "pooling": pooling_mode,
+        "normalize": "Normalize" in module_types,
+        "max_seq_length": st.max_seq_length,
+        "dimension": getattr(st, "get_embedding_dimension", st.get_sentence_embedding_dimension)(),
+        "pad_token_id": tokenizer.pad_token_id or 0,
+        "created_at": time.time(),
+    }
+    with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    logging.info(f"Exported {model_name} to ONNX in {time.time() - start:.1f}s")
+
+
+def _quantize(path: str):
+    """Dynamic int8 quantization of the exported weights (activations stay float)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    start = time.time()
+    fd, tmp_file = tempfile.mkstemp(dir=path, prefix=".int8.", suffix=".onnx")
+    os.close(fd)
+    try:
+        quantize_dynamic(os.path.join(path, MODEL_FILE), tmp_file, weight_type=QuantType.QInt8)
+        os.replace(tmp_file, os.path.join(path, QUANTIZED_FILE))
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    logging.info(f"Quantized {path} to int8 in {time.time() - start:.1f}s")
+
+
+def export_model(model_name: str, root: str = DEFAULT_ONNX_DIR, quantize: bool = False) -> str:
+    """
+    The directory holding `model_name` exported to ONNX, exporting it on first
+    use. Exports are built in a temporary directory and renamed into place, so
+    concurrent processes never load a half-written model.
+    """
+    path = _model_dir(root, model_name)
+    if _read_meta(path) is None:
+        os.makedirs(root, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=root, prefix=f".{os.path.basename(path)}.")
+        try:
+            _export(model_name, tmp_path)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)  # an export from an older format
+            os.rename(tmp_path, path)
+        except OSError:
+            # Lost the race to another exporter
+            if _read_meta(path) is None:
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+    if quantize and not os.path.exists(os.path.join(path, QUANTIZED_FILE)):
+        _quantize(path)
+    return path
+
+
+class OnnxSentenceEncoder:
+    """
+    Sentence embeddings from an exported model through ONNX Runtime: Rust
+    tokenizer, length-sorted batches to limit padding, then the pooling and
+    normalisation the sentence-transformers model uses. ``encode`` accepts
+    the SentenceTransformer arguments the embedding service passes.
+    """
+
+    def __init__(self, path: str, quantized: bool = False, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.path = path
+        self.meta = _read_meta(path)
+        if self.meta is None:
+            raise FileNotFoundError(f"No ONNX export in {path}")
+        self.quantized = quantized
+        self.max_seq_length = self.meta["max_seq_length"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(path, TOKENIZER_FILE))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(self.max_seq_length)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        model_file = os.path.join(path, QUANTIZED_FILE if quantized else MODEL_FILE)
+        self.session = ort.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.meta["dimension"]
+
+    def _run_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        length = max(len(e.ids) for e in encodings)
+        arrays = {
+            "input_ids": np.full((len(texts), length), self.meta["pad_token_id"], dtype=np.int64),
+            "attention_mask": np.zeros((len(texts), length), dtype=np.int64),
+            "token_type_ids": np.zeros((len(texts), length), dtype=np.int64),
+        }
+        for row, encoding in enumerate(encodings):
+            n = len(encoding.ids)
+            arrays["input_ids"][row, :n] = encoding.ids
+            arrays["attention_mask"][row, :n] = 1
+            arrays["token_type_ids"][row, :n] = encoding.type_ids
+        hidden = self.session.run(None, {name: arrays[name] for name in self.meta["inputs"]})[0]
+
+        mask = arrays["attention_mask"][:, :, None].astype(np.float32)
+        if self.meta["pooling"] == "cls":
+            pooled = hidden[:, 0]
+        elif self.meta["pooling"] == "max":
+            pooled = np.where(mask > 0, hidden, -1e9).max(axis=1)
+        else:
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.meta["normalize"]:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        embeddings = np.zeros((len(texts), self.meta["dimension"]), dtype=np.float32)
+        # Similar lengths in one batch keep padding (wasted compute) low
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            embeddings[batch] = self._run_batch([texts[i] for i in batch])
+        return embeddings[0] if single else embeddings
+
+
+def load_onnx_encoder(model_name: str, root: str = DEFAULT_ONNX_DIR, quantize: bool = False,
+                      num_threads: Optional[int] = None) -> OnnxSentenceEncoder:
+    """An ONNX Runtime encoder for `model_name`, exporting (and quantizing) it on first use"""
+    path = export_model(model_name, root, quantize)
+    return OnnxSentenceEncoder(path, quantized=quantize, num_threads=num_threads)
@@ -9,15 +9,18 @@ import logging
 # Fix relative import
 try:
     from .retriever import build_retriever
+    from .llm_backends import DEFAULT_LLM_BACKEND, GENERATION_KWARGS, load_generation_pipeline
 except ImportError:
     # Fallback for when running directly
     import sys
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from rag.retriever import build_retriever
+    from rag.llm_backends import DEFAULT_LLM_BACKEND, GENERATION_KWARGS, load_generation_pipeline
 
 class CareerRAGPipeline:
-    def __init__(self, pdf_path: str, cached_model=None, use_optimized=True):
-        self.retriever = build_retriever(pdf_path)
+    def __init__(self, pdf_path: str, cached_model=None, use_optimized=True, index_cache=None, cache_key=None,
+                 artifact=None):
+        self.retriever = build_retriever(pdf_path, index_cache=index_cache, cache_key=cache_key, artifact=artifact)
         self.memory = ConversationBufferMemory(
             memory_key="chat_history", return_messages=True
         )
@@ -41,46 +44,30 @@ class CareerRAGPipeline:
         """Setup CPU-optimized LLM for career guidance"""
         try:
             if use_optimized:
-                # Try to use ONNX-optimized model first
-                return self._setup_onnx_model()
+                # The configured LLM backend (int8 or ONNX Runtime when LLM_BACKEND asks for it)
+                return self._setup_optimized_model(DEFAULT_LLM_BACKEND)
             else:
-                # Fallback to regular optimized model
+                # Fallback to regular float32 model
                 return self._setup_regular_model()
         except Exception as e:
             logging.warning(f"Optimized model setup failed: {e}, falling back to basic model")
             return self._setup_basic_model()
     
-    def _setup_onnx_model(self):
-        """Setup ONNX-optimized model for best CPU performance"""
+    def _setup_optimized_model(self, backend):
+        """Setup DialoGPT-small on an optimized backend, falling back to float32"""
+        if backend == "torch":
+            return self._setup_regular_model()
         try:
-            # Try to use ONNX runtime if available
-            import onnxruntime as ort
-            
-            # Use DialoGPT-small for better CPU performance
-            model_name = "microsoft/DialoGPT-small"  # Only 117M params vs 345M
-            
-            qa_pipeline = pipeline(
-                "text-generation",
-                model=model_name,
-                device=-1,  # Force CPU
-                torch_dtype=torch.float32,  # Use float32 for CPU compatibility
-                max_length=120,  # Reasonable response length
-                do_sample=True,
-                temperature=0.7,
-                pad_token_id=50256,
-                # CPU optimizations
-                low_cpu_mem_usage=True,
-                return_full_text=False,
+            qa_pipeline, info = load_generation_pipeline(
+                "microsoft/DialoGPT-small",
+                backend=backend,
+                **GENERATION_KWARGS,
             )
-            
-            logging.info(f"ONNX-optimized {model_name} loaded successfully!")
+            logging.info(f"DialoGPT-small loaded with {info['optimization']}")
             return HuggingFacePipeline(pipeline=qa_pipeline)
             
-        except ImportError:
-            logging.info("ONNX runtime not available, using regular optimization")
-            return self._setup_regular_model()
         except Exception as e:
-            logging.warning(f"ONNX setup failed: {e}")
+            logging.warning(f"{backend} LLM backend setup failed: {e}")
             return self._setup_regular_model()
     
     def _setup_regular_model(self):
@@ -89,18 +76,10 @@ class CareerRAGPipeline:
             # Use DialoGPT-small for better CPU performance
             model_name = "microsoft/DialoGPT-small"
             
-            qa_pipeline = pipeline(
-                "text-generation",
-                model=model_name,
-                device=-1,  # Force CPU
-                torch_dtype=torch.float32,  # Use float32 for CPU
-                max_length=120,
-                do_sample=True,
-                temperature=0.7,
-                pad_token_id=50256,
-                # CPU memory optimizations
-                low_cpu_mem_usage=True,
-                return_full_text=False,
+            qa_pipeline, _ = load_generation_pipeline(
+                model_name,
+                backend="torch",  # float32 weights as published
+                **GENERATION_KWARGS,
             )
             
             logging.info(f"CPU-optimized {model_name} loaded successfully!")
@@ -1,6 +1,4 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.chains import RetrievalQA
 from langchain_community.llms import HuggingFacePipeline
 from transformers import pipeline
@@ -8,46 +6,32 @@ import os
 
 # Fix relative imports
 try:
-    from .vector_store import create_vector_store
-    from ..utils.pdf_parser import extract_text_from_pdf
-    from ..utils.resume_parser import parse_resume
+    from .vector_store import create_vector_store, HuggingFaceEmbeddings
+    from .ingestion import ingest_resume
+    from .chunker import chunk_token_budget
 except ImportError:
     # Fallback for when running directly
     import sys
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from rag.vector_store import create_vector_store
-    from utils.pdf_parser import extract_text_from_pdf
-    from utils.resume_parser import parse_resume
+    from rag.vector_store import create_vector_store, HuggingFaceEmbeddings
+    from rag.ingestion import ingest_resume
+    from rag.chunker import chunk_token_budget
 
-def build_retriever(pdf_path: str):
-    """Build a retriever from a PDF file"""
+def build_retriever(pdf_path: str, index_cache=None, cache_key: str = None, artifact=None):
+    """
+    Build a retriever from a PDF file, reusing a saved index for the same resume content.
+    Pass the upload's ResumeArtifact to avoid extracting and parsing the PDF again.
+    """
     try:
-        # Extract text from PDF
-        raw_text = extract_text_from_pdf(pdf_path)
+        embeddings = HuggingFaceEmbeddings()
+        vector_store = None
+        if index_cache is not None and cache_key:
+            vector_store = index_cache.load(cache_key, embeddings, embeddings.cache_name)
         
-        # Parse resume for structured data
-        resume_data = parse_resume(raw_text)
-        
-        # Create text chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-        )
-        
-        # Combine all text data
-        all_text = raw_text + "\n\n" + "\n".join(resume_data.get("skills", []))
-        if resume_data.get("projects"):
-            all_text += "\n\n" + "\n".join(resume_data["projects"])
-        if resume_data.get("education"):
-            all_text += "\n\n" + "\n".join(resume_data["education"])
-        if resume_data.get("experience"):
-            all_text += "\n\n" + "\n".join(resume_data["experience"])
-        
-        chunks = text_splitter.split_text(all_text)
-        
-        # Create vector store
-        vector_store = create_vector_store(chunks)
+        if vector_store is None:
+            vector_store = build_vector_store(pdf_path, embeddings, artifact=artifact)
+            if index_cache is not None and cache_key:
+                index_cache.save(cache_key, vector_store, embeddings.cache_name)
         
         # Build retriever
         retriever = vector_store.as_retriever(
@@ -62,6 +46,15 @@ def build_retriever(pdf_path: str):
         # Return a simple fallback retriever
         return None
 
+def build_vector_store(pdf_path: str, embeddings=None, artifact=None):
+    """Embed a resume's chunks into a FAISS vector store, ingesting the PDF only if no artifact is given"""
+    if artifact is None:
+        artifact = ingest_resume(pdf_path)
+    embeddings = embeddings or HuggingFaceEmbeddings()
+    chunks = artifact.chunks_for(chunk_token_budget(getattr(embeddings, 'model_name', None)))
+    return create_vector_store([chunk.text for chunk in chunks], embeddings,
+                               metadatas=[chunk.metadata for chunk in chunks])
+
 def build_qa_chain(retriever):
     """Build a question-answering chain"""
     try:
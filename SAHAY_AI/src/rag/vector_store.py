@@ -1,20 +1,36 @@
-from sentence_transformers import SentenceTransformer
 from langchain_community.vectorstores import FAISS
 from langchain.embeddings.base import Embeddings
 
+try:
+    from .embedding_service import get_embedding_service, DEFAULT_MODEL, DEFAULT_BACKEND
+except ImportError:
+    from rag.embedding_service import get_embedding_service, DEFAULT_MODEL, DEFAULT_BACKEND
+
 
 class HuggingFaceEmbeddings(Embeddings):
-    def __init__(self, model_name="all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
+    """LangChain adapter over the shared embedding service (one model per process, cached chunks, torch or ONNX)"""
+
+    def __init__(self, model_name=DEFAULT_MODEL, backend=DEFAULT_BACKEND):
+        self.model_name = model_name
+        self.service = get_embedding_service(model_name, backend)
+
+    @property
+    def model(self):
+        return self.service.model
+
+    @property
+    def cache_name(self):
+        """Model plus backend variant, for keying stored vectors"""
+        return self.service.cache_name
 
     def embed_documents(self, texts):
-        return self.model.encode(texts, convert_to_numpy=True).tolist()
+        return self.service.embed(list(texts)).tolist()
 
     def embed_query(self, text):
-        return self.model.encode([text], convert_to_numpy=True)[0].tolist()
+        return self.service.embed_query(text).tolist()
 
 
-def create_vector_store(text_chunks):
-    embeddings = HuggingFaceEmbeddings()
-    vector_store = FAISS.from_texts(text_chunks, embedding=embeddings)
+def create_vector_store(text_chunks, embeddings=None, metadatas=None):
+    embeddings = embeddings or HuggingFaceEmbeddings()
+    vector_store = FAISS.from_texts(text_chunks, embedding=embeddings, metadatas=metadatas)
     return vector_store
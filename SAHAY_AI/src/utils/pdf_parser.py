@@ -4,15 +4,16 @@ from typing import List, Dict, Tuple
 import logging
 
 
-def extract_text_from_pdf(file_path: str) -> str:
+def extract_text_from_pdf(file_path: str, data: bytes = None) -> str:
     """
     Extract text from PDF using PyMuPDF with enhanced capabilities.
     Returns clean, structured text with better formatting preservation.
+    Pass `data` when the file's bytes are already in memory to skip re-reading it.
     """
     text = ""
     try:
         # Open PDF with PyMuPDF
-        doc = fitz.open(file_path)
+        doc = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(file_path)
         
         for page_num in range(len(doc)):
             page = doc.load_page(page_num)
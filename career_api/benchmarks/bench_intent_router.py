@@ -0,0 +1,106 @@
+"""
+Benchmark: compiled intent router vs. the original per-question scans
+
+Builds synthetic reference data with thousands of roles and cities, checks
+that both approaches route every question the same way, then times them.
+
+Usage (from career_api/):
+    python benchmarks/bench_intent_router.py --roles 5000 --regions 5000 --questions 2000
+"""
+
+import sys
+import time
+import random
+import argparse
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.intent_router import IntentRouter, CHAT_TOPICS, LOCATION_KEYWORDS  # noqa: E402
+
+WORDS = [
+    "urban", "smart", "grid", "water", "traffic", "energy", "cloud", "edge", "sensor", "policy",
+    "climate", "transit", "housing", "waste", "metro", "digital", "civic", "safety", "health", "logistics",
+]
+TITLES = ["Engineer", "Analyst", "Planner", "Architect", "Manager", "Scientist", "Specialist", "Developer"]
+FILLER = ["how", "do", "i", "become", "a", "what", "is", "the", "best", "in", "for", "salary", "me", "tell", "about"]
+
+
+def synthetic_reference(n_roles: int, n_regions: int, seed: int):
+    rng = random.Random(seed)
+    roles = {}
+    while len(roles) < n_roles:
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(TITLES)} {len(roles)}"
+        roles[name] = {"requirements": [], "description": ""}
+    regions = [
+        {"city": f"{rng.choice(WORDS).title()}ville{i}", "country": f"Country{i % 200}"}
+        for i in range(n_regions)
+    ]
+    return roles, regions
+
+
+def synthetic_questions(roles, regions, n: int, seed: int):
+    rng = random.Random(seed + 1)
+    role_names, questions = list(roles), []
+    for _ in range(n):
+        parts = rng.sample(FILLER, 6)
+        if rng.random() < 0.5:
+            parts.append(rng.choice(role_names))
+        if rng.random() < 0.5:
+            parts.append(rng.choice(regions)["city"])
+        if rng.random() < 0.3:
+            parts.append(rng.choice(CHAT_TOPICS + ["skill gap", "career path"]))
+        rng.shuffle(parts)
+        questions.append(" ".join(parts).lower())
+    return questions
+
+
+def naive_route(question, roles, regions):
+    """The original generate_career_advice lookups."""
+    allowed = any(topic in question for topic in CHAT_TOPICS) or \
+        any(role.lower() in question for role in roles.keys())
+    role = next((k for k in roles if k.lower() in question), None)
+    is_location_query = any(kw in question for kw in LOCATION_KEYWORDS)
+    region = next((r for r in regions if r["city"].lower() in question or r["country"].lower() in question), None)
+    return allowed, role, region, is_location_query
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", type=int, default=5000)
+    parser.add_argument("--regions", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    roles, regions = synthetic_reference(args.roles, args.regions, args.seed)
+    questions = synthetic_questions(roles, regions, args.questions, args.seed)
+
+    start = time.perf_counter()
+    router = IntentRouter(roles, regions)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    naive = [naive_route(q, roles, regions) for q in questions]
+    naive_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    routed = [router.route(q) for q in questions]
+    router_s = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for n, r in zip(naive, routed)
+        if n != (r.allowed, r.role, r.region, r.is_location_query)
+    )
+
+    print(f"roles={args.roles} regions={args.regions} questions={args.questions}")
+    print(f"router build:   {build_ms:9.1f} ms ({len(router.patterns)} patterns)")
+    print(f"naive scans:    {naive_s / len(questions) * 1e6:9.1f} us/question")
+    print(f"compiled route: {router_s / len(questions) * 1e6:9.1f} us/question")
+    print(f"speedup:        {naive_s / router_s:9.1f}x")
+    print(f"mismatches:     {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Benchmark: memory of private vs. shared (memory-mapped) scoring tables
+
+Spawns N independent worker processes (as uvicorn --workers or Django would)
+that each build a SkillIndex over synthetic reference data, touch every table
+page, and report their PSS. With a SharedTableStore the tables are mapped from
+one published file, so total memory should stay roughly flat as N grows.
+
+Usage (from career_api/):
+    python benchmarks/bench_shared_tables.py --roles 2000 --terms 8000 --workers 1 2 4
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.skill_index import SkillIndex, TABLE_NAMES  # noqa: E402
+from utils.shared_tables import SharedTableStore  # noqa: E402
+
+SECTORS = ["Software", "Data", "Infrastructure", "Sustainability", "Mobility"]
+
+
+def synthetic_reference(n_roles: int, n_terms: int, n_regions: int, seed: int):
+    rng = random.Random(seed)
+    terms = [f"skill {i}" for i in range(n_terms)]
+    roles = {
+        f"Role {i}": {"requirements": rng.sample(terms, 12), "description": "", "next_steps": []}
+        for i in range(n_roles)
+    }
+    sector_keywords = {s: [f"{s.lower()} kw {k}" for k in range(8)] for s in SECTORS}
+    regions = [{
+        "city": f"City {g}", "country": f"Country {g}", "top_skills": rng.sample(terms, 6),
+        "avg_salary_usd": rng.randint(20000, 150000), "cost_of_living_index": rng.uniform(0.3, 1.5),
+        "remote_friendly": rng.random() < 0.5,
+        "sector_scores": {s: {"demand": rng.randint(50, 99), "supply": rng.randint(40, 95)} for s in SECTORS},
+    } for g in range(n_regions)]
+    return roles, regions, sector_keywords
+
+
+def pss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    return 0
+
+
+def worker(args, table_dir, ready, done):
+    roles, regions, sector_keywords = synthetic_reference(args.roles, args.terms, args.regions, args.seed)
+    store = SharedTableStore(table_dir) if table_dir else None
+    index = SkillIndex(roles, regions, sector_keywords, table_store=store)
+    del roles, regions, sector_keywords
+    # Touch every page of every table, as scoring eventually would
+    for name in TABLE_NAMES:
+        float(getattr(index, name).sum())
+    ready.put(os.getpid())
+    done.wait()
+
+
+def run(n: int, table_dir, args) -> float:
+    ctx = multiprocessing.get_context("spawn")
+    ready, done = ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=worker, args=(args, table_dir, ready, done)) for _ in range(n)]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    pids = [ready.get() for _ in procs]
+    elapsed = time.perf_counter() - start
+    total = sum(pss_kb(pid) for pid in pids) / 1024
+    done.set()
+    for p in procs:
+        p.join()
+    return total, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", type=int, default=2000)
+    parser.add_argument("--terms", type=int, default=8000)
+    parser.add_argument("--regions", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    table_mb = (args.terms * args.roles + args.terms * args.regions) * 8 / 1024 / 1024
+    print(f"roles={args.roles} terms={args.terms} regions={args.regions} (~{table_mb:.0f} MB of tables)")
+    print(f"{'workers':>7} {'private PSS':>12} {'shared PSS':>12} {'private start':>14} {'shared start':>13}")
+
+    table_dir = tempfile.mkdtemp(prefix="skill-tables-")
+    try:
+        # Publish once so every shared run measures mapping, not compiling
+        run(1, table_dir, args)
+        for n in sorted(set(args.workers)):
+            private_mb, private_s = run(n, None, args)
+            shared_mb, shared_s = run(n, table_dir, args)
+            print(f"{n:>7} {private_mb:>10.0f}MB {shared_mb:>10.0f}MB {private_s:>13.2f}s {shared_s:>12.2f}s")
+    finally:
+        shutil.rmtree(table_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
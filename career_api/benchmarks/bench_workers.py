@@ -0,0 +1,156 @@
+"""
+Benchmark: memory per worker and throughput scaling of serve.py
+
+For each worker count, starts the pre-forking launcher, reads every worker's
+RSS / PSS / USS from /proc (Linux only), then drives POST /score-batch from
+several client processes and reports requests per second.
+
+Usage (from career_api/):
+    python benchmarks/bench_workers.py --workers 1 2 4 --seconds 10
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import subprocess
+import http.client
+import multiprocessing
+
+CAREER_API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SKILLS = ["python", "gis", "sql", "machine learning", "react", "iot", "urban planning", "data analysis",
+          "cloud", "docker", "power bi", "sustainability", "autocad", "statistics", "java"]
+
+
+def request_body(candidates: int) -> bytes:
+    rows = [{"id": str(i), "skills": [SKILLS[(i + j) % len(SKILLS)] for j in range(1 + i % 6)]}
+            for i in range(candidates)]
+    return json.dumps({"candidates": rows, "top_k": 3}).encode("utf-8")
+
+
+def worker_pids(master_pid: int):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def memory_kb(pid: int):
+    """(rss, pss, uss) in kB from smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields.get("Rss", 0), fields.get("Pss", 0), uss
+
+
+def wait_ready(port: int, timeout: float = 120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def client(port: int, body: bytes, seconds: float, results):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    done = errors = 0
+    end = time.time() + seconds
+    while time.time() < end:
+        try:
+            conn.request("POST", "/score-batch", body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status == 200:
+                done += 1
+            else:
+                errors += 1
+        except OSError:
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    results.put((done, errors))
+
+
+def run(workers: int, args) -> dict:
+    env = dict(os.environ, REFERENCE_DATA_WATCH_SECONDS="0")
+    master = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--port", str(args.port),
+         "--no-access-log", "--log-level", "warning"],
+        cwd=CAREER_API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_ready(args.port):
+            raise RuntimeError("server did not start")
+        time.sleep(1)  # let every worker finish starting
+
+        body = request_body(args.candidates)
+        # Warm each worker's term cache before measuring memory
+        warm = http.client.HTTPConnection("127.0.0.1", args.port, timeout=30)
+        for _ in range(workers * 4):
+            warm.request("POST", "/score-batch", body=body, headers={"Content-Type": "application/json"})
+            warm.getresponse().read()
+
+        pids = worker_pids(master.pid)
+        memory = [memory_kb(pid) for pid in pids]
+        master_rss = memory_kb(master.pid)[0]
+
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=client, args=(args.port, body, args.seconds, results))
+                   for _ in range(args.clients_per_worker * workers)]
+        for p in clients:
+            p.start()
+        totals = [results.get() for _ in clients]
+        for p in clients:
+            p.join()
+
+        done = sum(t[0] for t in totals)
+        return {
+            "workers": len(pids),
+            "master_rss_mb": master_rss / 1024,
+            "rss_mb": sum(m[0] for m in memory) / len(memory) / 1024,
+            "pss_mb": sum(m[1] for m in memory) / len(memory) / 1024,
+            "uss_mb": sum(m[2] for m in memory) / len(memory) / 1024,
+            "rps": done / args.seconds,
+            "errors": sum(t[1] for t in totals),
+        }
+    finally:
+        master.send_signal(signal.SIGTERM)
+        try:
+            master.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            master.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--candidates", type=int, default=50, help="Candidates per /score-batch request")
+    parser.add_argument("--clients-per-worker", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'master RSS':>11} {'RSS/wkr':>9} {'PSS/wkr':>9} {'USS/wkr':>9} {'req/s':>9} {'scaling':>8}")
+    baseline = None
+    for n in sorted(set(args.workers)):
+        r = run(n, args)
+        baseline = baseline or r["rps"] / r["workers"]
+        print(f"{r['workers']:>7} {r['master_rss_mb']:>9.1f}MB {r['rss_mb']:>7.1f}MB {r['pss_mb']:>7.1f}MB "
+              f"{r['uss_mb']:>7.1f}MB {r['rps']:>9.1f} {r['rps'] / baseline:>7.2f}x"
+              + (f"  ({r['errors']} errors)" if r["errors"] else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
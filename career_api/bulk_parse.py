@@ -0,0 +1,204 @@
+"""
+Career API - Bulk resume parsing across nodes
+
+Spreads PDF text extraction and resume parsing over any number of machines
+that share one mounted directory. The queue is plain files (see
+utils/fs_queue.py), so no broker service is needed: every node runs
+`work` against the same --queue directory and the results are merged into
+a single JSONL file at the end.
+
+Usage:
+    python bulk_parse.py --queue /mnt/shared/q enqueue /mnt/shared/resumes
+    python bulk_parse.py --queue /mnt/shared/q work          # on every node
+    python bulk_parse.py --queue /mnt/shared/q status
+    python bulk_parse.py --queue /mnt/shared/q merge --out parsed.jsonl
+
+    # Local rehearsal: N processes act as nodes, one is killed mid-run
+    python bulk_parse.py --queue /tmp/q simulate --nodes 3 --kill-one ./resumes
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import argparse
+import multiprocessing
+from typing import Dict, List
+
+from utils.fs_queue import FileQueue, default_worker_id
+
+logger = logging.getLogger("career_api.bulk_parse")
+
+
+def find_pdfs(paths: List[str]) -> List[str]:
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                found.extend(os.path.join(dirpath, name) for name in filenames if name.lower().endswith(".pdf"))
+        elif path.lower().endswith(".pdf"):
+            found.append(path)
+    return sorted(os.path.abspath(p) for p in found)
+
+
+def parse_task(item: Dict) -> Dict:
+    """Handler for one queued resume: extract, parse and score it."""
+    from utils.pdf_parser import extract_text_from_pdf
+    from utils.resume_parser import parse_resume, analyze_resume_quality
+
+    start = time.time()
+    raw_text = extract_text_from_pdf(item["path"])
+    if not raw_text:
+        raise ValueError("Could not extract text from PDF")
+    parsed = parse_resume(raw_text)
+    return {
+        "parsed_data": parsed,
+        "quality_analysis": analyze_resume_quality(parsed),
+        "text_length": len(raw_text),
+        "seconds": round(time.time() - start, 3),
+    }
+
+
+def make_queue(args, worker_id: str = None) -> FileQueue:
+    return FileQueue(args.queue, worker_id=worker_id, lease_timeout=args.lease_timeout,
+                     heartbeat_interval=args.heartbeat_interval, max_attempts=args.max_attempts)
+
+
+def run_node(args, worker_id: str) -> int:
+    queue = make_queue(args, worker_id)
+    logger.info(f"Node {queue.worker_id} working on {args.queue}")
+    completed = queue.run(parse_task, idle_exit=not getattr(args, "forever", False), poll_interval=args.poll_interval)
+    logger.info(f"Node {queue.worker_id} completed {completed} tasks")
+    return completed
+
+
+def _simulated_node(args, worker_id: str, delay: float):
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [{worker_id}] %(message)s")
+    if delay:
+        # Slow the node down so the kill lands while it holds a lease
+        import utils.pdf_parser as pdf_parser
+        extract = pdf_parser.extract_text_from_pdf
+
+        def slow_extract(path):
+            time.sleep(delay)
+            return extract(path)
+        pdf_parser.extract_text_from_pdf = slow_extract
+    run_node(args, worker_id)
+
+
+# ============ Commands ============
+
+def cmd_enqueue(args) -> int:
+    pdfs = find_pdfs(args.paths)
+    added = make_queue(args).enqueue({"path": path} for path in pdfs)
+    print(f"Queued {added} of {len(pdfs)} PDFs ({len(pdfs) - added} already queued)")
+    return 0
+
+
+def cmd_work(args) -> int:
+    run_node(args, args.worker_id or default_worker_id())
+    return 0
+
+
+def cmd_recover(args) -> int:
+    queue = make_queue(args, f"recover-{default_worker_id()}")
+    print(f"Returned {queue.recover_stale()} stale leases to pending")
+    queue.stop_heartbeat()
+    return 0
+
+
+def cmd_status(args) -> int:
+    queue = make_queue(args, f"status-{default_worker_id()}")
+    for state, count in queue.status().items():
+        print(f"{state:>8}: {count}")
+    for task in queue.failed_tasks():
+        print(f"  failed {task['item'].get('path')}: {task.get('last_error')}")
+    return 0
+
+
+def cmd_merge(args) -> int:
+    count = make_queue(args, f"merge-{default_worker_id()}").merge_results(args.out)
+    print(f"Wrote {count} results to {args.out}")
+    return 0
+
+
+def cmd_simulate(args) -> int:
+    """Run several local processes as if they were separate nodes."""
+    queue = make_queue(args, "simulate")
+    added = queue.enqueue({"path": path} for path in find_pdfs(args.paths))
+    print(f"Queued {added} PDFs for {args.nodes} simulated nodes")
+
+    ctx = multiprocessing.get_context("spawn")
+    start = time.time()
+    nodes = []
+    for i in range(args.nodes):
+        delay = args.slow if (args.kill_one and i == 0) else 0
+        proc = ctx.Process(target=_simulated_node, args=(args, f"node{i}", delay))
+        proc.start()
+        nodes.append(proc)
+
+    if args.kill_one:
+        # Wait until node0 holds a lease, then kill it without any cleanup
+        deadline = time.time() + 60
+        while time.time() < deadline and not any("__node0" in n for n in os.listdir(os.path.join(args.queue, "leased"))):
+            time.sleep(0.05)
+        os.kill(nodes[0].pid, signal.SIGKILL)
+        print(f"Killed node0 (pid {nodes[0].pid}) while it held a lease")
+
+    for proc in nodes:
+        proc.join()
+
+    out = args.out or os.path.join(args.queue, "merged.jsonl")
+    merged = queue.merge_results(out)
+    status = queue.status()
+    print(f"Finished in {time.time() - start:.1f}s: {status}")
+    print(f"Merged {merged} results into {out}")
+    return 0 if status["pending"] == 0 and status["leased"] == 0 else 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk resume parsing over a shared-directory work queue")
+    parser.add_argument("--queue", default=os.getenv("BULK_QUEUE_DIR", "bulk_queue"),
+                        help="Queue directory shared by all nodes")
+    parser.add_argument("--lease-timeout", type=float, default=float(os.getenv("BULK_LEASE_TIMEOUT", "60")),
+                        help="Seconds without a heartbeat before a node's leases are reclaimed")
+    parser.add_argument("--heartbeat-interval", type=float, default=float(os.getenv("BULK_HEARTBEAT_INTERVAL", "5")))
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue PDFs (files or directories)")
+    enqueue.add_argument("paths", nargs="+")
+    enqueue.set_defaults(func=cmd_enqueue)
+
+    work = commands.add_parser("work", help="Process tasks until the queue drains")
+    work.add_argument("--worker-id", help="Node name (default: hostname-pid)")
+    work.add_argument("--forever", action="store_true", help="Keep polling for new tasks instead of exiting")
+    work.set_defaults(func=cmd_work)
+
+    commands.add_parser("recover", help="Return stale leases to pending").set_defaults(func=cmd_recover)
+    commands.add_parser("status", help="Show task counts").set_defaults(func=cmd_status)
+
+    merge = commands.add_parser("merge", help="Merge every node's results into one JSONL file")
+    merge.add_argument("--out", required=True)
+    merge.set_defaults(func=cmd_merge)
+
+    simulate = commands.add_parser("simulate", help="Run local processes as pretend nodes")
+    simulate.add_argument("paths", nargs="+")
+    simulate.add_argument("--nodes", type=int, default=3)
+    simulate.add_argument("--kill-one", action="store_true", help="SIGKILL one node mid-task to exercise recovery")
+    simulate.add_argument("--slow", type=float, default=2.0, help="Per-task delay for the node that gets killed")
+    simulate.add_argument("--out")
+    simulate.set_defaults(func=cmd_simulate)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
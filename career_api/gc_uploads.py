@@ -0,0 +1,33 @@
+"""
+Career API - Upload garbage collection
+
+Deletes uploaded resume blobs that no session or queued job references
+and that nobody has uploaded again within the retention window. Safe to
+run while the server is up, e.g. from cron:
+
+Usage:
+    python gc_uploads.py --retention-days 7
+"""
+
+import sys
+import logging
+import argparse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reclaim unreferenced resume uploads")
+    parser.add_argument("--retention-days", type=float,
+                        help="Keep unreferenced blobs this long (default: UPLOAD_RETENTION_SECONDS)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    import main as app_main
+    retention = app_main.UPLOAD_RETENTION_SECONDS if args.retention_days is None else int(args.retention_days * 86400)
+    stats = app_main.collect_upload_garbage(retention)
+    print(f"Checked {stats['blobs']} blobs: deleted {stats['deleted']} "
+          f"({stats['freed_bytes'] / 1024:.0f} KB), dropped {stats['dropped_references']} stale references")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
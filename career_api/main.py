@@ -3,21 +3,40 @@ Career API - FastAPI Microservice
 Provides resume parsing and AI-powered career guidance
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 import os
-import shutil
+import sys
+import json
 import logging
+import threading
+import numpy as np
+from collections import OrderedDict
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Modules shared with the Django app live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # Import our modules
 from utils.pdf_parser import extract_text_from_pdf
 from utils.resume_parser import parse_resume, analyze_resume_quality
+from utils.peer_store import PeerStore
+from utils.skill_embeddings import SkillEmbeddingIndex, SEMANTIC_AVAILABLE
+from utils.reference_data import ReferenceDataStore, ReferenceSnapshot
+from utils.skill_index import SkillIndex
+from utils.shared_tables import SharedTableStore
+from career_common.job_queue import JobQueue, JobContext, new_job_id
+from career_common.blob_store import BlobStore, is_digest
+from utils.upload_stream import store_pdf_upload, UploadRejected
+from utils.session_store import SessionStore, create_session_backend, new_session_token
 
 # Create FastAPI app
 app = FastAPI(
@@ -33,18 +52,67 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Session-Token"],
 )
 
-# Create uploads directory
+# Uploads are stored once per distinct content (uploads/blobs/<aa>/<sha256>.pdf)
 UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+UPLOAD_RETENTION_SECONDS = int(os.getenv("UPLOAD_RETENTION_SECONDS", str(7 * 86400)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+upload_store = BlobStore(UPLOAD_DIR, suffix=".pdf")
+
+# Bundled reference data and local databases
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# ============ Sessions ============
+
+# Each user's resume lives in their own session, identified by the
+# career_session cookie or an X-Session-Token header. Sessions are cached per
+# worker and shared between workers through the configured backend.
+SESSION_COOKIE = "career_session"
+SESSION_HEADER = "X-Session-Token"
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(DATA_DIR, "sessions.db"))
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "86400"))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+SESSION_MAX_ENTRY_BYTES = int(os.getenv("SESSION_MAX_ENTRY_BYTES", str(256 * 1024)))
+SESSION_COOKIE_SECURE = os.getenv("SESSION_COOKIE_SECURE", "false").lower() == "true"
+
+session_store = SessionStore(
+    create_session_backend(SESSION_BACKEND, sqlite_path=SESSION_DB_PATH, redis_url=os.getenv("REDIS_URL")),
+    ttl_seconds=SESSION_TTL_SECONDS,
+    max_entries=SESSION_CACHE_SIZE,
+    max_entry_bytes=SESSION_MAX_ENTRY_BYTES,
+)
+
+
+def session_token(http_request: Request) -> Optional[str]:
+    return http_request.headers.get(SESSION_HEADER) or http_request.cookies.get(SESSION_COOKIE)
+
+
+def get_session(http_request: Request) -> Dict:
+    """Session data for the caller (empty if they have no session yet)"""
+    return session_store.get(session_token(http_request))
+
+
+def ensure_session(http_request: Request, response: Response) -> str:
+    """The caller's session token, issuing a new one (cookie + header) if needed"""
+    token = session_token(http_request)
+    # Only tokens this server issued are kept; adopting any well-formed token would allow session fixation
+    if not session_store.exists(token):
+        token = new_session_token()
+    response.set_cookie(SESSION_COOKIE, token, max_age=SESSION_TTL_SECONDS, httponly=True,
+                        samesite="lax", secure=SESSION_COOKIE_SECURE)
+    response.headers[SESSION_HEADER] = token
+    return token
+
+
+def save_session(http_request: Request, response: Response, **fields) -> str:
+    """Merge fields into the caller's session, starting a new one if needed"""
+    token = ensure_session(http_request, response)
+    session_store.update(token, **fields)
+    return token
 
-# Store current session data
-current_session = {
-    "resume_path": None,
-    "resume_data": None,
-    "raw_text": None
-}
 
 # Pydantic models
 class ChatRequest(BaseModel):
@@ -57,236 +125,98 @@ class CareerAdviceResponse(BaseModel):
     answer: str
     rag_used: bool = False
 
-# ============ Global Definitions ============
-
-ROLE_DEFINITIONS = {
-    "Urban Data Scientist": {
-        "requirements": ["python", "machine learning", "data science", "statistics", "data analysis", "pandas", "numpy"],
-        "description": "Apply data science and ML to solve urban challenges and improve city services",
-        "next_steps": ["Learn GIS & Spatial Analysis", "Study Urban Analytics", "Build city data projects"]
-    },
-    "GIS Analyst": {
-        "requirements": ["gis", "spatial analysis", "python", "arcgis", "qgis", "remote sensing", "cartography", "data visualization"],
-        "description": "Analyze spatial data to support urban planning and city operations",
-        "next_steps": ["Master ArcGIS/QGIS", "Learn Remote Sensing", "Study Urban Geography"]
-    },
-    "Smart City Analyst": {
-        "requirements": ["data analysis", "excel", "sql", "tableau", "power bi", "visualization", "data analytics", "python", "gis", "urban planning", "iot", "statistics", "public policy"],
-        "description": "Analyze city data to drive smarter urban planning and policy decisions",
-        "next_steps": ["Learn GIS Tools", "Study Urban Planning Basics", "Understand IoT & Sensors"]
-    },
-    "Transportation Systems Analyst": {
-        "requirements": ["transportation", "traffic", "mobility", "logistics", "simulation", "urban mobility", "traffic modeling", "python", "gis"],
-        "description": "Optimize transportation networks and urban mobility systems",
-        "next_steps": ["Learn Traffic Modeling", "Study Urban Mobility Analytics", "Master Simulation Tools"]
-    },
-    "IoT Engineer (Smart Cities)": {
-        "requirements": ["iot", "sensors", "embedded systems", "networking", "hardware", "mqtt", "cloud platforms", "data streaming", "python"],
-        "description": "Design and deploy IoT sensor networks for smart city infrastructure",
-        "next_steps": ["Learn MQTT & Data Streaming", "Study Cloud Platforms", "Build Smart Sensor Projects"]
-    },
-    "Smart Infrastructure Engineer": {
-        "requirements": ["engineering", "infrastructure", "systems", "electrical", "civil", "smart grid", "iot", "sensors", "networking", "cloud computing"],
-        "description": "Design and manage smart city infrastructure and connected systems",
-        "next_steps": ["Learn IoT & Sensors", "Study Smart Grid Technology", "Understand City Networks"]
-    },
-    "Sustainability Analyst": {
-        "requirements": ["sustainability", "environment", "climate", "carbon", "green", "renewable", "esg", "sustainability metrics", "data analysis"],
-        "description": "Measure and improve city sustainability and environmental impact",
-        "next_steps": ["Learn Sustainability Metrics", "Study Energy Optimization", "Understand Carbon Accounting"]
-    },
-    "Civic Tech Developer": {
-        "requirements": ["python", "javascript", "web", "api", "programming", "software", "react", "node.js", "api development", "open data", "civic engagement"],
-        "description": "Build applications that improve civic engagement and city services",
-        "next_steps": ["Work with Open Data APIs", "Learn Civic Design", "Build Community Tech Projects"]
-    },
-    "Urban AI Engineer": {
-        "requirements": ["machine learning", "deep learning", "ai", "tensorflow", "pytorch", "computer vision", "neural networks", "urban analytics", "python", "data engineering"],
-        "description": "Apply AI and computer vision to urban challenges like traffic and safety",
-        "next_steps": ["Study Computer Vision", "Learn Urban Analytics", "Build Smart City AI Models"]
-    },
-    "Energy Systems Engineer": {
-        "requirements": ["energy", "power", "electrical", "grid", "renewable", "smart grid", "energy optimization", "iot", "data analysis"],
-        "description": "Design and optimize smart grid and city energy systems",
-        "next_steps": ["Learn Smart Grid Tech", "Study Energy Optimization", "Understand Renewable Integration"]
-    }
-}
+# ============ Skill Matching ============
 
-# --- Global Skill Arbitrage Data (Simulated) ---
-# We define demand/supply per sector to make recommendations dynamic
-REGIONAL_DEMAND_DATA = [
-    {
-        "region": "Southeast Asia",
-        "country": "Singapore",
-        "city": "Global Hub",
-        "flag": "🇸🇬",
-        "sector_scores": {
-            "Data Science": {"demand": 90, "supply": 40},
-            "IoT": {"demand": 85, "supply": 35},
-            "Smart Grid": {"demand": 80, "supply": 45},
-            "Sustainability": {"demand": 70, "supply": 50},
-            "Software": {"demand": 75, "supply": 60}
-        },
-        "top_skills": ["Urban Data Analytics", "IoT", "Smart Grid", "GIS", "Python"],
-        "avg_salary_usd": 78000,
-        "cost_of_living_index": 70,
-        "remote_friendly": True,
-        "visa_ease": "High",
-        "description": "Singapore is a global leader in Smart Nation initiatives, prioritizing Data and IoT."
-    },
-    {
-        "region": "Europe",
-        "country": "Germany",
-        "city": "Berlin/Munich",
-        "flag": "🇩🇪",
-        "sector_scores": {
-            "Data Science": {"demand": 70, "supply": 55},
-            "IoT": {"demand": 80, "supply": 45},
-            "Smart Grid": {"demand": 90, "supply": 40},
-            "Sustainability": {"demand": 95, "supply": 35},
-            "Software": {"demand": 80, "supply": 60}
-        },
-        "top_skills": ["Smart Infrastructure", "IoT", "Energy Systems", "Sustainability", "Carbon Accounting"],
-        "avg_salary_usd": 72000,
-        "cost_of_living_index": 65,
-        "remote_friendly": True,
-        "visa_ease": "Medium",
-        "description": "Germany is the heart of European sustainability and smart infrastructure engineering."
-    },
-    {
-        "region": "Middle East",
-        "country": "UAE",
-        "city": "Dubai",
-        "flag": "🇦🇪",
-        "sector_scores": {
-            "Data Science": {"demand": 85, "supply": 30},
-            "IoT": {"demand": 95, "supply": 25},
-            "Smart Grid": {"demand": 75, "supply": 40},
-            "Sustainability": {"demand": 65, "supply": 50},
-            "Software": {"demand": 90, "supply": 45}
-        },
-        "top_skills": ["Urban AI", "IoT", "Autonomous Transport", "Civic Tech", "Smart Mobility"],
-        "avg_salary_usd": 85000,
-        "cost_of_living_index": 75,
-        "remote_friendly": False,
-        "visa_ease": "High",
-        "description": "Dubai is a playground for futuristic IoT and autonomous urban transportation."
-    },
-    {
-        "region": "North America",
-        "country": "USA",
-        "city": "Austin, TX",
-        "flag": "🇺🇸",
-        "sector_scores": {
-            "Data Science": {"demand": 95, "supply": 50},
-            "IoT": {"demand": 80, "supply": 55},
-            "Smart Grid": {"demand": 70, "supply": 60},
-            "Sustainability": {"demand": 75, "supply": 55},
-            "Software": {"demand": 90, "supply": 65}
-        },
-        "top_skills": ["Data Science", "Urban AI", "Machine Learning", "Software Development"],
-        "avg_salary_usd": 115000,
-        "cost_of_living_index": 80,
-        "remote_friendly": True,
-        "visa_ease": "Low",
-        "description": "Austin is North America's fastest growing hub for Urban AI and software-led city solutions."
-    },
-    {
-        "region": "South Asia",
-        "country": "India",
-        "city": "Bangalore",
-        "flag": "🇮🇳",
-        "sector_scores": {
-            "Data Science": {"demand": 90, "supply": 85},
-            "IoT": {"demand": 95, "supply": 80},
-            "Smart Grid": {"demand": 80, "supply": 70},
-            "Sustainability": {"demand": 75, "supply": 75},
-            "Software": {"demand": 98, "supply": 95}
-        },
-        "top_skills": ["Full Stack", "IoT", "Mobile Development", "Civic Tech", "Data Analysis"],
-        "avg_salary_usd": 35000,
-        "cost_of_living_index": 30,
-        "remote_friendly": True,
-        "visa_ease": "High",
-        "is_local": True,
-        "description": "The Silicon Valley of India, with peak demand for Software and IoT engineering."
-    },
-    {
-        "region": "South Asia",
-        "country": "India",
-        "city": "Mumbai",
-        "flag": "🇮🇳",
-        "sector_scores": {
-            "Data Science": {"demand": 95, "supply": 85},
-            "IoT": {"demand": 70, "supply": 75},
-            "Smart Grid": {"demand": 85, "supply": 75},
-            "Sustainability": {"demand": 90, "supply": 65},
-            "Software": {"demand": 85, "supply": 90}
-        },
-        "top_skills": ["Fintech", "Data Analytics", "ESG Reporting", "Public Policy", "Sustainability"],
-        "avg_salary_usd": 38000,
-        "cost_of_living_index": 45,
-        "remote_friendly": True,
-        "visa_ease": "High",
-        "is_local": True,
-        "description": "India's financial capital with burgeoning demand for ESG and Sustainability analysts."
-    },
-    {
-        "region": "South Asia",
-        "country": "India",
-        "city": "Hyderabad",
-        "flag": "🇮🇳",
-        "sector_scores": {
-            "Data Science": {"demand": 92, "supply": 80},
-            "IoT": {"demand": 85, "supply": 75},
-            "Smart Grid": {"demand": 75, "supply": 80},
-            "Sustainability": {"demand": 70, "supply": 80},
-            "Software": {"demand": 95, "supply": 85}
-        },
-        "top_skills": ["Cloud Computing", "AI/ML", "Backend Engineering", "IoT", "Pharma Tech"],
-        "avg_salary_usd": 32000,
-        "cost_of_living_index": 28,
-        "remote_friendly": True,
-        "visa_ease": "High",
-        "is_local": True,
-        "description": "A massive hub for Cloud and AI, offering high value with a lower cost of living."
-    },
-    {
-        "region": "South Asia",
-        "country": "India",
-        "city": "Pune",
-        "flag": "🇮🇳",
-        "sector_scores": {
-            "Data Science": {"demand": 80, "supply": 75},
-            "IoT": {"demand": 92, "supply": 70},
-            "Smart Grid": {"demand": 95, "supply": 65},
-            "Sustainability": {"demand": 85, "supply": 75},
-            "Software": {"demand": 85, "supply": 85}
-        },
-        "top_skills": ["Automotive Tech", "Smart Grid", "Embedded Systems", "EV Engineering", "Manufacturing"],
-        "avg_salary_usd": 30000,
-        "cost_of_living_index": 25,
-        "remote_friendly": True,
-        "visa_ease": "High",
-        "is_local": True,
-        "description": "The R&D capital for Smart Grids and EV infrastructure in India."
-    }
-]
+# "lexical" (substring match, default) or "semantic" (sentence-embedding similarity)
+SKILL_MATCH_MODE = os.getenv("SKILL_MATCH_MODE", "lexical").lower()
+SEMANTIC_MATCH_THRESHOLD = float(os.getenv("SEMANTIC_MATCH_THRESHOLD", "0.5"))
+EMBEDDING_CACHE_DIR = os.path.join(DATA_DIR, "cache")
+
+_semantic_index = None
+
+
+def get_semantic_index() -> Optional[SkillEmbeddingIndex]:
+    """Build the skill embedding index on first use when semantic mode is enabled"""
+    global _semantic_index
+    if SKILL_MATCH_MODE != "semantic" or not SEMANTIC_AVAILABLE:
+        return None
+    if _semantic_index is None:
+        snapshot = reference_data.current()
+        vocabulary = set()
+        for role_def in snapshot.roles.values():
+            vocabulary.update(role_def["requirements"])
+        for region in snapshot.regions:
+            vocabulary.update(s.lower() for s in region["top_skills"])
+        vocabulary.update(peer_store.distinct_skills())
+        _semantic_index = SkillEmbeddingIndex(vocabulary, EMBEDDING_CACHE_DIR, threshold=SEMANTIC_MATCH_THRESHOLD)
+    return _semantic_index
+
+
+def find_matching_skills(user_skills: set, required_skills: list) -> list:
+    """Required skills covered by the user's skills, in requirement order"""
+    matching = [s for s in required_skills if any(s.lower() in us.lower() for us in user_skills)]
+    
+    # Semantic mode: also accept requirements close to a user skill in embedding space
+    index = get_semantic_index()
+    if index is not None and user_skills and len(matching) < len(required_skills):
+        remaining = [s for s in required_skills if s not in matching]
+        hits = index.matched_targets(user_skills, remaining)
+        matched = set(matching) | {s for s, hit in zip(remaining, hits) if hit}
+        matching = [s for s in required_skills if s in matched]
+    
+    return matching
+
+
+def expand_user_skills(user_skills: set) -> set:
+    """In semantic mode, add the vocabulary terms closest to each user skill"""
+    index = get_semantic_index()
+    if index is None or not user_skills:
+        return user_skills
+    return user_skills | index.expand(user_skills)
+
+
+# ============ Reference Data ============
+
+# Roles, regions, sector keywords, peers and courses are loaded from data/*.json
+# and compiled into an immutable snapshot (skill index, course catalog).
+# Handlers read reference_data.current() once per request; reloads swap the
+# snapshot atomically.
+COURSE_CATALOG_PATH = os.getenv("COURSE_CATALOG_PATH", os.path.join(DATA_DIR, "courses.json"))
+REFERENCE_DATA_WATCH_SECONDS = float(os.getenv("REFERENCE_DATA_WATCH_SECONDS", "10"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Compiled scoring tables are published here and memory-mapped read-only by
+# every worker; set to an empty string to keep private per-process copies
+SCORING_TABLES_DIR = os.getenv("SCORING_TABLES_DIR", os.path.join(DATA_DIR, "cache", "tables"))
+
+reference_data = ReferenceDataStore(
+    DATA_DIR, COURSE_CATALOG_PATH,
+    semantic_provider=get_semantic_index,
+    table_store=SharedTableStore(SCORING_TABLES_DIR) if SCORING_TABLES_DIR else None,
+)
+
+
+def on_reference_data_reload(old: ReferenceSnapshot, new: ReferenceSnapshot):
+    """Refresh state derived from the reference data after a reload"""
+    global _semantic_index
+    _semantic_index = None  # vocabulary may have changed; rebuilt lazily
+    if old is None or old.peers != new.peers:
+        peer_store.upsert_many(new.peers)
+    logger.info(f"Reference data reloaded: generation {new.generation}")
 
-def calculate_skill_arbitrage(user_skills: set, region_data: dict) -> dict:
+
+reference_data.add_listener(on_reference_data_reload)
+
+
+def calculate_skill_arbitrage(user_skills: set, region_data: dict, sector_keywords: Optional[Dict] = None) -> dict:
     """Highly dynamic scoring based on user's specific skill sectors"""
     
+    if sector_keywords is None:
+        sector_keywords = reference_data.current().sector_keywords
+    
     # Fuzzy match user skills against sectors
     user_str = " ".join(user_skills).lower()
     
-    sector_keywords = {
-        "Data Science": ["python", "machine learning", "data science", "statistics", "data analysis", "ai", "sql", "tensorflow", "pytorch"],
-        "IoT": ["iot", "sensors", "embedded", "networking", "hardware", "mqtt", "arduino", "raspberry pi", "smart city"],
-        "Smart Grid": ["energy", "smart grid", "power", "electrical", "grid", "renewable", "solar", "wind"],
-        "Sustainability": ["sustainability", "environment", "climate", "carbon", "green", "renewable", "esg", "ecology"],
-        "Software": ["javascript", "web", "react", "node.js", "api", "software", "programming", "developer", "full stack"]
-    }
-    
     # Calculate sector relevance scores
     sector_relevance = {}
     for sector, keywords in sector_keywords.items():
@@ -340,7 +270,7 @@ def calculate_match_score(user_skills: set, required_skills: list) -> float:
         return 0.0
     
     # Calculate raw overlap
-    matching = [s for s in required_skills if any(s.lower() in us.lower() for us in user_skills)]
+    matching = find_matching_skills(user_skills, required_skills)
     raw_score = (len(matching) / len(required_skills)) * 100
     
     # Use the 'Partial Match Boost' formula: 30 + (raw * 0.7)
@@ -360,72 +290,122 @@ async def root():
     }
 
 
-@app.post("/upload-resume")
-async def upload_resume(file: UploadFile = File(...)):
-    """Upload and parse a resume PDF"""
+@app.on_event("startup")
+async def start_reference_data_watcher():
+    """Start polling the data files so edits are picked up without a restart"""
+    reference_data.start_watching(REFERENCE_DATA_WATCH_SECONDS)
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start processing queued jobs, including any left over from a previous run"""
+    job_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    job_queue.stop()
+
+
+@app.post("/admin/reload-data")
+async def reload_reference_data(x_admin_token: Optional[str] = Header(None)):
+    """Recompile reference data from disk and publish it to every worker"""
     
-    # Validate file type
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin token required")
     
     try:
-        # Save uploaded file
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        logger.info(f"Resume uploaded: {file_path}")
-        
-        # Extract text from PDF
-        raw_text = extract_text_from_pdf(file_path)
-        
-        if not raw_text:
-            raise HTTPException(status_code=400, detail="Could not extract text from PDF")
-        
-        logger.info(f"Extracted {len(raw_text)} characters from PDF")
-        
-        # Parse resume
-        parsed_data = parse_resume(raw_text)
-        
-        # Add metadata
-        if "metadata" not in parsed_data:
-            parsed_data["metadata"] = {}
-        parsed_data["metadata"]["source"] = "Resume PDF"
-        parsed_data["metadata"]["filename"] = file.filename
-        
-        # Analyze quality
-        quality = analyze_resume_quality(parsed_data)
+        reference_data.request_reload()
+    except Exception as e:
+        logger.error(f"Reference data reload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Reload failed, previous data kept: {e}")
+    
+    snapshot = reference_data.current()
+    return {
+        "success": True,
+        "generation": snapshot.generation,
+        "versions": dict(snapshot.versions)
+    }
+
+
+# Multipart schema for the docs; the body itself is streamed by store_pdf_upload
+UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "properties": {"file": {"type": "string", "format": "binary"}},
+        "required": ["file"],
+    }}},
+}
+
+
+@app.post("/upload-resume", status_code=202, openapi_extra={"requestBody": UPLOAD_REQUEST_BODY})
+async def upload_resume(http_request: Request, response: Response, priority: int = Query(0, ge=-10, le=10)):
+    """Upload a resume PDF and queue it for parsing; poll /jobs/{job_id} for the result"""
+    
+    token = ensure_session(http_request, response)
+    try:
+        # One pass from the socket: magic-byte and size checks, hashing, non-blocking writes.
+        # Stored by content hash; re-uploading the same file only adds a reference.
+        upload = await store_pdf_upload(http_request, upload_store, owner=token, max_bytes=UPLOAD_MAX_BYTES)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ClientDisconnect:
+        raise HTTPException(status_code=400, detail="Upload interrupted")
+    
+    try:
+        file_path = upload_store.path(upload.digest)
+        logger.info(f"Resume uploaded: {upload.filename} ({upload.size} bytes) -> {file_path}"
+                    f"{' (duplicate)' if upload.deduplicated else ''}")
         
-        # Store in session
-        current_session["resume_path"] = file_path
-        current_session["resume_data"] = parsed_data
-        current_session["raw_text"] = raw_text
+        # Parsing happens in the background; the job reports back into the caller's session.
+        # The session names the job before it is queued, so even an instant worker finds it there.
+        job_id = new_job_id()
+        await run_in_threadpool(session_store.update, token, resume_job_id=job_id)
+        await run_in_threadpool(
+            job_queue.submit,
+            "parse_resume",
+            {"file_path": file_path, "filename": upload.filename, "session_token": token},
+            priority=priority,
+            owner=token,
+            job_id=job_id,
+        )
         
         return {
             "success": True,
-            "message": "Resume uploaded and parsed successfully",
-            "filename": file.filename,
-            "characters_extracted": len(raw_text),
-            "skills_found": len(parsed_data.get("skills", [])),
-            "projects_found": len(parsed_data.get("projects", [])),
-            "quality": quality
+            "message": "Resume uploaded, processing started",
+            "filename": upload.filename,
+            "resume_id": upload.digest,
+            "deduplicated": upload.deduplicated,
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/jobs/{job_id}"
         }
         
-    except HTTPException:
-        raise
     except Exception as e:
-        logger.error(f"Error processing resume: {e}")
+        logger.error(f"Error uploading resume: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str, http_request: Request):
+    """Stage, progress and (once finished) result of a background job"""
+    
+    job = job_queue.get(job_id, owner=session_token(http_request) or "")
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
 @app.get("/analyze-resume")
-async def analyze_resume():
+async def analyze_resume(http_request: Request):
     """Get detailed resume analysis"""
     
-    if not current_session["resume_data"]:
+    session = get_session(http_request)
+    if not session.get("resume_data"):
         raise HTTPException(status_code=400, detail="No resume uploaded. Please upload a resume first.")
     
-    parsed_data = current_session["resume_data"]
+    parsed_data = session["resume_data"]
     quality = analyze_resume_quality(parsed_data)
     
     return {
@@ -442,15 +422,17 @@ async def analyze_resume():
 
 
 @app.post("/skills-gap")
-async def skills_gap_analysis(request: SkillsGapRequest):
+async def skills_gap_analysis(request: SkillsGapRequest, http_request: Request):
     """Analyze skills gap for a target role"""
     
-    if not current_session["resume_data"]:
+    session = get_session(http_request)
+    if not session.get("resume_data"):
         raise HTTPException(status_code=400, detail="No resume uploaded. Please upload a resume first.")
     
+    snapshot = reference_data.current()
     target_role = request.target_role  # Original casing
-    current_skills = set(skill.lower() for skill in current_session["resume_data"].get("skills", []))
-    target_role_key = next((k for k in ROLE_DEFINITIONS.keys() if k.lower() == target_role.lower()), None)
+    current_skills = set(skill.lower() for skill in session["resume_data"].get("skills", []))
+    target_role_key = next((k for k in snapshot.roles.keys() if k.lower() == target_role.lower()), None)
     
     if not target_role_key:
         # Fallback requirements if role is unknown
@@ -458,32 +440,26 @@ async def skills_gap_analysis(request: SkillsGapRequest):
         description = "General Smart City Role"
         next_steps = ["Learn Python", "Explore GIS"]
     else:
-        role_def = ROLE_DEFINITIONS[target_role_key]
+        role_def = snapshot.roles[target_role_key]
         required_skills = role_def["requirements"]
         description = role_def["description"]
         next_steps = role_def["next_steps"]
     
     # Find matching and missing skills
-    matching_skills = []
-    missing_skills = []
-    
-    for skill in required_skills:
-        if any(skill in cs for cs in current_skills):
-            matching_skills.append(skill)
-        else:
-            missing_skills.append(skill)
+    matching_skills = find_matching_skills(current_skills, required_skills)
+    missing_skills = [skill for skill in required_skills if skill not in matching_skills]
     
     # Calculate match percentage using the SHARED formula
     match_percentage = calculate_match_score(current_skills, required_skills)
     
     # Generate recommendations
-    recommendations = []
-    for skill in missing_skills[:5]:  # Top 5 missing skills
-        recommendations.append(get_skill_recommendation(skill))
+    # Recommend the 5 missing skills with the highest leverage across all roles and regions
+    ranked = rank_skill_leverage(snapshot, list(current_skills), missing_skills, target_role=target_role_key)
+    recommendations = snapshot.courses.lookup_many([entry["skill"] for entry in ranked[:5]])
     
     return {
         "target_role": target_role_key or target_role,
-        "current_skills": list(current_session["resume_data"].get("skills", [])),
+        "current_skills": list(session["resume_data"].get("skills", [])),
         "required_skills": required_skills,
         "matching_skills": matching_skills,
         "missing_skills": missing_skills,
@@ -494,7 +470,7 @@ async def skills_gap_analysis(request: SkillsGapRequest):
 
 
 @app.post("/extract-linkedin")
-async def extract_linkedin(request: SkillsGapRequest):
+async def extract_linkedin(request: SkillsGapRequest, http_request: Request, response: Response):
     """Extract data from a LinkedIn profile URL (Simulated)"""
     url = request.target_role
     logger.info(f"Linking LinkedIn profile: {url}")
@@ -524,9 +500,9 @@ async def extract_linkedin(request: SkillsGapRequest):
     # Analyze quality
     quality = analyze_resume_quality(parsed_data)
     
-    # Store in session
-    current_session["resume_data"] = parsed_data
-    current_session["raw_text"] = f"Extracted from LinkedIn profile: {url}. Featured Resume detected: Bhavika_Resume.pdf" if is_bhavika else f"Simulated text from LinkedIn profile {url}"
+    # Store in the caller's session
+    raw_text = f"Extracted from LinkedIn profile: {url}. Featured Resume detected: Bhavika_Resume.pdf" if is_bhavika else f"Simulated text from LinkedIn profile {url}"
+    save_session(http_request, response, resume_data=parsed_data, raw_text=raw_text)
     
     logger.info("LinkedIn data stored in session successfully")
     
@@ -540,21 +516,21 @@ async def extract_linkedin(request: SkillsGapRequest):
 
 
 @app.get("/career-paths")
-async def get_career_paths():
+async def get_career_paths(http_request: Request):
     """Get Smart City career path suggestions based on current skills"""
     
-    if not current_session["resume_data"]:
+    session = get_session(http_request)
+    if not session.get("resume_data"):
         raise HTTPException(status_code=400, detail="No resume uploaded. Please upload a resume first.")
     
-    user_skills = set(skill.lower() for skill in current_session["resume_data"].get("skills", []))
+    snapshot = reference_data.current()
+    user_skills = set(skill.lower() for skill in session["resume_data"].get("skills", []))
     career_paths = []
     
-    for title, role_def in ROLE_DEFINITIONS.items():
-        requirements = role_def["requirements"]
-        
-        # Use SHARED scoring function
-        score = calculate_match_score(user_skills, requirements)
-        
+    # Score every role at once with the compiled index (same formula as calculate_match_score)
+    scores = snapshot.skill_index.role_scores(snapshot.skill_index.encode([user_skills]))[0]
+    
+    for (title, role_def), score in zip(snapshot.roles.items(), scores.tolist()):
         # Map score to label (consistent with Readiness)
         match_label = "High" if score >= 75 else "Medium" if score >= 50 else "Low"
         
@@ -570,27 +546,32 @@ async def get_career_paths():
     career_paths.sort(key=lambda x: x["match_score"], reverse=True)
     
     return {
-        "skills_detected": list(current_session["resume_data"].get("skills", [])),
+        "skills_detected": list(session["resume_data"].get("skills", [])),
         "career_paths": career_paths,
         "total_paths": len(career_paths)
     }
 
 
 @app.get("/skill-arbitrage")
-async def get_skill_arbitrage():
+async def get_skill_arbitrage(http_request: Request):
     """Get global skill arbitrage opportunities based on user profile"""
     
-    if not current_session["resume_data"]:
+    session = get_session(http_request)
+    if not session.get("resume_data"):
         raise HTTPException(status_code=400, detail="No resume uploaded. Please upload a resume first.")
     
-    user_skills = set(skill.lower() for skill in current_session["resume_data"].get("skills", []))
+    snapshot = reference_data.current()
+    user_skills = set(skill.lower() for skill in session["resume_data"].get("skills", []))
     
     opportunities = []
     local_market = None
     
-    for region in REGIONAL_DEMAND_DATA:
-        result = calculate_skill_arbitrage(user_skills, region)
-        arbitrage_score = result["score"]
+    # Score every region at once with the compiled index
+    results = snapshot.skill_index.region_scores(snapshot.skill_index.encode([user_skills]))
+    
+    for i, region in enumerate(snapshot.regions):
+        arbitrage_score = float(results["score"][0, i])
+        avg_demand = float(results["avg_demand"][0, i])
         
         # Calculate a "Value Multiplier" for UI (e.g. 2.4x)
         value_multiplier = round(arbitrage_score / 1.5, 1)
@@ -602,13 +583,13 @@ async def get_skill_arbitrage():
             "flag": region["flag"],
             "value_index": arbitrage_score,
             "value_multiplier": f"{value_multiplier}x",
-            "demand": "High" if result["avg_demand"] > 80 else "Medium",
+            "demand": "High" if avg_demand > 80 else "Medium",
             "salary_usd": region["avg_salary_usd"],
             "col_index": region["cost_of_living_index"],
             "remote_friendly": region["remote_friendly"],
             "visa_ease": region["visa_ease"],
             "description": region["description"],
-            "dominant_sector": result["dominant_sector"],
+            "dominant_sector": results["dominant_sector"][0],
             "is_local": region.get("is_local", False),
             "top_matching_skills": [s for s in region["top_skills"] if any(s.lower() in us.lower() for us in user_skills)]
         }
@@ -637,113 +618,354 @@ async def get_skill_arbitrage():
 
 
 @app.post("/chat")
-async def career_chat(request: ChatRequest):
+async def career_chat(request: ChatRequest, http_request: Request):
     """AI-powered career advice chat"""
     
     question = request.question.lower()
-    resume_data = current_session.get("resume_data") or {}
+    resume_data = get_session(http_request).get("resume_data") or {}
     
     # Generate contextual response based on question and resume
-    response = generate_career_advice(question, resume_data)
+    response = generate_career_advice(question, resume_data, reference_data.current())
     
     return CareerAdviceResponse(answer=response, rag_used=False)
 
 
-# ============ Peer Learning Network ============
+# ============ Background Jobs ============
+
+# Resume processing runs on a persistent SQLite queue served by a thread pool
+# in every worker process, so uploads return immediately and queued jobs
+# survive restarts.
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(DATA_DIR, "jobs.db"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+job_queue = JobQueue(JOB_DB_PATH, workers=JOB_WORKERS)
 
-# Simulated peer profiles for demo (in production, this would be a database)
-SIMULATED_PEERS = [
-    {
-        "id": "peer_001",
-        "pseudonym": "DataDriven_Dev",
-        "target_role": "Urban Data Scientist",
-        "skills": ["python", "sql", "data visualization", "statistics"],
-        "learning": ["machine learning", "gis", "urban analytics"],
-        "contact_preference": "LinkedIn",
-        "contact_value": "linkedin.com/in/datadriven-dev"
-    },
-    {
-        "id": "peer_002",
-        "pseudonym": "GeoTech_Guru",
-        "target_role": "GIS Analyst",
-        "skills": ["gis", "arcgis", "qgis", "remote sensing", "cartography"],
-        "learning": ["python", "machine learning", "data analysis"],
-        "contact_preference": "Email",
-        "contact_value": "geotech.guru@example.com"
-    },
-    {
-        "id": "peer_003",
-        "pseudonym": "SmartCity_Sam",
-        "target_role": "Smart City Analyst",
-        "skills": ["data analysis", "excel", "tableau", "public policy"],
-        "learning": ["python", "gis", "iot", "sql"],
-        "contact_preference": "LinkedIn",
-        "contact_value": "linkedin.com/in/smartcity-sam"
-    },
-    {
-        "id": "peer_004",
-        "pseudonym": "IoT_Innovator",
-        "target_role": "IoT Engineer (Smart Cities)",
-        "skills": ["iot", "sensors", "arduino", "mqtt", "networking"],
-        "learning": ["python", "cloud platforms", "data streaming"],
-        "contact_preference": "Email",
-        "contact_value": "iot.innovator@example.com"
-    },
-    {
-        "id": "peer_005",
-        "pseudonym": "Green_Grid",
-        "target_role": "Energy Systems Engineer",
-        "skills": ["electrical engineering", "smart grid", "power systems"],
-        "learning": ["python", "iot", "data analysis", "machine learning"],
-        "contact_preference": "LinkedIn",
-        "contact_value": "linkedin.com/in/green-grid"
-    },
-    {
-        "id": "peer_006",
-        "pseudonym": "Civic_Coder",
-        "target_role": "Civic Tech Developer",
-        "skills": ["javascript", "react", "node.js", "api development"],
-        "learning": ["python", "gis", "open data", "urban planning"],
-        "contact_preference": "Email",
-        "contact_value": "civic.coder@example.com"
-    },
-    {
-        "id": "peer_007",
-        "pseudonym": "Urban_ML",
-        "target_role": "Urban AI Engineer",
-        "skills": ["machine learning", "tensorflow", "computer vision", "deep learning"],
-        "learning": ["gis", "urban analytics", "smart city applications"],
-        "contact_preference": "LinkedIn",
-        "contact_value": "linkedin.com/in/urban-ml"
-    },
-    {
-        "id": "peer_008",
-        "pseudonym": "Sustain_Analyst",
-        "target_role": "Sustainability Analyst",
-        "skills": ["sustainability", "carbon footprint", "esg", "reporting"],
-        "learning": ["data analysis", "python", "gis", "visualization"],
-        "contact_preference": "Email",
-        "contact_value": "sustain.analyst@example.com"
-    },
-    {
-        "id": "peer_009",
-        "pseudonym": "Transit_Tech",
-        "target_role": "Transportation Systems Analyst",
-        "skills": ["traffic modeling", "simulation", "urban mobility"],
-        "learning": ["python", "gis", "machine learning", "data visualization"],
-        "contact_preference": "LinkedIn",
-        "contact_value": "linkedin.com/in/transit-tech"
-    },
-    {
-        "id": "peer_010",
-        "pseudonym": "Infra_Builder",
-        "target_role": "Smart Infrastructure Engineer",
-        "skills": ["civil engineering", "infrastructure", "systems design"],
-        "learning": ["iot", "smart grid", "python", "networking"],
-        "contact_preference": "Email",
-        "contact_value": "infra.builder@example.com"
+
+def process_resume_job(ctx: JobContext) -> Dict:
+    """Extract, parse and score an uploaded resume, then store it in the uploader's session"""
+    file_path = ctx.payload["file_path"]
+    token = ctx.payload["session_token"]
+    
+    ctx.report("extracting_text", 0.1)
+    raw_text = extract_text_from_pdf(file_path)
+    if not raw_text:
+        raise ValueError("Could not extract text from PDF")
+    logger.info(f"Extracted {len(raw_text)} characters from PDF")
+    
+    ctx.report("parsing", 0.5)
+    parsed_data = parse_resume(raw_text)
+    if "metadata" not in parsed_data:
+        parsed_data["metadata"] = {}
+    parsed_data["metadata"]["source"] = "Resume PDF"
+    parsed_data["metadata"]["filename"] = ctx.payload["filename"]
+    
+    ctx.report("analyzing", 0.8)
+    quality = analyze_resume_quality(parsed_data)
+    
+    # Skip the session update if the user has uploaded a newer resume meanwhile (checked and written atomically)
+    session_store.update_if(token, {"resume_job_id": ctx.job_id},
+                            resume_path=file_path, resume_data=parsed_data, raw_text=raw_text)
+    
+    return {
+        "success": True,
+        "message": "Resume uploaded and parsed successfully",
+        "filename": ctx.payload["filename"],
+        "characters_extracted": len(raw_text),
+        "skills_found": len(parsed_data.get("skills", [])),
+        "projects_found": len(parsed_data.get("projects", [])),
+        "quality": quality
+    }
+
+
+job_queue.register("parse_resume", process_resume_job)
+
+
+def collect_upload_garbage(retention_seconds: int = UPLOAD_RETENTION_SECONDS) -> Dict[str, int]:
+    """Delete uploaded blobs that no session or pending job has used within the retention window"""
+    pinned = set()
+    for payload in job_queue.active_payloads("parse_resume"):
+        digest = upload_store.digest_for_path(payload.get("file_path", ""))
+        if digest:
+            pinned.add(digest)
+    
+    def owner_alive(digest: str, token: str) -> bool:
+        session = session_store.get(token)
+        return bool(session) and session.get("resume_path") == upload_store.path(digest)
+    
+    return upload_store.collect_garbage(owner_alive, pinned=pinned, retention_seconds=retention_seconds)
+
+
+# ============ Batch Scoring ============
+
+# Candidates scored per matrix block; larger batches are streamed as NDJSON
+BATCH_BLOCK_SIZE = int(os.getenv("BATCH_BLOCK_SIZE", "1024"))
+BATCH_STREAM_THRESHOLD = int(os.getenv("BATCH_STREAM_THRESHOLD", "2000"))
+# Parsed skills of stored resumes kept in memory (least recently used are dropped)
+STORED_SKILLS_CACHE_SIZE = int(os.getenv("STORED_SKILLS_CACHE_SIZE", "1024"))
+
+# file path -> (mtime, skills)
+_stored_resume_skills: "OrderedDict[str, tuple]" = OrderedDict()
+_stored_resume_skills_lock = threading.Lock()
+
+
+class BatchCandidate(BaseModel):
+    id: Optional[str] = None
+    skills: Optional[List[str]] = None
+    resume_id: Optional[str] = None
+
+
+class ScoreBatchRequest(BaseModel):
+    candidates: List[BatchCandidate]
+    roles: Optional[List[str]] = None
+    regions: Optional[List[str]] = None
+    top_k: int = 3
+    stream: bool = False
+
+
+def load_stored_resume_skills(resume_id: str) -> Optional[List[str]]:
+    """Parse a previously uploaded resume, caching its skills by file and mtime"""
+    if is_digest(resume_id):
+        file_path = upload_store.path(resume_id)
+    else:
+        # Files saved by name before uploads became content-addressed
+        file_path = os.path.join(UPLOAD_DIR, os.path.basename(resume_id))
+    if not os.path.isfile(file_path):
+        return None
+    mtime = os.path.getmtime(file_path)
+    with _stored_resume_skills_lock:
+        cached = _stored_resume_skills.get(file_path)
+        if cached and cached[0] == mtime:
+            _stored_resume_skills.move_to_end(file_path)
+            return cached[1]
+    
+    raw_text = extract_text_from_pdf(file_path)
+    skills = parse_resume(raw_text).get("skills", []) if raw_text else []
+    with _stored_resume_skills_lock:
+        # Keyed by path, so a re-saved file replaces its stale entry
+        _stored_resume_skills[file_path] = (mtime, skills)
+        _stored_resume_skills.move_to_end(file_path)
+        while len(_stored_resume_skills) > STORED_SKILLS_CACHE_SIZE:
+            _stored_resume_skills.popitem(last=False)
+    return skills
+
+
+def iter_batch_scores(skill_index: SkillIndex, candidates: List[BatchCandidate], role_ids: List[int],
+                      region_ids: List[int], top_k: int):
+    """Score candidates block by block, yielding one result dict per candidate"""
+    role_names = [skill_index.role_names[i] for i in role_ids]
+    
+    for start in range(0, len(candidates), BATCH_BLOCK_SIZE):
+        block = candidates[start:start + BATCH_BLOCK_SIZE]
+        
+        # Resolve skill lists (inline or from stored resumes)
+        skill_lists, errors = [], []
+        for candidate in block:
+            skills = candidate.skills
+            error = None
+            if skills is None and candidate.resume_id:
+                skills = load_stored_resume_skills(candidate.resume_id)
+                if skills is None:
+                    error = "Resume not found"
+            skill_lists.append(skills or [])
+            errors.append(error)
+        
+        profiles = skill_index.encode(skill_lists)
+        role_scores = skill_index.role_scores(profiles, role_ids)
+        region_scores = skill_index.region_scores(profiles, region_ids)["score"]
+        top = np.argsort(-role_scores, axis=1, kind="stable")[:, :top_k]
+        
+        for i, candidate in enumerate(block):
+            candidate_id = candidate.id or candidate.resume_id or str(start + i)
+            if errors[i]:
+                yield {"id": candidate_id, "error": errors[i]}
+                continue
+            yield {
+                "id": candidate_id,
+                "role_scores": role_scores[i].tolist(),
+                "region_scores": region_scores[i].tolist(),
+                "top_roles": [{"title": role_names[j], "match_score": float(role_scores[i, j])} for j in top[i]]
+            }
+
+
+@app.post("/score-batch")
+async def score_batch(request: ScoreBatchRequest):
+    """Score many candidates against many roles and regions in one call"""
+    
+    skill_index = reference_data.current().skill_index
+    
+    # Resolve requested roles (default: all roles)
+    role_lookup = {name.lower(): i for i, name in enumerate(skill_index.role_names)}
+    if request.roles:
+        unknown = [r for r in request.roles if r.lower() not in role_lookup]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown roles: {', '.join(unknown)}")
+        role_ids = [role_lookup[r.lower()] for r in request.roles]
+    else:
+        role_ids = list(range(len(skill_index.role_names)))
+    
+    # Resolve requested regions by city or country (default: all regions)
+    if request.regions:
+        wanted = set(r.lower() for r in request.regions)
+        region_ids = [i for i, r in enumerate(skill_index.regions)
+                      if r["city"].lower() in wanted or r["country"].lower() in wanted]
+        if not region_ids:
+            raise HTTPException(status_code=400, detail="No matching regions")
+    else:
+        region_ids = list(range(len(skill_index.regions)))
+    
+    top_k = max(1, min(request.top_k, len(role_ids)))
+    roles = [skill_index.role_names[i] for i in role_ids]
+    regions = [skill_index.regions[i]["city"] for i in region_ids]
+    
+    if request.stream or len(request.candidates) > BATCH_STREAM_THRESHOLD:
+        def ndjson():
+            yield json.dumps({"roles": roles, "regions": regions, "total_candidates": len(request.candidates)}) + "\n"
+            for row in iter_batch_scores(skill_index, request.candidates, role_ids, region_ids, top_k):
+                yield json.dumps(row) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    # PDF parsing and scoring are blocking; keep them off the event loop
+    results = await run_in_threadpool(
+        list, iter_batch_scores(skill_index, request.candidates, role_ids, region_ids, top_k)
+    )
+    return {
+        "roles": roles,
+        "regions": regions,
+        "total_candidates": len(results),
+        "candidates": results
     }
-]
+
+
+class WhatIfRequest(BaseModel):
+    skills_to_add: List[str]
+    current_skills: Optional[List[str]] = None
+
+
+@app.post("/what-if")
+async def what_if_scores(request: WhatIfRequest, http_request: Request):
+    """Show how role and region scores change if the user learns extra skills"""
+    
+    resume_data = get_session(http_request).get("resume_data")
+    if request.current_skills is not None:
+        current_skills = request.current_skills
+    elif resume_data:
+        current_skills = resume_data.get("skills", [])
+    else:
+        raise HTTPException(status_code=400, detail="No resume uploaded. Please upload a resume first.")
+    
+    additions = [s for s in request.skills_to_add if s and s.strip()]
+    if not additions:
+        raise HTTPException(status_code=400, detail="Provide at least one skill to add")
+    
+    skill_index = reference_data.current().skill_index
+    result = skill_index.what_if(current_skills, additions)
+    roles = skill_index.role_names
+    cities = [r["city"] for r in skill_index.regions]
+    
+    def deltas(i: int) -> Dict:
+        return {
+            "role_deltas": dict(zip(roles, result["role_deltas"][i].tolist())),
+            "region_deltas": dict(zip(cities, result["region_deltas"][i].tolist())),
+            "newly_matched": result["newly_matched"][i]
+        }
+    
+    return {
+        "current_skills": list(current_skills),
+        "base": {
+            "role_scores": dict(zip(roles, result["base_role_scores"].tolist())),
+            "region_scores": dict(zip(cities, result["base_region_scores"].tolist()))
+        },
+        "hypotheticals": [{"skill": skill, **deltas(i)} for i, skill in enumerate(additions)],
+        "combined": deltas(len(additions))
+    }
+
+
+def rank_skill_leverage(snapshot: ReferenceSnapshot, current_skills: List[str], candidate_skills: List[str],
+                        target_role: Optional[str] = None, match_weight: float = 0.7) -> List[Dict]:
+    """Rank candidate skills by marginal gain in role match and arbitrage value"""
+    if not candidate_skills:
+        return []
+    skill_index = snapshot.skill_index
+    
+    # One vectorized what-if pass scores every candidate against every role and region
+    result = skill_index.what_if(current_skills, candidate_skills)
+    role_deltas = result["role_deltas"][:-1]
+    region_deltas = result["region_deltas"][:-1]
+    
+    if target_role in skill_index.role_names:
+        match_gain = role_deltas[:, skill_index.role_names.index(target_role)]
+    else:
+        match_gain = role_deltas.mean(axis=1)
+    arbitrage_gain = region_deltas.mean(axis=1)
+    
+    # Normalize each gain to [0, 1] before blending so neither scale dominates
+    match_norm = match_gain / match_gain.max() if match_gain.max() > 0 else np.zeros_like(match_gain)
+    arbitrage_norm = arbitrage_gain / arbitrage_gain.max() if arbitrage_gain.max() > 0 else np.zeros_like(arbitrage_gain)
+    leverage = match_weight * match_norm + (1 - match_weight) * arbitrage_norm
+    
+    ranked = []
+    for i in np.argsort(-leverage, kind="stable"):
+        best_role = int(role_deltas[i].argmax())
+        best_region = int(region_deltas[i].argmax())
+        ranked.append({
+            "skill": candidate_skills[i],
+            "leverage_score": round(float(leverage[i]), 3),
+            "match_gain": round(float(match_gain[i]), 2),
+            "arbitrage_gain": round(float(arbitrage_gain[i]), 2),
+            "roles_improved": int((role_deltas[i] > 0).sum()),
+            "best_role": skill_index.role_names[best_role],
+            "best_role_gain": float(role_deltas[i, best_role]),
+            "best_region": skill_index.regions[best_region]["city"],
+            "best_region_gain": float(region_deltas[i, best_region])
+        })
+    return ranked
+
+
+@app.get("/next-skills")
+async def get_next_skills(http_request: Request, limit: int = Query(10, ge=1, le=100), target_role: Optional[str] = None,
+                          match_weight: float = Query(0.7, ge=0.0, le=1.0)):
+    """Rank every missing skill by how much learning it would raise the user's scores"""
+    
+    session = get_session(http_request)
+    if not session.get("resume_data"):
+        raise HTTPException(status_code=400, detail="No resume uploaded. Please upload a resume first.")
+    
+    snapshot = reference_data.current()
+    skill_index = snapshot.skill_index
+    current_skills = session["resume_data"].get("skills", [])
+    target_role_key = None
+    if target_role:
+        target_role_key = next((k for k in skill_index.role_names if k.lower() == target_role.lower()), None)
+        if not target_role_key:
+            raise HTTPException(status_code=400, detail=f"Unknown role: {target_role}")
+    
+    # Candidates: every requirement and regional flagship skill the user does not cover yet
+    profile = skill_index.encode([current_skills])
+    missing = [t for t, hit in zip(skill_index.requirement_terms, profile.requirements[0]) if not hit]
+    missing += [t for t, hit in zip(skill_index.top_skill_terms, profile.top_skills[0])
+                if not hit and t not in skill_index.requirement_terms]
+    
+    ranked = rank_skill_leverage(snapshot, current_skills, missing, target_role=target_role_key,
+                                 match_weight=match_weight)[:limit]
+    for entry, course in zip(ranked, snapshot.courses.lookup_many([e["skill"] for e in ranked])):
+        entry["course"] = course
+    
+    return {
+        "current_skills": list(current_skills),
+        "target_role": target_role_key,
+        "total_candidates": len(missing),
+        "recommendations": ranked
+    }
+
+
+# ============ Peer Learning Network ============
+
+# Peer profiles live in a SQLite store shared by all workers. The bundled
+# profiles in data/peers.json seed an empty database.
+PEER_DB_PATH = os.getenv("PEER_DB_PATH", os.path.join(DATA_DIR, "peers.db"))
+
+peer_store = PeerStore(PEER_DB_PATH)
+peer_store.seed_if_empty(reference_data.current().peers)
 
 
 def calculate_peer_match(user_skills: set, user_learning: set, peer: dict) -> dict:
@@ -781,37 +1003,43 @@ def calculate_peer_match(user_skills: set, user_learning: set, peer: dict) -> di
 
 
 @app.get("/peer-matches")
-async def get_peer_matches():
+async def get_peer_matches(http_request: Request, limit: int = Query(3, ge=1, le=50), offset: int = Query(0, ge=0)):
     """Get peer learning matches based on complementary skills"""
     
-    if not current_session["resume_data"]:
+    session = get_session(http_request)
+    if not session.get("resume_data"):
         raise HTTPException(status_code=400, detail="No resume uploaded. Please upload a resume first.")
     
-    user_skills = set(skill.lower() for skill in current_session["resume_data"].get("skills", []))
+    user_skills = set(skill.lower() for skill in session["resume_data"].get("skills", []))
+    
+    # In semantic mode, close vocabulary terms count as skills the user already has
+    user_skills = expand_user_skills(user_skills)
     
     # Infer what user might be learning from skill gaps
     # Use the first career path's requirements as learning targets
     user_learning = set()
-    for title, role_def in ROLE_DEFINITIONS.items():
+    for title, role_def in reference_data.current().roles.items():
         for req in role_def["requirements"]:
             if req.lower() not in user_skills:
                 user_learning.add(req.lower())
     
-    # Calculate matches for all peers
+    # Only score peers the skill index says can exchange something with the user
     matches = []
-    for peer in SIMULATED_PEERS:
+    for peer in peer_store.find_complementary(user_skills, user_learning):
         match = calculate_peer_match(user_skills, user_learning, peer)
         if match:
             matches.append(match)
     
-    # Sort by match score and return top 3
+    # Sort by match score and return the requested page
     matches.sort(key=lambda x: x["match_score"], reverse=True)
-    top_matches = matches[:3]
+    page = matches[offset:offset + limit]
     
     return {
-        "user_skills": list(current_session["resume_data"].get("skills", []))[:5],
-        "peers": top_matches,
-        "total_potential_peers": len(matches)
+        "user_skills": list(session["resume_data"].get("skills", []))[:5],
+        "peers": page,
+        "total_potential_peers": len(matches),
+        "offset": offset,
+        "limit": limit
     }
 
 
@@ -820,14 +1048,15 @@ class ConnectPeerRequest(BaseModel):
 
 
 @app.post("/connect-peer")
-async def connect_with_peer(request: ConnectPeerRequest):
+async def connect_with_peer(request: ConnectPeerRequest, http_request: Request):
     """Connect with a peer (reveals contact info)"""
     
-    if not current_session["resume_data"]:
+    session = get_session(http_request)
+    if not session.get("resume_data"):
         raise HTTPException(status_code=400, detail="No resume uploaded. Please upload a resume first.")
     
-    # Find the peer
-    peer = next((p for p in SIMULATED_PEERS if p["id"] == request.peer_id), None)
+    # Find the peer (indexed lookup, served from the read cache)
+    peer = peer_store.get(request.peer_id)
     
     if not peer:
         raise HTTPException(status_code=404, detail="Peer not found")
@@ -854,120 +1083,39 @@ async def connect_with_peer(request: ConnectPeerRequest):
 
 def get_skill_recommendation(skill: str) -> Dict:
     """Get learning recommendation for a skill - Udemy + SWAYAM (India) links"""
-    
-    # Udemy recommendations
-    udemy_recs = {
-        # Core Programming
-        "python": {"resource": "Python for Data Science - Udemy", "url": "https://www.udemy.com/topic/python/", "duration": "4-6 weeks"},
-        "sql": {"resource": "SQL Bootcamp - Udemy", "url": "https://www.udemy.com/topic/sql/", "duration": "2-3 weeks"},
-        "javascript": {"resource": "JavaScript Complete Course - Udemy", "url": "https://www.udemy.com/topic/javascript/", "duration": "4-8 weeks"},
-        
-        # Smart City / Urban Tech Skills
-        "gis": {"resource": "GIS & Spatial Analysis - Udemy", "url": "https://www.udemy.com/topic/geographic-information-systems-gis/", "duration": "4-6 weeks"},
-        "spatial analysis": {"resource": "Spatial Data Science - Udemy", "url": "https://www.udemy.com/topic/geographic-information-systems-gis/", "duration": "3-4 weeks"},
-        "arcgis": {"resource": "ArcGIS Complete Course - Udemy", "url": "https://www.udemy.com/topic/arcgis/", "duration": "4-6 weeks"},
-        "qgis": {"resource": "QGIS Masterclass - Udemy", "url": "https://www.udemy.com/topic/qgis/", "duration": "2-3 weeks"},
-        "urban planning": {"resource": "Urban Planning Fundamentals - Udemy", "url": "https://www.udemy.com/courses/search/?q=urban+planning", "duration": "8-12 weeks"},
-        "iot": {"resource": "IoT & Smart Cities - Udemy", "url": "https://www.udemy.com/topic/internet-of-things/", "duration": "4-6 weeks"},
-        "sensors": {"resource": "IoT Sensors & Arduino - Udemy", "url": "https://www.udemy.com/topic/arduino/", "duration": "2-4 weeks"},
-        "smart grid": {"resource": "Smart Grid Technology - Udemy", "url": "https://www.udemy.com/courses/search/?q=smart+grid", "duration": "6-8 weeks"},
-        "urban mobility": {"resource": "Urban Transport Planning - Udemy", "url": "https://www.udemy.com/courses/search/?q=urban+mobility", "duration": "8 weeks"},
-        "traffic modeling": {"resource": "Traffic Engineering - Udemy", "url": "https://www.udemy.com/courses/search/?q=traffic+engineering", "duration": "4-6 weeks"},
-        "transportation planning": {"resource": "Transport Planning Course - Udemy", "url": "https://www.udemy.com/courses/search/?q=transportation+planning", "duration": "6-8 weeks"},
-        "sustainability": {"resource": "Sustainability & Green Cities - Udemy", "url": "https://www.udemy.com/topic/sustainability/", "duration": "4-6 weeks"},
-        "sustainability metrics": {"resource": "ESG & Sustainability Reporting - Udemy", "url": "https://www.udemy.com/courses/search/?q=sustainability+metrics", "duration": "3-4 weeks"},
-        "energy optimization": {"resource": "Energy Management - Udemy", "url": "https://www.udemy.com/topic/energy/", "duration": "6-8 weeks"},
-        "public policy": {"resource": "Public Policy Analysis - Udemy", "url": "https://www.udemy.com/courses/search/?q=public+policy", "duration": "6-8 weeks"},
-        "open data": {"resource": "Open Data & APIs - Udemy", "url": "https://www.udemy.com/courses/search/?q=open+data", "duration": "2-3 weeks"},
-        "remote sensing": {"resource": "Remote Sensing & GIS - Udemy", "url": "https://www.udemy.com/topic/remote-sensing/", "duration": "4-6 weeks"},
-        "cartography": {"resource": "Cartography & Map Design - Udemy", "url": "https://www.udemy.com/courses/search/?q=cartography", "duration": "3-4 weeks"},
-        
-        # Data & ML
-        "machine learning": {"resource": "Machine Learning A-Z - Udemy", "url": "https://www.udemy.com/topic/machine-learning/", "duration": "11 weeks"},
-        "data visualization": {"resource": "Data Visualization Masterclass - Udemy", "url": "https://www.udemy.com/topic/data-visualization/", "duration": "2-3 weeks"},
-        "data analysis": {"resource": "Data Analysis with Python - Udemy", "url": "https://www.udemy.com/topic/data-analysis/", "duration": "6-8 weeks"},
-        "statistics": {"resource": "Statistics for Data Science - Udemy", "url": "https://www.udemy.com/topic/statistics/", "duration": "4-6 weeks"},
-        "urban analytics": {"resource": "Urban Data Analytics - Udemy", "url": "https://www.udemy.com/courses/search/?q=urban+analytics", "duration": "6-8 weeks"},
-        "deep learning": {"resource": "Deep Learning Complete - Udemy", "url": "https://www.udemy.com/topic/deep-learning/", "duration": "4-5 months"},
-        "computer vision": {"resource": "Computer Vision with Python - Udemy", "url": "https://www.udemy.com/topic/computer-vision/", "duration": "4-6 weeks"},
-        "data engineering": {"resource": "Data Engineering Bootcamp - Udemy", "url": "https://www.udemy.com/topic/data-engineering/", "duration": "8-10 weeks"},
-        "cloud platforms": {"resource": "Cloud Computing - Udemy", "url": "https://www.udemy.com/topic/cloud-computing/", "duration": "6-8 weeks"},
-        "networking": {"resource": "Networking Fundamentals - Udemy", "url": "https://www.udemy.com/topic/networking/", "duration": "4-6 weeks"},
-    }
-    
-    # SWAYAM (Indian Govt) recommendations - FREE courses
-    swayam_recs = {
-        "python": {"resource": "Python for Data Science - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=python", "duration": "12 weeks"},
-        "machine learning": {"resource": "Machine Learning - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=machine+learning", "duration": "12 weeks"},
-        "data analysis": {"resource": "Data Analytics - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=data+analytics", "duration": "8 weeks"},
-        "statistics": {"resource": "Statistics for Engineers - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=statistics", "duration": "12 weeks"},
-        "iot": {"resource": "Introduction to IoT - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=iot", "duration": "8 weeks"},
-        "gis": {"resource": "GIS Fundamentals - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=gis", "duration": "12 weeks"},
-        "urban planning": {"resource": "Urban Planning & Design - SWAYAM", "url": "https://swayam.gov.in/explorer?searchText=urban+planning", "duration": "12 weeks"},
-        "sustainability": {"resource": "Sustainable Development - SWAYAM", "url": "https://swayam.gov.in/explorer?searchText=sustainable+development", "duration": "8 weeks"},
-        "deep learning": {"resource": "Deep Learning - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=deep+learning", "duration": "12 weeks"},
-        "cloud platforms": {"resource": "Cloud Computing - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=cloud+computing", "duration": "8 weeks"},
-        "networking": {"resource": "Computer Networks - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=computer+networks", "duration": "12 weeks"},
-        "sql": {"resource": "Database Management - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=database", "duration": "8 weeks"},
-        "data visualization": {"resource": "Data Science & Visualization - SWAYAM", "url": "https://swayam.gov.in/explorer?searchText=data+visualization", "duration": "8 weeks"},
-        "public policy": {"resource": "Public Policy & Governance - SWAYAM", "url": "https://swayam.gov.in/explorer?searchText=public+policy", "duration": "12 weeks"},
-        "transportation planning": {"resource": "Transportation Engineering - SWAYAM", "url": "https://swayam.gov.in/explorer?searchText=transportation", "duration": "12 weeks"},
-        "remote sensing": {"resource": "Remote Sensing - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=remote+sensing", "duration": "8 weeks"},
-        "smart grid": {"resource": "Smart Grid - SWAYAM (NPTEL)", "url": "https://swayam.gov.in/explorer?searchText=smart+grid", "duration": "8 weeks"},
-    }
-    
-    skill_lower = skill.lower()
-    
-    # Get Udemy recommendation
-    udemy_rec = udemy_recs.get(skill_lower, {
-        "resource": f"Learn {skill} on Udemy",
-        "url": f"https://www.udemy.com/courses/search/?q={skill.replace(' ', '+')}",
-        "duration": "Varies"
-    })
-    
-    # Get SWAYAM recommendation if available
-    swayam_rec = swayam_recs.get(skill_lower)
-    
-    # Return combined info - prefer SWAYAM for Indian govt free course
-    if swayam_rec:
-        return {
-            "skill": skill,
-            "resource": f"{udemy_rec['resource']} | {swayam_rec['resource']}",
-            "url": swayam_rec["url"],  # Link to free SWAYAM course
-            "duration": swayam_rec["duration"],
-            "udemy_url": udemy_rec["url"],
-            "swayam_url": swayam_rec["url"]
-        }
-    
-    return {
-        "skill": skill,
-        **udemy_rec
-    }
+    return reference_data.current().courses.lookup(skill)
 
 
-def generate_career_advice(question: str, resume_data: Dict) -> str:
+def describe_demand(region: Dict) -> str:
+    """Qualitative label for a region's average sector demand (0-100)."""
+    demands = [scores["demand"] for scores in region["sector_scores"].values()]
+    avg_demand = sum(demands) / len(demands) if demands else 0
+    if avg_demand >= 85:
+        label = "a very high"
+    elif avg_demand >= 70:
+        label = "a high"
+    else:
+        label = "a moderate"
+    return f"{label} (average {avg_demand:.0f}/100)"
+
+
+def generate_career_advice(question: str, resume_data: Dict, snapshot: Optional[ReferenceSnapshot] = None) -> str:
     """Generate career advice based on question and resume context"""
     
+    snapshot = snapshot or reference_data.current()
     skills = resume_data.get("skills", [])
     projects = resume_data.get("projects", [])
     
-    # 1. Scope Filtering
-    allowed_topics = ["insightedge", "website", "platform", "app", "resume", "career", "skill", "job", "learn", "match", "network", "peer", "roadmap", "iot", "engineer", "data scientist", "analyst", "planning", "mobility", "infrastructure", "sustainability", "developer", "ai", "city", "location", "place", "india", "gujarat", "ahmedabad", "gandhinagar"]
+    # 1. Route the question: topic gating, role, region and fallback intent in one pass
+    route = snapshot.intent_router.route(question)
     
-    is_allowed = any(topic in question for topic in allowed_topics) or \
-                 any(role.lower() in question for role in ROLE_DEFINITIONS.keys())
-    
-    if not is_allowed:
+    if not route.allowed:
         return "I'm an InsightEdge ChatBot, I can't answer this. I can only help you with questions related to the InsightEdge platform, website development concepts, career advice, or job roles and locations in our system."
 
     # 2. Extract Data
-    role_entry = next(((k, v) for k, v in ROLE_DEFINITIONS.items() if k.lower() in question), None)
-    
-    # Location Matching
-    indian_cities = [r for r in REGIONAL_DEMAND_DATA if r.get("is_local")]
-    location_keywords = ["city", "place", "location", "where", "gujarat", "india"]
-    is_location_query = any(kw in question for kw in location_keywords)
-    matched_region = next((r for r in REGIONAL_DEMAND_DATA if r["city"].lower() in question or r["country"].lower() in question), None)
+    role_entry = (route.role, snapshot.roles[route.role]) if route.role else None
+    matched_region = route.region
+    indian_cities = [r for r in snapshot.regions if r.get("is_local")]
     
     # 3. Generate Combined Response
     response_parts = []
@@ -979,10 +1127,10 @@ def generate_career_advice(question: str, resume_data: Dict) -> str:
 
     # Add Location Info
     if matched_region:
-        response_parts.append(f"Regarding your query about {matched_region['city']}, there is currently a {matched_region['demand']} demand for such talent. {matched_region['description']} Salaries in this region average around ${matched_region['avg_salary_usd']}.")
-    elif "gujarat" in question or "ahmedabad" in question or "gandhinagar" in question:
+        response_parts.append(f"Regarding your query about {matched_region['city']}, there is currently {describe_demand(matched_region)} demand for such talent. {matched_region['description']} Salaries in this region average around ${matched_region['avg_salary_usd']}.")
+    elif route.keywords & {"gujarat", "ahmedabad", "gandhinagar"}:
         response_parts.append("For Gujarat (especially Ahmedabad/Gandhinagar), we're seeing massive growth in tech hubs like GIFT City. While I don't have the exact salary metrics yet, it's becoming a major center for IT and infrastructure.")
-    elif "india" in question:
+    elif "india" in route.keywords:
         cities_str = ", ".join([c['city'] for c in indian_cities])
         response_parts.append(f"Across India, key hubs for these roles include {cities_str}. Each city specializes in different sectors, like Bangalore for Software and Mumbai for Data.")
 
@@ -990,20 +1138,20 @@ def generate_career_advice(question: str, resume_data: Dict) -> str:
         return " ".join(response_parts)
 
     # 4. Keyword Fallbacks
-    if "skill" in question and "gap" in question:
+    if route.intent == "skills_gap":
         return "I can help analyze your skills gap! Use the Skills Gap Analysis feature to compare your profile with industry requirements and get custom learning paths from Udemy and SWAYAM."
     
-    elif "career" in question and "path" in question:
+    elif route.intent == "career_path":
         if skills:
             return f"Based on your resume skills like {', '.join(skills[:3])}, I recommend checking out the 'Career Match' section for a full breakdown of your best-fit roles."
         return "To suggest career paths, please upload your resume first! I'll then be able to provide personalized recommendations tailored to your experience."
     
-    elif "resume" in question or "improve" in question:
+    elif route.intent == "resume":
         if resume_data:
             return "Based on your resume, I suggest: 1) Using action verbs for projects, 2) Quantifying your achievements, and 3) Highlighting your technical stack clearly."
         return "Upload your resume first, and I'll provide specific tips to make it stand out to recruiters!"
     
-    elif "website" in question or "insightedge" in question:
+    elif route.intent == "platform":
         return "InsightEdge is your AI-powered career companion for the Smart City sector. We help you with resume management, skills gap analysis, and networking. What specific tool would you like to learn about?"
 
     # 5. Default Response
@@ -0,0 +1,263 @@
+"""
+Career API - Production launcher
+
+Loads the application once in a master process (reference data, compiled
+scoring indexes, intent router, resume parser patterns), freezes the
+resulting heap and forks worker processes that serve the app on a shared
+listening socket. Workers inherit the preloaded state copy-on-write instead
+of each building their own copy.
+
+Usage:
+    python serve.py --workers 4 --port 8001 --max-requests 1000
+"""
+
+import os
+import gc
+import sys
+import time
+import random
+import signal
+import select
+import socket
+import logging
+import argparse
+
+import uvicorn
+
+logger = logging.getLogger("career_api.serve")
+
+# A worker that dies sooner than this after starting counts as a crash
+MIN_WORKER_LIFETIME = 1.0
+# How long a rolling restart waits for each replacement worker to start serving
+WORKER_READY_TIMEOUT = float(os.getenv("WORKER_READY_TIMEOUT", "60"))
+
+SAMPLE_RESUME = """John Doe
+john.doe@example.com | +91 98765 43210 | linkedin.com/in/johndoe
+EDUCATION
+B.Tech in Computer Science
+SKILLS
+Python, Machine Learning, GIS, SQL, React
+PROJECTS
+Smart traffic analytics dashboard
+EXPERIENCE
+Data Analyst Intern
+"""
+
+
+def preload():
+    """Import the app and warm everything workers would otherwise build per process."""
+    import main
+    from utils.resume_parser import parse_resume, analyze_resume_quality
+
+    snapshot = main.reference_data.current()
+    # Fill the regex cache and exercise the compiled indexes once
+    analyze_resume_quality(parse_resume(SAMPLE_RESUME))
+    snapshot.intent_router.route("how do i become a data scientist in india")
+    snapshot.skill_index.role_scores(snapshot.skill_index.encode([["python", "gis"]]))
+
+    # Connections must not be shared across fork; workers reopen their own
+    main.peer_store.close()
+    main.session_store.close()
+    main.job_queue.close()
+    logger.info(f"Preloaded reference data generation {snapshot.generation}")
+    return main.app
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that tells the master through a pipe once it is accepting connections."""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if self.started:
+            os.write(self.ready_fd, b"1")
+            os.close(self.ready_fd)
+
+
+def run_worker(app, sock: socket.socket, args, ready_fd: int):
+    """Body of a forked worker: serve until max-requests or a stop signal."""
+    # Restore default handlers; uvicorn installs its own graceful-shutdown handlers
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(sig, signal.SIG_DFL)
+    random.seed()
+
+    max_requests = None
+    if args.max_requests > 0:
+        # Jitter so workers do not all recycle at the same moment
+        max_requests = args.max_requests + random.randint(0, max(args.max_requests_jitter, 0))
+
+    config = uvicorn.Config(
+        app,
+        limit_max_requests=max_requests,
+        timeout_keep_alive=args.keep_alive,
+        log_level=args.log_level,
+        access_log=args.access_log,
+        lifespan="on",
+    )
+    WorkerServer(config, ready_fd).run(sockets=[sock])
+
+
+class Master:
+    """Forks and supervises workers, replacing any that exit."""
+
+    def __init__(self, app, sock: socket.socket, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers = {}  # pid -> start time
+        self.ready_fds = {}  # pid -> read end of the worker's ready pipe
+        self.running = True
+        self.restart_queue = []  # old workers still to be replaced by a rolling restart
+        self.restarting = None  # the worker currently being replaced
+
+    def spawn(self) -> int:
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                os.close(read_fd)
+                for fd in self.ready_fds.values():
+                    os.close(fd)
+                run_worker(self.app, self.sock, self.args, write_fd)
+            except BaseException as e:
+                logger.error(f"Worker {os.getpid()} crashed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        # Only the worker may hold the write end, so its exit shows up as EOF
+        os.close(write_fd)
+        self.workers[pid] = time.monotonic()
+        self.ready_fds[pid] = read_fd
+        logger.info(f"Started worker {pid}")
+        return pid
+
+    def close_ready_fd(self, pid: int):
+        fd = self.ready_fds.pop(pid, None)
+        if fd is not None:
+            os.close(fd)
+
+    def wait_ready(self, pid: int) -> bool:
+        """Block until worker `pid` accepts connections; False if it exited or timed out first."""
+        fd = self.ready_fds.get(pid)
+        if fd is None:
+            return False
+        readable, _, _ = select.select([fd], [], [], WORKER_READY_TIMEOUT)
+        ready = bool(readable) and os.read(fd, 1) == b"1"
+        self.close_ready_fd(pid)
+        return ready
+
+    def signal_workers(self, sig: int):
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def handle_stop(self, signum, frame):
+        logger.info(f"Received {signal.Signals(signum).name}, stopping workers")
+        self.running = False
+        self.signal_workers(signal.SIGTERM)
+
+    def handle_hup(self, signum, frame):
+        # Rolling restart: stop one worker at a time and only move on once its
+        # replacement is serving, so the other workers keep taking requests
+        logger.info("Received SIGHUP, restarting workers one at a time")
+        self.restart_queue = [pid for pid in self.workers if pid != self.restarting]
+        if self.restarting is None:
+            self.restart_next()
+
+    def restart_next(self):
+        while self.running and self.restart_queue:
+            pid = self.restart_queue.pop(0)
+            if pid in self.workers:
+                self.restarting = pid
+                os.kill(pid, signal.SIGTERM)
+                return
+        self.restarting = None
+        logger.info("Rolling restart finished")
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        signal.signal(signal.SIGHUP, self.handle_hup)
+
+        for _ in range(self.args.workers):
+            self.spawn()
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            self.close_ready_fd(pid)
+            code = os.waitstatus_to_exitcode(status)
+            logger.info(f"Worker {pid} exited with code {code}")
+            if self.running:
+                if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME)  # avoid a tight crash loop
+                replacement = self.spawn()
+                if pid == self.restarting:
+                    if self.wait_ready(replacement):
+                        self.restart_next()
+                    else:
+                        # Stopping more workers would only shrink capacity further
+                        logger.error(f"Replacement worker {replacement} did not start; aborting rolling restart")
+                        self.restart_queue = []
+                        self.restarting = None
+
+        logger.info("All workers stopped")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-forking production server for the Career API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+                        help="Worker processes (default: WEB_CONCURRENCY or CPU count)")
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", "0")),
+                        help="Recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.getenv("MAX_REQUESTS_JITTER", "0")),
+                        help="Random extra requests added per worker to stagger recycling")
+    parser.add_argument("--keep-alive", type=int, default=int(os.getenv("KEEP_ALIVE_SECONDS", "5")))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    app = preload()
+    sock = bind_socket(args.host, args.port)
+
+    # Move everything allocated so far into the permanent generation so the
+    # workers' garbage collector never writes to (and un-shares) those pages
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Froze {gc.get_freeze_count()} objects; forking {args.workers} workers on {args.host}:{args.port}")
+
+    Master(app, sock, args).run()
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Course Catalog - Indexed lookup of learning resources (Udemy + SWAYAM)
+"""
+
+import re
+import json
+import difflib
+import logging
+from types import MappingProxyType
+from typing import List, Dict, Optional, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_key(skill: str) -> str:
+    """Normalize a skill name for catalog lookup (case, separators, whitespace)."""
+    key = skill.lower().replace("&", " and ")
+    key = re.sub(r"[\s_\-/,]+", " ", key)
+    return key.strip()
+
+
+class CourseCatalog:
+    """
+    Immutable course index loaded once from a versioned JSON file.
+
+    Skills resolve to a catalog key in three steps: exact normalized key,
+    alias table, then a fuzzy match against the known keys. Resolutions are
+    memoized, so repeated lookups of the same skill cost one dict hit.
+    """
+
+    def __init__(self, version: int, providers: Dict[str, Dict[str, Dict]], aliases: Dict[str, str],
+                 fuzzy_cutoff: float = 0.85, max_memoized: int = 10000):
+        self.version = version
+        self.udemy: Mapping[str, Mapping] = MappingProxyType(
+            {normalize_key(k): MappingProxyType(dict(v)) for k, v in providers.get("udemy", {}).items()}
+        )
+        self.swayam: Mapping[str, Mapping] = MappingProxyType(
+            {normalize_key(k): MappingProxyType(dict(v)) for k, v in providers.get("swayam", {}).items()}
+        )
+        self.aliases: Mapping[str, str] = MappingProxyType(
+            {normalize_key(k): normalize_key(v) for k, v in aliases.items()}
+        )
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.max_memoized = max_memoized
+        self._keys = sorted(set(self.udemy) | set(self.swayam))
+        self._resolved: Dict[str, Optional[str]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "CourseCatalog":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        catalog = cls(data.get("version", 1), data.get("providers", {}), data.get("aliases", {}))
+        logger.info(f"Course catalog v{catalog.version} loaded: {len(catalog._keys)} skills, {len(catalog.aliases)} aliases")
+        return catalog
+
+    def resolve(self, skill: str) -> Optional[str]:
+        """Map a skill name to a catalog key, or None if nothing is close enough."""
+        key = normalize_key(skill)
+        if key in self._resolved:
+            return self._resolved[key]
+
+        if key in self.udemy or key in self.swayam:
+            resolved = key
+        elif key in self.aliases:
+            resolved = self.aliases[key]
+        else:
+            close = difflib.get_close_matches(key, self._keys + list(self.aliases), n=1, cutoff=self.fuzzy_cutoff)
+            resolved = self.aliases.get(close[0], close[0]) if close else None
+
+        if len(self._resolved) >= self.max_memoized:
+            self._resolved.clear()
+        self._resolved[key] = resolved
+        return resolved
+
+    def lookup(self, skill: str) -> Dict:
+        """Learning recommendation for one skill - prefers the free SWAYAM course when available."""
+        key = self.resolve(skill)
+        udemy_rec = self.udemy.get(key) if key else None
+        if udemy_rec is None:
+            udemy_rec = {
+                "resource": f"Learn {skill} on Udemy",
+                "url": f"https://www.udemy.com/courses/search/?q={skill.replace(' ', '+')}",
+                "duration": "Varies"
+            }
+        swayam_rec = self.swayam.get(key) if key else None
+
+        if swayam_rec:
+            return {
+                "skill": skill,
+                "resource": f"{udemy_rec['resource']} | {swayam_rec['resource']}",
+                "url": swayam_rec["url"],  # Link to free SWAYAM course
+                "duration": swayam_rec["duration"],
+                "udemy_url": udemy_rec["url"],
+                "swayam_url": swayam_rec["url"]
+            }
+
+        return {
+            "skill": skill,
+            **udemy_rec
+        }
+
+    def lookup_many(self, skills: List[str]) -> List[Dict]:
+        """Resolve recommendations for several skills in one call."""
+        return [self.lookup(skill) for skill in skills]
@@ -0,0 +1,301 @@
+"""
+Filesystem Queue - Lease-based work queue on a shared directory (no broker)
+"""
+
+import os
+import json
+import time
+import socket
+import hashlib
+import threading
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+HEARTBEATS = "heartbeats"
+RESULTS = "results"
+TMP = "tmp"
+
+# Separates task id and worker id in leased file names
+LEASE_SEPARATOR = "__"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def task_id_for(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+def _write_atomic(path: str, data: str, tmp_dir: Optional[str] = None):
+    """Write via a temp file and rename; `tmp_dir` must be on the same filesystem as `path`."""
+    tmp_name = f"{os.path.basename(path)}.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp_path = os.path.join(tmp_dir or os.path.dirname(path), tmp_name)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class FileQueue:
+    """
+    A work queue that lives entirely in one directory tree, shared by any
+    number of machines through a common mount.
+
+    Tasks are small JSON files. Their state is the directory they sit in:
+    ``pending/`` -> ``leased/`` -> ``done/`` or ``failed/``. A worker claims
+    a task by renaming it into ``leased/<task>__<worker>.json``. rename() is
+    atomic, so exactly one worker wins each task.
+
+    Each worker touches ``heartbeats/<worker>`` while it runs. A lease whose
+    worker's heartbeat is older than ``lease_timeout`` is stale: any worker
+    may rename it back to ``pending/`` for a retry, up to ``max_attempts``.
+    Staleness is judged against the mtime of the checking worker's own
+    freshly touched heartbeat, so node clocks do not need to agree.
+
+    Results are appended to ``results/<worker>.jsonl``. Every worker writes
+    its own file, so no locking is needed; ``merge_results`` combines them.
+
+    Task files are rewritten through ``tmp/``, never inside a state
+    directory, so a worker killed mid-write cannot leave a stray file there.
+    Temp files older than ``lease_timeout`` are swept during recovery.
+    """
+
+    def __init__(self, root: str, worker_id: Optional[str] = None, lease_timeout: float = 60,
+                 heartbeat_interval: float = 5, max_attempts: int = 3):
+        self.root = root
+        self.worker_id = (worker_id or default_worker_id()).replace(LEASE_SEPARATOR, "_")
+        self.lease_timeout = lease_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.max_attempts = max_attempts
+        for name in (PENDING, LEASED, DONE, FAILED, HEARTBEATS, RESULTS, TMP):
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _dir(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _write_task(self, path: str, task: Dict):
+        _write_atomic(path, json.dumps(task), tmp_dir=self._dir(TMP))
+
+    def _count(self, state: str) -> int:
+        return sum(1 for n in os.listdir(self._dir(state)) if n.endswith(".json"))
+
+    # ---------- Producer ----------
+
+    def enqueue(self, items: Iterable[Dict], key_field: str = "path") -> int:
+        """Add tasks; an item whose key was already queued (in any state) is skipped."""
+        known = {name.split(LEASE_SEPARATOR)[0].rsplit(".", 1)[0]
+                 for state in (PENDING, LEASED, DONE, FAILED) for name in os.listdir(self._dir(state))}
+        added = 0
+        for item in items:
+            task_id = task_id_for(str(item[key_field]))
+            if task_id in known:
+                continue
+            task = {"task_id": task_id, "attempts": 0, "item": item}
+            self._write_task(os.path.join(self._dir(PENDING), f"{task_id}.json"), task)
+            known.add(task_id)
+            added += 1
+        return added
+
+    # ---------- Worker ----------
+
+    def _heartbeat_path(self, worker_id: str) -> str:
+        return os.path.join(self._dir(HEARTBEATS), worker_id)
+
+    def heartbeat(self) -> float:
+        """Touch this worker's heartbeat and return its mtime (the shared filesystem's clock)."""
+        path = self._heartbeat_path(self.worker_id)
+        with open(path, "a"):
+            os.utime(path, None)
+        return os.stat(path).st_mtime
+
+    def start_heartbeat(self):
+        def beat():
+            while not self._stop.wait(self.heartbeat_interval):
+                try:
+                    self.heartbeat()
+                except OSError as e:
+                    logger.warning(f"Heartbeat failed for {self.worker_id}: {e}")
+
+        self.heartbeat()
+        self._stop.clear()
+        self._heartbeat_thread = threading.Thread(target=beat, name="fs-queue-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        self._stop.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join()
+        try:
+            os.remove(self._heartbeat_path(self.worker_id))
+        except FileNotFoundError:
+            pass
+
+    def claim(self) -> Optional[Tuple[str, Dict]]:
+        """Lease one pending task. Returns (lease_path, task) or None when nothing is pending."""
+        for name in sorted(os.listdir(self._dir(PENDING))):
+            if not name.endswith(".json"):
+                continue
+            task_id = name[:-5]
+            lease_path = os.path.join(self._dir(LEASED), f"{task_id}{LEASE_SEPARATOR}{self.worker_id}.json")
+            try:
+                os.rename(os.path.join(self._dir(PENDING), name), lease_path)
+            except FileNotFoundError:
+                continue  # another worker won this one
+            with open(lease_path, "r", encoding="utf-8") as f:
+                task = json.load(f)
+            task["attempts"] += 1
+            self._write_task(lease_path, task)
+            return lease_path, task
+        return None
+
+    def complete(self, lease_path: str, task: Dict, result: Dict):
+        """Record a task's result and retire its lease."""
+        line = json.dumps({"task_id": task["task_id"], "item": task["item"], "worker": self.worker_id, **result})
+        with open(os.path.join(self._dir(RESULTS), f"{self.worker_id}.jsonl"), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(lease_path, os.path.join(self._dir(DONE), f"{task['task_id']}.json"))
+
+    def fail(self, lease_path: str, task: Dict, error: str):
+        """Retry the task later, or park it in failed/ once attempts are exhausted."""
+        task["last_error"] = error
+        self._write_task(lease_path, task)
+        target = FAILED if task["attempts"] >= self.max_attempts else PENDING
+        os.rename(lease_path, os.path.join(self._dir(target), f"{task['task_id']}.json"))
+
+    def recover_stale(self) -> int:
+        """Return leases held by workers whose heartbeat stopped to pending/. Returns how many."""
+        now = self.heartbeat()
+        heartbeats = {}
+        recovered = 0
+        for name in os.listdir(self._dir(LEASED)):
+            if not name.endswith(".json") or LEASE_SEPARATOR not in name:
+                continue
+            task_id, worker_id = name[:-5].split(LEASE_SEPARATOR, 1)
+            if worker_id == self.worker_id:
+                continue
+            if worker_id not in heartbeats:
+                try:
+                    heartbeats[worker_id] = os.stat(self._heartbeat_path(worker_id)).st_mtime
+                except FileNotFoundError:
+                    heartbeats[worker_id] = None
+            last_beat = heartbeats[worker_id]
+            if last_beat is not None and now - last_beat < self.lease_timeout:
+                continue
+
+            # Move it into a recovery name first so only one recoverer handles it
+            lease_path = os.path.join(self._dir(LEASED), name)
+            claim_path = os.path.join(self._dir(LEASED), f"{task_id}{LEASE_SEPARATOR}{self.worker_id}.json")
+            try:
+                os.rename(lease_path, claim_path)
+            except FileNotFoundError:
+                continue
+            with open(claim_path, "r", encoding="utf-8") as f:
+                task = json.load(f)
+            self.fail(claim_path, task, f"lease expired on worker {worker_id}")
+            logger.warning(f"Recovered task {task_id} from stale worker {worker_id}")
+            recovered += 1
+        self.sweep_temp_files(now)
+        return recovered
+
+    def sweep_temp_files(self, now: Optional[float] = None) -> int:
+        """Delete temp files left by workers killed mid-write. Returns how many."""
+        now = now if now is not None else self.heartbeat()
+        removed = 0
+        # State directories only hold temp files written before tmp/ existed
+        for state in (TMP, PENDING, LEASED):
+            for name in os.listdir(self._dir(state)):
+                if not name.endswith(".tmp"):
+                    continue
+                path = os.path.join(self._dir(state), name)
+                try:
+                    if now - os.stat(path).st_mtime < self.lease_timeout:
+                        continue  # possibly still being written
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+        if removed:
+            logger.warning(f"Removed {removed} orphaned temp files")
+        return removed
+
+    def run(self, handler, idle_exit: bool = True, poll_interval: float = 1.0) -> int:
+        """
+        Claim and process tasks until the queue drains (or forever when
+        idle_exit is False). Returns the number of tasks completed here.
+        """
+        self.start_heartbeat()
+        completed = 0
+        try:
+            while True:
+                claimed = self.claim()
+                if claimed is None:
+                    self.recover_stale()
+                    claimed = self.claim()
+                if claimed is None:
+                    if idle_exit and not self._count(LEASED):
+                        return completed
+                    time.sleep(poll_interval)
+                    continue
+
+                lease_path, task = claimed
+                try:
+                    result = handler(task["item"])
+                except Exception as e:
+                    logger.error(f"Task {task['task_id']} failed on {self.worker_id}: {e}")
+                    self.fail(lease_path, task, str(e))
+                    continue
+                self.complete(lease_path, task, result)
+                completed += 1
+        finally:
+            self.stop_heartbeat()
+
+    # ---------- Reporting ----------
+
+    def status(self) -> Dict[str, int]:
+        counts = {state: self._count(state) for state in (PENDING, LEASED, DONE, FAILED)}
+        counts["workers"] = len(os.listdir(self._dir(HEARTBEATS)))
+        return counts
+
+    def merge_results(self, out_path: str) -> int:
+        """
+        Combine every worker's results into one JSONL file, one line per task.
+        A task that ran twice (its worker died after writing the result)
+        keeps its latest line. Output is sorted by task id.
+        """
+        merged: Dict[str, str] = {}
+        for name in sorted(os.listdir(self._dir(RESULTS))):
+            if not name.endswith(".jsonl"):
+                continue
+            with open(os.path.join(self._dir(RESULTS), name), "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn final line from a crashed worker
+                    merged[record["task_id"]] = line
+        _write_atomic(out_path, "".join(merged[k] + "\n" for k in sorted(merged)))
+        return len(merged)
+
+    def failed_tasks(self) -> List[Dict]:
+        tasks = []
+        for name in sorted(os.listdir(self._dir(FAILED))):
+            if name.endswith(".json"):
+                with open(os.path.join(self._dir(FAILED), name), "r", encoding="utf-8") as f:
+                    tasks.append(json.load(f))
+        return tasks
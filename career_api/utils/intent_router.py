@@ -0,0 +1,187 @@
+"""
+Intent Router - Single-pass keyword, role and region detection for the chat assistant
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Dict, Optional, FrozenSet, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+# Questions must mention one of these (or a role name) to be answered
+CHAT_TOPICS = [
+    "insightedge", "website", "platform", "app", "resume", "career", "skill", "job", "learn", "match",
+    "network", "peer", "roadmap", "iot", "engineer", "data scientist", "analyst", "planning", "mobility",
+    "infrastructure", "sustainability", "developer", "ai", "city", "location", "place", "india", "gujarat",
+    "ahmedabad", "gandhinagar",
+]
+
+LOCATION_KEYWORDS = ["city", "place", "location", "where", "gujarat", "india"]
+
+# Keywords consulted by the fallback intents when no role or region is mentioned
+FALLBACK_KEYWORDS = [
+    "skill", "gap", "career", "path", "resume", "improve", "website", "insightedge",
+    "gujarat", "ahmedabad", "gandhinagar", "india",
+]
+
+
+@dataclass(frozen=True)
+class ChatRoute:
+    """Everything the rule engine needs to know about one question."""
+    allowed: bool
+    role: Optional[str]
+    region: Optional[Dict]
+    is_location_query: bool
+    intent: str
+    keywords: FrozenSet[str]
+
+
+class _Pattern:
+    __slots__ = ("text", "topic", "location", "keyword", "role_id", "region_id")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.topic = False
+        self.location = False
+        self.keyword = False
+        self.role_id: Optional[int] = None
+        self.region_id: Optional[int] = None
+
+
+class IntentRouter:
+    """
+    Aho-Corasick automaton over topic keywords, role names and region names.
+
+    Matching keeps the rule engine's substring semantics (``pattern in question``)
+    but finds every pattern in one scan of the question, so the cost no longer
+    grows with the number of roles and regions. When several roles or regions
+    appear, the one listed first in the reference data wins, as before.
+    """
+
+    def __init__(self, roles: Mapping[str, Dict], regions: List[Dict],
+                 topics: List[str] = CHAT_TOPICS, location_keywords: List[str] = LOCATION_KEYWORDS,
+                 fallback_keywords: List[str] = FALLBACK_KEYWORDS):
+        self.role_names: List[str] = list(roles.keys())
+        self.regions = regions
+        self.patterns: List[_Pattern] = []
+        pattern_ids: Dict[str, int] = {}
+
+        def pattern(text: str) -> _Pattern:
+            text = text.lower()
+            if text not in pattern_ids:
+                pattern_ids[text] = len(self.patterns)
+                self.patterns.append(_Pattern(text))
+            return self.patterns[pattern_ids[text]]
+
+        for topic in topics:
+            pattern(topic).topic = True
+        for keyword in location_keywords:
+            pattern(keyword).location = True
+        for keyword in fallback_keywords:
+            pattern(keyword).keyword = True
+        for role_id, name in enumerate(self.role_names):
+            p = pattern(name)
+            if p.role_id is None:
+                p.role_id = role_id
+        for region_id, region in enumerate(regions):
+            for name in (region["city"], region["country"]):
+                p = pattern(name)
+                if p.region_id is None:
+                    p.region_id = region_id
+
+        self._build_automaton()
+        logger.info(
+            f"Intent router compiled: {len(self.patterns)} patterns, {len(self._goto)} states "
+            f"({len(self.role_names)} roles, {len(regions)} regions)"
+        )
+
+    # ---------- Automaton ----------
+
+    def _build_automaton(self):
+        """Trie transitions, failure links and dictionary-suffix links."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._match: List[Optional[int]] = [None]
+        for pattern_id, p in enumerate(self.patterns):
+            if not p.text:
+                continue
+            state = 0
+            for ch in p.text:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._match.append(None)
+                state = nxt
+            self._match[state] = pattern_id
+
+        self._fail = [0] * len(self._goto)
+        # Nearest proper suffix state that ends a pattern, so each hit costs one hop
+        self._dict_link: List[int] = [-1] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = fail
+                self._dict_link[nxt] = fail if self._match[fail] is not None else self._dict_link[fail]
+                queue.append(nxt)
+
+    def scan(self, text: str) -> List[int]:
+        """Ids of every pattern occurring in text, each reported once."""
+        goto, fail, match, dict_link = self._goto, self._fail, self._match, self._dict_link
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = state if match[state] is not None else dict_link[state]
+            while hit > 0 and match[hit] not in found:
+                found.add(match[hit])
+                hit = dict_link[hit]
+        return list(found)
+
+    # ---------- Routing ----------
+
+    def route(self, question: str) -> ChatRoute:
+        """Resolve topic gating, role, region and fallback intent for a lowercased question."""
+        allowed = is_location_query = False
+        role_id = region_id = None
+        keywords = set()
+        for pattern_id in self.scan(question):
+            p = self.patterns[pattern_id]
+            allowed = allowed or p.topic or p.role_id is not None
+            is_location_query = is_location_query or p.location
+            if p.keyword:
+                keywords.add(p.text)
+            if p.role_id is not None and (role_id is None or p.role_id < role_id):
+                role_id = p.role_id
+            if p.region_id is not None and (region_id is None or p.region_id < region_id):
+                region_id = p.region_id
+
+        return ChatRoute(
+            allowed=allowed,
+            role=self.role_names[role_id] if role_id is not None else None,
+            region=self.regions[region_id] if region_id is not None else None,
+            is_location_query=is_location_query,
+            intent=self._fallback_intent(keywords),
+            keywords=frozenset(keywords),
+        )
+
+    @staticmethod
+    def _fallback_intent(keywords: set) -> str:
+        if "skill" in keywords and "gap" in keywords:
+            return "skills_gap"
+        if "career" in keywords and "path" in keywords:
+            return "career_path"
+        if "resume" in keywords or "improve" in keywords:
+            return "resume"
+        if "website" in keywords or "insightedge" in keywords:
+            return "platform"
+        return "general"
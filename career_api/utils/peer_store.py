@@ -0,0 +1,233 @@
+"""
+Peer Store - SQLite-backed repository for peer learning profiles
+"""
+
+import json
+import sqlite3
+import threading
+import logging
+from typing import List, Dict, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS peers (
+    id TEXT PRIMARY KEY,
+    pseudonym TEXT NOT NULL,
+    target_role TEXT NOT NULL,
+    contact_preference TEXT,
+    contact_value TEXT,
+    skills TEXT NOT NULL,
+    learning TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_peers_target_role ON peers (target_role);
+
+CREATE TABLE IF NOT EXISTS peer_skills (
+    peer_id TEXT NOT NULL REFERENCES peers (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    PRIMARY KEY (peer_id, kind, skill)
+);
+CREATE INDEX IF NOT EXISTS idx_peer_skills_skill ON peer_skills (kind, skill);
+"""
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection configured for concurrent access from several workers."""
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def _row_to_peer(row: sqlite3.Row) -> Dict:
+    return {
+        "id": row["id"],
+        "pseudonym": row["pseudonym"],
+        "target_role": row["target_role"],
+        "skills": json.loads(row["skills"]),
+        "learning": json.loads(row["learning"]),
+        "contact_preference": row["contact_preference"],
+        "contact_value": row["contact_value"],
+    }
+
+
+class PeerStore:
+    """
+    Persistent peer repository shared by every worker process.
+
+    Reads go through an in-process cache of peer rows. The cache is dropped
+    whenever SQLite reports that another connection (another thread or another
+    uvicorn worker) has committed a change, so all workers see one store.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._cache: Dict[str, Dict] = {}
+        self._cache_lock = threading.Lock()
+        # Dedicated connection used only to poll PRAGMA data_version
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._data_version = None
+
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        logger.info(f"Peer store ready at {db_path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _connect(self.db_path)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """
+        Close this thread's connections; they reopen on next use. A pre-fork
+        server calls this in the master so workers never share a connection.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        with self._cache_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+            self._data_version = None
+
+    def _validate_cache(self):
+        """Drop the read cache if the database changed since it was filled."""
+        with self._cache_lock:
+            if self._version_conn is None:
+                self._version_conn = _connect(self.db_path)
+            version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._cache.clear()
+                self._data_version = version
+
+    # ---------- Writes ----------
+
+    def upsert_many(self, peers: Iterable[Dict], replace: bool = True) -> int:
+        """Insert or update peer profiles. With replace=False existing ids are kept."""
+        conn = self._conn()
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        written = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for peer in peers:
+                cur = conn.execute(
+                    f"{verb} INTO peers (id, pseudonym, target_role, contact_preference, contact_value, skills, learning) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        peer["id"], peer["pseudonym"], peer["target_role"],
+                        peer.get("contact_preference"), peer.get("contact_value"),
+                        json.dumps(peer.get("skills", [])), json.dumps(peer.get("learning", [])),
+                    ),
+                )
+                if cur.rowcount == 0:
+                    continue
+                written += 1
+                conn.execute("DELETE FROM peer_skills WHERE peer_id = ?", (peer["id"],))
+                rows = [(peer["id"], "skill", s.lower()) for s in peer.get("skills", [])]
+                rows += [(peer["id"], "learning", s.lower()) for s in peer.get("learning", [])]
+                conn.executemany("INSERT OR IGNORE INTO peer_skills (peer_id, kind, skill) VALUES (?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        with self._cache_lock:
+            self._cache.clear()
+        return written
+
+    def seed_if_empty(self, peers: Iterable[Dict]) -> int:
+        """Load the bundled peer profiles on first start; later restarts keep the stored data."""
+        if self.count() > 0:
+            return 0
+        written = self.upsert_many(peers, replace=False)
+        logger.info(f"Seeded peer store with {written} profiles")
+        return written
+
+    # ---------- Reads ----------
+
+    def count(self, target_role: Optional[str] = None) -> int:
+        if target_role:
+            row = self._conn().execute("SELECT COUNT(*) FROM peers WHERE target_role = ?", (target_role,)).fetchone()
+        else:
+            row = self._conn().execute("SELECT COUNT(*) FROM peers").fetchone()
+        return row[0]
+
+    def get(self, peer_id: str) -> Optional[Dict]:
+        """Look up a single peer by id, served from the read cache when possible."""
+        self._validate_cache()
+        peer = self._cache.get(peer_id)
+        if peer is not None:
+            return peer
+        row = self._conn().execute("SELECT * FROM peers WHERE id = ?", (peer_id,)).fetchone()
+        if row is None:
+            return None
+        peer = _row_to_peer(row)
+        with self._cache_lock:
+            self._cache[peer_id] = peer
+        return peer
+
+    def get_many(self, peer_ids: List[str]) -> List[Dict]:
+        """Resolve several peer ids, fetching only the ones missing from the cache."""
+        self._validate_cache()
+        with self._cache_lock:
+            found = {pid: self._cache[pid] for pid in peer_ids if pid in self._cache}
+        missing = [pid for pid in dict.fromkeys(peer_ids) if pid not in found]
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            rows = self._conn().execute(f"SELECT * FROM peers WHERE id IN ({placeholders})", missing).fetchall()
+            # Answer from the rows just read: a concurrent data_version change may clear the cache meanwhile
+            fetched = {row["id"]: _row_to_peer(row) for row in rows}
+            found.update(fetched)
+            with self._cache_lock:
+                self._cache.update(fetched)
+        return [found[pid] for pid in peer_ids if pid in found]
+
+    def list_peers(self, target_role: Optional[str] = None, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """Page through peers in id order, optionally filtered by target role."""
+        if target_role:
+            rows = self._conn().execute(
+                "SELECT id FROM peers WHERE target_role = ? ORDER BY id LIMIT ? OFFSET ?",
+                (target_role, limit, offset),
+            ).fetchall()
+        else:
+            rows = self._conn().execute(
+                "SELECT id FROM peers ORDER BY id LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+        return self.get_many([row["id"] for row in rows])
+
+    def distinct_skills(self) -> List[str]:
+        """Every skill that appears in a peer profile (offered or being learned)."""
+        rows = self._conn().execute("SELECT DISTINCT skill FROM peer_skills ORDER BY skill").fetchall()
+        return [row["skill"] for row in rows]
+
+    def find_complementary(self, user_skills: Iterable[str], user_learning: Iterable[str]) -> List[Dict]:
+        """
+        Return peers who either have a skill the user is learning or are
+        learning a skill the user has. Uses the skill index instead of
+        scanning every profile.
+        """
+        skills = sorted(set(s.lower() for s in user_skills))
+        learning = sorted(set(s.lower() for s in user_learning))
+        clauses, params = [], []
+        if learning:
+            clauses.append(f"(kind = 'skill' AND skill IN ({','.join('?' * len(learning))}))")
+            params.extend(learning)
+        if skills:
+            clauses.append(f"(kind = 'learning' AND skill IN ({','.join('?' * len(skills))}))")
+            params.extend(skills)
+        if not clauses:
+            return []
+        rows = self._conn().execute(
+            f"SELECT DISTINCT peer_id FROM peer_skills WHERE {' OR '.join(clauses)} ORDER BY peer_id",
+            params,
+        ).fetchall()
+        return self.get_many([row["peer_id"] for row in rows])
@@ -0,0 +1,183 @@
+"""
+Reference Data - Load, compile and hot-reload roles, regions, peers and courses
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Dict, Tuple, Mapping, Callable, Optional
+
+from .course_catalog import CourseCatalog
+from .skill_index import SkillIndex
+from .intent_router import IntentRouter
+from .shared_tables import SharedTableStore
+
+logger = logging.getLogger(__name__)
+
+
+ROLES_FILE = "roles.json"
+REGIONS_FILE = "regions.json"
+PEERS_FILE = "peers.json"
+COURSES_FILE = "courses.json"
+
+# Touched by the admin reload endpoint so every watching worker picks up the change
+RELOAD_STAMP_FILE = ".reload"
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """
+    One consistent, read-only view of all reference data and its compiled indexes.
+
+    Request handlers grab the current snapshot once and use it throughout, so
+    a reload that happens mid-request never mixes old and new data.
+    """
+    generation: int
+    signature: Tuple
+    roles: Mapping[str, Dict]
+    regions: Tuple[Dict, ...]
+    sector_keywords: Mapping[str, List[str]]
+    peers: Tuple[Dict, ...]
+    courses: CourseCatalog
+    skill_index: SkillIndex
+    intent_router: IntentRouter
+    versions: Mapping[str, int]
+
+
+def _read_json(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ReferenceDataStore:
+    """
+    Holds the current ReferenceSnapshot and swaps it atomically on reload.
+
+    Readers never take a lock: ``current()`` is a single attribute read and a
+    new snapshot is fully compiled before it replaces the old one. Reloads are
+    serialized among themselves and can be triggered explicitly or by a
+    background thread that polls the data files' mtimes.
+    """
+
+    def __init__(self, data_dir: str, course_catalog_path: Optional[str] = None,
+                 semantic_provider: Optional[Callable] = None, table_store: Optional[SharedTableStore] = None):
+        self.data_dir = data_dir
+        self.course_catalog_path = course_catalog_path or os.path.join(data_dir, COURSES_FILE)
+        self.semantic_provider = semantic_provider
+        self.table_store = table_store
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[Optional[ReferenceSnapshot], ReferenceSnapshot], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._snapshot: Optional[ReferenceSnapshot] = None
+        self._snapshot = self._build(generation=1)
+
+    # ---------- Loading ----------
+
+    def _paths(self) -> List[str]:
+        return [
+            os.path.join(self.data_dir, ROLES_FILE),
+            os.path.join(self.data_dir, REGIONS_FILE),
+            os.path.join(self.data_dir, PEERS_FILE),
+            self.course_catalog_path,
+            os.path.join(self.data_dir, RELOAD_STAMP_FILE),
+        ]
+
+    def _signature(self) -> Tuple:
+        signature = []
+        for path in self._paths():
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def _build(self, generation: int) -> ReferenceSnapshot:
+        """Load every data file and compile the scoring indexes and chat router."""
+        signature = self._signature()
+        roles_data = _read_json(os.path.join(self.data_dir, ROLES_FILE))
+        regions_data = _read_json(os.path.join(self.data_dir, REGIONS_FILE))
+        peers_data = _read_json(os.path.join(self.data_dir, PEERS_FILE))
+        courses = CourseCatalog.load(self.course_catalog_path)
+
+        roles = roles_data["roles"]
+        regions = regions_data["regions"]
+        sector_keywords = regions_data["sector_keywords"]
+        skill_index = SkillIndex(roles, regions, sector_keywords, semantic_provider=self.semantic_provider,
+                                 table_store=self.table_store)
+
+        snapshot = ReferenceSnapshot(
+            generation=generation,
+            signature=signature,
+            roles=MappingProxyType(roles),
+            regions=tuple(regions),
+            sector_keywords=MappingProxyType(sector_keywords),
+            peers=tuple(peers_data["peers"]),
+            courses=courses,
+            skill_index=skill_index,
+            intent_router=IntentRouter(roles, regions),
+            versions=MappingProxyType({
+                "roles": roles_data.get("version", 1),
+                "regions": regions_data.get("version", 1),
+                "peers": peers_data.get("version", 1),
+                "courses": courses.version,
+            }),
+        )
+        logger.info(f"Reference data generation {generation} compiled: {dict(snapshot.versions)}")
+        return snapshot
+
+    # ---------- Access ----------
+
+    def current(self) -> ReferenceSnapshot:
+        return self._snapshot
+
+    def add_listener(self, callback: Callable[[Optional[ReferenceSnapshot], ReferenceSnapshot], None]):
+        """Register a callback run with (old, new) after each successful reload."""
+        self._listeners.append(callback)
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild and publish a new snapshot if the files changed. Returns True if swapped."""
+        with self._reload_lock:
+            old = self._snapshot
+            if not force and self._signature() == old.signature:
+                return False
+            new = self._build(generation=old.generation + 1)
+            self._snapshot = new
+
+        for callback in self._listeners:
+            try:
+                callback(old, new)
+            except Exception as e:
+                logger.error(f"Reference data reload listener failed: {e}")
+        return True
+
+    def request_reload(self):
+        """Reload this process and touch the stamp file so watching workers follow."""
+        stamp = os.path.join(self.data_dir, RELOAD_STAMP_FILE)
+        with open(stamp, "a"):
+            os.utime(stamp, None)
+        self.reload(force=True)
+
+    # ---------- File watching ----------
+
+    def start_watching(self, interval: float):
+        """Poll the data files every `interval` seconds and reload on change."""
+        if interval <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    # Keep serving the previous snapshot if the new files are invalid
+                    logger.error(f"Reference data reload failed, keeping generation {self._snapshot.generation}: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="reference-data-watcher", daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching reference data in {self.data_dir} every {interval}s")
@@ -0,0 +1,480 @@
+"""
+Session Store - Per-user session data with an in-memory tier over a shared backend
+"""
+
+import json
+import time
+import uuid
+import sqlite3
+import secrets
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    from redis.exceptions import WatchError
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+    class WatchError(Exception):
+        """Stands in for redis.exceptions.WatchError; LocalRedisStandIn never raises it."""
+
+
+def new_session_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def is_valid_token(token: Optional[str]) -> bool:
+    """Cheap sanity check so arbitrary header/cookie values never reach the backend."""
+    return bool(token) and 16 <= len(token) <= 128 and all(c.isalnum() or c in "-_" for c in token)
+
+
+# ============ Backends ============
+
+class SessionBackend:
+    """
+    Shared storage for serialized sessions.
+
+    Every save stores a fresh version string next to the payload, so the
+    in-memory tier can check whether its copy is still current without
+    transferring the payload.
+    """
+
+    def load(self, token: str) -> Optional[Tuple[str, str]]:
+        """(version, payload) for a live session, or None."""
+        raise NotImplementedError
+
+    def version(self, token: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def save(self, token: str, version: str, payload: str, ttl: int):
+        raise NotImplementedError
+
+    def save_if_version(self, token: str, expected_version: str, version: str, payload: str, ttl: int) -> bool:
+        """Save only if the stored version is still `expected_version` (compare-and-set)."""
+        raise NotImplementedError
+
+    def touch(self, token: str, ttl: int):
+        """Push the expiry of an existing session forward."""
+        raise NotImplementedError
+
+    def delete(self, token: str):
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        return 0
+
+    def close(self):
+        """Release connections held by this process; they reopen on next use."""
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    token TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at);
+"""
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions in a WAL-mode SQLite file shared by every worker on the host."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._conn().executescript(SQLITE_SCHEMA)
+        logger.info(f"SQLite session backend ready at {db_path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def load(self, token: str) -> Optional[Tuple[str, str]]:
+        row = self._conn().execute(
+            "SELECT version, payload FROM sessions WHERE token = ? AND expires_at > ?", (token, time.time())
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def version(self, token: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT version FROM sessions WHERE token = ? AND expires_at > ?", (token, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, token: str, version: str, payload: str, ttl: int):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO sessions (token, version, payload, expires_at) VALUES (?, ?, ?, ?)",
+            (token, version, payload, time.time() + ttl),
+        )
+
+    def save_if_version(self, token: str, expected_version: str, version: str, payload: str, ttl: int) -> bool:
+        now = time.time()
+        return self._conn().execute(
+            "UPDATE sessions SET version = ?, payload = ?, expires_at = ? "
+            "WHERE token = ? AND version = ? AND expires_at > ?",
+            (version, payload, now + ttl, token, expected_version, now),
+        ).rowcount == 1
+
+    def touch(self, token: str, ttl: int):
+        self._conn().execute("UPDATE sessions SET expires_at = ? WHERE token = ?", (time.time() + ttl, token))
+
+    def delete(self, token: str):
+        self._conn().execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    def purge_expired(self) -> int:
+        return self._conn().execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+class LocalRedisStandIn:
+    """
+    Minimal in-process substitute for the redis client calls used here
+    (get/set with ex/expire/delete and WATCH pipelines), for development
+    without a Redis server. Data is not shared between processes.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+        # Re-entrant: a watching pipeline holds it until execute() and calls get/set meanwhile
+        self._lock = threading.RLock()
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value, ex: Optional[int] = None):
+        value = value if isinstance(value, bytes) else str(value).encode("utf-8")
+        with self._lock:
+            self._data[key] = (time.time() + ex if ex else None, value)
+        return True
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._lock:
+            value = self._live(key)
+            if value is None:
+                return False
+            self._data[key] = (time.time() + seconds, value)
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def pipeline(self) -> "_StandInPipeline":
+        return _StandInPipeline(self)
+
+
+class _StandInPipeline:
+    """watch/get/multi/set/execute of a redis pipeline; watching simply holds the stand-in's lock."""
+
+    def __init__(self, client: LocalRedisStandIn):
+        self.client = client
+        self._queued = []
+        self._watching = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.reset()
+
+    def watch(self, *keys: str):
+        if not self._watching:
+            self.client._lock.acquire()
+            self._watching = True
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def multi(self):
+        pass
+
+    def set(self, key: str, value, ex: Optional[int] = None):
+        self._queued.append((key, value, ex))
+
+    def execute(self) -> list:
+        try:
+            return [self.client.set(key, value, ex=ex) for key, value, ex in self._queued]
+        finally:
+            self.reset()
+
+    def reset(self):
+        self._queued = []
+        if self._watching:
+            self._watching = False
+            self.client._lock.release()
+
+
+class RedisSessionBackend(SessionBackend):
+    """
+    Sessions in Redis (or any client exposing the same get/set/expire/delete
+    calls), for deployments spanning several hosts. Expiry is left to Redis.
+    """
+
+    def __init__(self, client, prefix: str = "career:session:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _keys(self, token: str) -> Tuple[str, str]:
+        return f"{self.prefix}{token}", f"{self.prefix}{token}:v"
+
+    @staticmethod
+    def _text(value) -> Optional[str]:
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def load(self, token: str) -> Optional[Tuple[str, str]]:
+        data_key, version_key = self._keys(token)
+        version, payload = self._text(self.client.get(version_key)), self._text(self.client.get(data_key))
+        if version is None or payload is None:
+            return None
+        return version, payload
+
+    def version(self, token: str) -> Optional[str]:
+        return self._text(self.client.get(self._keys(token)[1]))
+
+    def save(self, token: str, version: str, payload: str, ttl: int):
+        data_key, version_key = self._keys(token)
+        # Payload first: a reader that sees the new version always finds the new payload
+        self.client.set(data_key, payload, ex=ttl)
+        self.client.set(version_key, version, ex=ttl)
+
+    def save_if_version(self, token: str, expected_version: str, version: str, payload: str, ttl: int) -> bool:
+        data_key, version_key = self._keys(token)
+        with self.client.pipeline() as pipe:
+            pipe.watch(version_key)
+            if self._text(pipe.get(version_key)) != expected_version:
+                return False
+            pipe.multi()
+            pipe.set(data_key, payload, ex=ttl)
+            pipe.set(version_key, version, ex=ttl)
+            try:
+                pipe.execute()
+            except WatchError:
+                return False
+        return True
+
+    def touch(self, token: str, ttl: int):
+        for key in self._keys(token):
+            self.client.expire(key, ttl)
+
+    def delete(self, token: str):
+        self.client.delete(*self._keys(token))
+
+
+def create_session_backend(kind: str, sqlite_path: Optional[str] = None,
+                           redis_url: Optional[str] = None) -> Optional[SessionBackend]:
+    """Build the configured backend: "sqlite", "redis" or "memory" (no shared tier)."""
+    kind = kind.lower()
+    if kind == "memory":
+        return None
+    if kind == "redis":
+        if redis_url and REDIS_AVAILABLE:
+            return RedisSessionBackend(redis.Redis.from_url(redis_url))
+        logger.warning("Redis session backend requested without REDIS_URL or the redis package; "
+                       "using the in-process stand-in (sessions are not shared between workers)")
+        return RedisSessionBackend(LocalRedisStandIn())
+    if kind == "sqlite":
+        return SQLiteSessionBackend(sqlite_path)
+    raise ValueError(f"Unknown session backend: {kind}")
+
+
+# ============ Session Store ============
+
+class _Entry:
+    __slots__ = ("data", "version", "expires_at", "touched_at")
+
+    def __init__(self, data: Dict, version: str, expires_at: float, touched_at: float):
+        self.data = data
+        self.version = version
+        self.expires_at = expires_at
+        self.touched_at = touched_at
+
+
+class SessionStore:
+    """
+    Session data keyed by an opaque token.
+
+    Sessions are written through to the shared backend. Each worker keeps
+    recently used sessions decoded in a bounded LRU tier with a sliding TTL.
+    A cached entry is trusted only while its version matches the backend's,
+    so a session updated by another worker is reloaded on next use. Entries
+    whose JSON exceeds ``max_entry_bytes`` skip the memory tier.
+    """
+
+    def __init__(self, backend: Optional[SessionBackend], ttl_seconds: int = 86400, max_entries: int = 1000,
+                 max_entry_bytes: int = 256 * 1024, purge_interval: float = 300):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self.purge_interval = purge_interval
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Serializes read-modify-write updates when there is no shared backend to compare-and-set against
+        self._write_lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _remember(self, token: str, data: Dict, version: str, size: int, now: float):
+        with self._lock:
+            if size > self.max_entry_bytes:
+                self._entries.pop(token, None)
+                return
+            self._entries[token] = _Entry(data, version, now + self.ttl_seconds, now)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, token: Optional[str]) -> Dict:
+        """Session data for token, or an empty dict for unknown/expired sessions."""
+        if not is_valid_token(token):
+            return {}
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[token]
+                entry = None
+
+        if self.backend is None:
+            if entry is None:
+                return {}
+            entry.expires_at = now + self.ttl_seconds
+            with self._lock:
+                if token in self._entries:
+                    self._entries.move_to_end(token)
+            return entry.data
+
+        if entry is not None and self.backend.version(token) == entry.version:
+            # Sliding expiry: extend the shared copy once half its lifetime has passed
+            if now - entry.touched_at > self.ttl_seconds / 2:
+                self.backend.touch(token, self.ttl_seconds)
+                entry.touched_at = now
+            entry.expires_at = now + self.ttl_seconds
+            with self._lock:
+                if token in self._entries:
+                    self._entries.move_to_end(token)
+            return entry.data
+
+        stored = self.backend.load(token)
+        if stored is None:
+            with self._lock:
+                self._entries.pop(token, None)
+            return {}
+        version, payload = stored
+        data = json.loads(payload)
+        self._remember(token, data, version, len(payload), now)
+        return data
+
+    def exists(self, token: Optional[str]) -> bool:
+        """Whether token names a live (unexpired) session."""
+        if not is_valid_token(token):
+            return False
+        if self.backend is not None:
+            return self.backend.version(token) is not None
+        with self._lock:
+            entry = self._entries.get(token)
+            return entry is not None and entry.expires_at > time.time()
+
+    def save(self, token: str, data: Dict):
+        """Replace a session's data and publish it to the shared backend."""
+        now = time.time()
+        payload = json.dumps(data)
+        version = uuid.uuid4().hex
+        if self.backend is not None:
+            self.backend.save(token, version, payload, self.ttl_seconds)
+            if now - self._last_purge > self.purge_interval:
+                self._last_purge = now
+                purged = self.backend.purge_expired()
+                if purged:
+                    logger.info(f"Purged {purged} expired sessions")
+        elif len(payload) > self.max_entry_bytes:
+            raise ValueError(f"Session data is {len(payload)} bytes, limit is {self.max_entry_bytes}")
+        self._remember(token, data, version, len(payload), now)
+
+    def update(self, token: str, **fields) -> Dict:
+        """Merge fields into a session's data and save it."""
+        with self._write_lock:
+            data = dict(self.get(token))
+            data.update(fields)
+            self.save(token, data)
+        return data
+
+    def update_if(self, token: str, expected: Dict, attempts: int = 5, **fields) -> bool:
+        """
+        Merge fields into a session only if its current values match
+        `expected`, as one atomic step against other writers. Returns
+        whether the fields were written.
+        """
+        if self.backend is None:
+            with self._write_lock:
+                data = self.get(token)
+                if not data or any(data.get(k) != v for k, v in expected.items()):
+                    return False
+                data = dict(data, **fields)
+                self.save(token, data)
+                return True
+
+        for _ in range(attempts):
+            stored = self.backend.load(token)
+            if stored is None:
+                return False
+            version, payload = stored
+            data = json.loads(payload)
+            if any(data.get(k) != v for k, v in expected.items()):
+                return False
+            data.update(fields)
+            new_payload = json.dumps(data)
+            new_version = uuid.uuid4().hex
+            if self.backend.save_if_version(token, version, new_version, new_payload, self.ttl_seconds):
+                self._remember(token, data, new_version, len(new_payload), time.time())
+                return True
+            # Another writer got in between; re-check against its data
+        logger.warning(f"Gave up on a conditional session update after {attempts} conflicting writes")
+        return False
+
+    def delete(self, token: str):
+        with self._lock:
+            self._entries.pop(token, None)
+        if self.backend is not None:
+            self.backend.delete(token)
+
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
+
+    def stats(self) -> Dict:
+        return {
+            "backend": type(self.backend).__name__ if self.backend else "memory",
+            "cached_sessions": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,121 @@
+"""
+Shared Tables - Read-only NumPy tables mapped from files shared by all worker processes
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+from typing import Dict, Callable, Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable content hash of JSON-serializable inputs."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0.0
+
+
+class SharedTableStore:
+    """
+    Publishes named sets of arrays as ``<root>/<name>-<fingerprint>/<array>.npy``
+    and maps them back with ``mmap_mode="r"``.
+
+    A generation is written to a temporary directory and renamed into place,
+    so a reader sees either a complete generation or none. The first process
+    to compile a fingerprint publishes it; every other worker, and every later
+    restart, maps the same files, so the pages sit once in the OS page cache
+    however many workers there are. ``<name>.current`` names the latest
+    generation, and older ones are pruned. Mappings already open stay valid
+    after their files are unlinked.
+    """
+
+    def __init__(self, root: str, keep_generations: int = 2):
+        self.root = root
+        self.keep_generations = keep_generations
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, name: str, key: str) -> str:
+        return os.path.join(self.root, f"{name}-{key}")
+
+    def get_or_publish(self, name: str, key: str, build: Callable[[], Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        """Map generation `key` of `name`, compiling and publishing it first if needed."""
+        path = self._path(name, key)
+        if not os.path.isdir(path):
+            self._publish(name, key, build())
+        self._set_current(name, key)
+        try:
+            return self._map(path)
+        except FileNotFoundError:
+            # Pruned by another process between publish and map; publish it again
+            self._publish(name, key, build())
+            return self._map(path)
+
+    def _publish(self, name: str, key: str, arrays: Dict[str, np.ndarray]):
+        path = self._path(name, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        for array_name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{array_name}.npy"), np.ascontiguousarray(array))
+        try:
+            os.rename(tmp_path, path)
+            logger.info(f"Published {name} tables generation {key} ({len(arrays)} arrays)")
+        except OSError:
+            # Another worker published the same generation first; use theirs
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def _map(self, path: str) -> Dict[str, np.ndarray]:
+        return {
+            entry[:-4]: np.load(os.path.join(path, entry), mmap_mode="r")
+            for entry in sorted(os.listdir(path)) if entry.endswith(".npy")
+        }
+
+    def _set_current(self, name: str, key: str):
+        pointer = os.path.join(self.root, f"{name}.current")
+        try:
+            with open(pointer, "r") as f:
+                if f.read().strip() == key:
+                    return
+        except FileNotFoundError:
+            pass
+        tmp_pointer = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp_pointer, "w") as f:
+            f.write(key)
+        os.replace(tmp_pointer, pointer)
+        self._prune(name, key)
+
+    def current(self, name: str) -> str:
+        """Fingerprint of the most recently published generation of `name`, or ''."""
+        try:
+            with open(os.path.join(self.root, f"{name}.current"), "r") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return ""
+
+    def _prune(self, name: str, current_key: str):
+        """Drop all but the newest generations of `name` (the current one is always kept)."""
+        prefix = f"{name}-"
+        generations = [
+            os.path.join(self.root, entry) for entry in os.listdir(self.root)
+            if entry.startswith(prefix) and not entry.endswith(".tmp")
+        ]
+        generations.sort(key=_mtime, reverse=True)
+        keep = {self._path(name, current_key)}
+        keep.update(generations[:self.keep_generations])
+        for path in generations:
+            if path not in keep:
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,157 @@
+"""
+Skill Embeddings - Semantic skill matching with cached sentence embeddings
+"""
+
+import os
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Iterable, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"sentence-transformers not available, semantic matching disabled: {e}")
+    SEMANTIC_AVAILABLE = False
+
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+
+def normalize_skill(skill: str) -> str:
+    """Canonical form used as the cache key for a skill term."""
+    return " ".join(skill.lower().split())
+
+
+class SkillEmbeddingIndex:
+    """
+    Embeds the skill vocabulary once and matches user skills by cosine similarity.
+
+    The vocabulary matrix is written to ``<cache_dir>/skill_vocab-<fingerprint>.npy``
+    and opened with ``mmap_mode="r"``, so restarts and sibling workers reuse the
+    same file instead of re-encoding. Terms outside the vocabulary (typically
+    user skills) are encoded once and kept in a bounded LRU cache.
+    """
+
+    def __init__(self, vocabulary: Iterable[str], cache_dir: str, model_name: str = DEFAULT_MODEL,
+                 threshold: float = 0.5, max_cached_terms: int = 10000):
+        self.vocabulary: List[str] = sorted(set(normalize_skill(v) for v in vocabulary if v and v.strip()))
+        self.vocab_ids: Dict[str, int] = {term: i for i, term in enumerate(self.vocabulary)}
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_cached_terms = max_cached_terms
+
+        self._model = None
+        self._lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._term_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.matrix = self._load_or_build_matrix()
+
+    # ---------- Embedding storage ----------
+
+    @property
+    def fingerprint(self) -> str:
+        digest = hashlib.sha1(self.model_name.encode("utf-8"))
+        for term in self.vocabulary:
+            digest.update(b"\0" + term.encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def _get_model(self):
+        if self._model is None:
+            logger.info(f"Loading sentence embedding model {self.model_name}...")
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def _encode(self, terms: List[str]) -> np.ndarray:
+        with self._lock:
+            vectors = self._get_model().encode(terms, convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _load_or_build_matrix(self) -> np.ndarray:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"skill_vocab-{self.fingerprint}.npy")
+        if not os.path.exists(path):
+            logger.info(f"Encoding {len(self.vocabulary)} vocabulary skills...")
+            matrix = self._encode(self.vocabulary)
+            # Write to a temp file first so concurrent workers never map a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, matrix)
+            os.replace(tmp_path, path)
+        matrix = np.load(path, mmap_mode="r")
+        logger.info(f"Skill vocabulary matrix mapped from {path} ({matrix.shape[0]} terms)")
+        return matrix
+
+    # ---------- Lookup ----------
+
+    def embed(self, terms: Iterable[str]) -> np.ndarray:
+        """Return unit-length embeddings for terms, encoding only never-seen ones."""
+        keys = [normalize_skill(t) for t in terms]
+        vectors: Dict[str, np.ndarray] = {}
+        with self._cache_lock:
+            for key in dict.fromkeys(keys):
+                if key not in self.vocab_ids and key in self._term_cache:
+                    vectors[key] = self._term_cache[key]
+                    self._term_cache.move_to_end(key)
+        unknown = [k for k in dict.fromkeys(keys) if k not in self.vocab_ids and k not in vectors]
+        if unknown:
+            # Read back from the encoded batch, not the cache: eviction (here or in a
+            # concurrent call) may already have dropped some of these terms
+            encoded = self._encode(unknown)
+            vectors.update(zip(unknown, encoded))
+            with self._cache_lock:
+                for key, vector in zip(unknown, encoded):
+                    self._term_cache[key] = vector
+                    self._term_cache.move_to_end(key)
+                while len(self._term_cache) > self.max_cached_terms:
+                    self._term_cache.popitem(last=False)
+
+        dim = self.matrix.shape[1]
+        out = np.empty((len(keys), dim), dtype=np.float32)
+        for i, key in enumerate(keys):
+            row = self.vocab_ids.get(key)
+            out[i] = self.matrix[row] if row is not None else vectors[key]
+        return out
+
+    def similarity(self, user_skills: Iterable[str], targets: Iterable[str]) -> np.ndarray:
+        """Cosine similarity matrix of shape (len(user_skills), len(targets))."""
+        user_skills, targets = list(user_skills), list(targets)
+        if not user_skills or not targets:
+            return np.zeros((len(user_skills), len(targets)), dtype=np.float32)
+        return self.embed(user_skills) @ self.embed(targets).T
+
+    def matched_targets(self, user_skills: Iterable[str], targets: List[str]) -> List[bool]:
+        """For each target skill, whether any user skill is semantically close enough."""
+        sims = self.similarity(user_skills, targets)
+        if sims.size == 0:
+            return [False] * len(targets)
+        return (sims.max(axis=0) >= self.threshold).tolist()
+
+    def top_k(self, user_skills: Iterable[str], k: int = 3) -> List[List[Tuple[str, float]]]:
+        """Nearest vocabulary terms for each user skill, best first."""
+        user_skills = list(user_skills)
+        if not user_skills or not self.vocabulary:
+            return [[] for _ in user_skills]
+        sims = self.embed(user_skills) @ self.matrix.T
+        k = min(k, sims.shape[1])
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        results = []
+        for row, cols in zip(sims, top):
+            cols = cols[np.argsort(-row[cols])]
+            results.append([(self.vocabulary[c], float(row[c])) for c in cols if row[c] >= self.threshold])
+        return results
+
+    def expand(self, user_skills: Iterable[str], k: int = 3) -> Set[str]:
+        """User skills plus their closest vocabulary terms above the threshold."""
+        user_skills = [normalize_skill(s) for s in user_skills]
+        expanded = set(user_skills)
+        for neighbours in self.top_k(user_skills, k):
+            expanded.update(term for term, _ in neighbours)
+        return expanded
@@ -0,0 +1,280 @@
+"""
+Skill Index - Vectorized role and region scoring tables
+"""
+
+import threading
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Iterable, Callable, Optional
+
+import numpy as np
+
+from .shared_tables import SharedTableStore, fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Bump when the table layout changes so published generations are not reused
+TABLE_FORMAT = 1
+TABLE_NAMES = ("role_matrix", "role_sizes", "keyword_sector", "region_top",
+               "demand", "supply", "economic_value", "remote_bonus")
+
+
+class SkillProfiles:
+    """
+    Boolean hit matrices for a batch of skill profiles.
+
+    ``requirements`` is (N, V) over role requirement terms, ``keywords`` is
+    (N, K) over sector keywords and ``top_skills`` is (N, T) over regional
+    flagship skills.
+    """
+
+    def __init__(self, requirements: np.ndarray, keywords: np.ndarray, top_skills: np.ndarray):
+        self.requirements = requirements
+        self.keywords = keywords
+        self.top_skills = top_skills
+
+    def __len__(self) -> int:
+        return self.requirements.shape[0]
+
+
+class SkillIndex:
+    """
+    Compiles ROLE_DEFINITIONS, REGIONAL_DEMAND_DATA and the sector keywords
+    into dense NumPy tables so many profiles can be scored with a few
+    matrix products instead of nested Python loops. The tables are
+    read-only and can be shared between processes through a SharedTableStore.
+
+    Matching follows the scalar functions in main.py: a term is covered when
+    it is a substring of one of the user's (lowercased) skills. Sector
+    keywords are matched against the skills joined with spaces, as
+    calculate_skill_arbitrage does, so multi-word keywords ("smart grid")
+    can span two skills. Every distinct user skill is resolved against all
+    terms once and cached.
+    """
+
+    def __init__(self, roles: Dict[str, Dict], regions: List[Dict], sector_keywords: Dict[str, List[str]],
+                 semantic_provider: Optional[Callable] = None, max_cached_terms: int = 50000,
+                 table_store: Optional[SharedTableStore] = None):
+        self.role_names: List[str] = list(roles.keys())
+        self.requirement_terms: List[str] = sorted(set(
+            req.lower() for role_def in roles.values() for req in role_def["requirements"]
+        ))
+        self.regions = regions
+        self.sectors: List[str] = list(sector_keywords.keys())
+        self.keyword_terms: List[str] = sorted(set(kw for kws in sector_keywords.values() for kw in kws))
+        self.top_skill_terms: List[str] = sorted(set(s.lower() for r in regions for s in r["top_skills"]))
+        # Only keywords containing a space can match across two joined skills
+        self.phrase_keywords: List[int] = [i for i, kw in enumerate(self.keyword_terms) if " " in kw]
+
+        # With a table store, workers map one published copy of the tables instead of each compiling their own
+        if table_store is not None:
+            key = fingerprint(TABLE_FORMAT, roles, regions, sector_keywords)
+            tables = table_store.get_or_publish("skill_index", key, lambda: self._compile(roles, regions, sector_keywords))
+        else:
+            tables = self._compile(roles, regions, sector_keywords)
+        for name in TABLE_NAMES:
+            setattr(self, name, tables[name])
+
+        self.semantic_provider = semantic_provider
+        self.max_cached_terms = max_cached_terms
+        self._term_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        logger.info(
+            f"Skill index compiled: {len(self.requirement_terms)} requirement terms, {len(self.role_names)} roles, "
+            f"{len(self.keyword_terms)} sector keywords, {len(regions)} regions"
+            + (" (shared tables)" if table_store is not None else "")
+        )
+
+    def _compile(self, roles: Dict[str, Dict], regions: List[Dict], sector_keywords: Dict[str, List[str]]) -> Dict[str, np.ndarray]:
+        """Build the dense scoring tables from the reference data."""
+        # Roles: requirement vocabulary (V) x roles (M)
+        req_ids = {term: i for i, term in enumerate(self.requirement_terms)}
+        role_matrix = np.zeros((len(self.requirement_terms), len(self.role_names)), dtype=np.float64)
+        for m, role_def in enumerate(roles.values()):
+            for req in role_def["requirements"]:
+                role_matrix[req_ids[req.lower()], m] += 1
+
+        # Regions: sector keywords (K) x sectors (S), flagship skills (T) x regions (G)
+        kw_ids = {term: i for i, term in enumerate(self.keyword_terms)}
+        keyword_sector = np.zeros((len(self.keyword_terms), len(self.sectors)), dtype=np.float64)
+        for s, kws in enumerate(sector_keywords.values()):
+            for kw in kws:
+                keyword_sector[kw_ids[kw], s] = 1
+
+        top_ids = {term: i for i, term in enumerate(self.top_skill_terms)}
+        region_top = np.zeros((len(self.top_skill_terms), len(regions)), dtype=np.float64)
+        for g, region in enumerate(regions):
+            for skill in region["top_skills"]:
+                region_top[top_ids[skill.lower()], g] += 1
+
+        return {
+            "role_matrix": role_matrix,
+            "role_sizes": np.array([len(r["requirements"]) for r in roles.values()], dtype=np.float64),
+            "keyword_sector": keyword_sector,
+            "region_top": region_top,
+            "demand": np.array([[r["sector_scores"][s]["demand"] for s in self.sectors] for r in regions], dtype=np.float64),
+            "supply": np.array([[r["sector_scores"][s]["supply"] for s in self.sectors] for r in regions], dtype=np.float64),
+            "economic_value": np.array(
+                [r["avg_salary_usd"] / (r["cost_of_living_index"] * 500) for r in regions], dtype=np.float64
+            ),
+            "remote_bonus": np.array([1.15 if r["remote_friendly"] else 1.0 for r in regions], dtype=np.float64),
+        }
+
+    @property
+    def width(self) -> int:
+        return len(self.requirement_terms) + len(self.keyword_terms) + len(self.top_skill_terms)
+
+    # ---------- Term resolution ----------
+
+    def _resolve_terms(self, terms: List[str]) -> np.ndarray:
+        """Hit vectors (len(terms), width) for user skill terms, cached per term."""
+        if not terms:
+            return np.zeros((0, self.width), dtype=bool)
+        with self._lock:
+            found: Dict[str, np.ndarray] = {}
+            for term in dict.fromkeys(terms):
+                row = self._term_cache.get(term)
+                if row is not None:
+                    found[term] = row
+                    self._term_cache.move_to_end(term)
+        missing = [t for t in dict.fromkeys(terms) if t not in found]
+        if missing:
+            all_terms = self.requirement_terms + self.keyword_terms + self.top_skill_terms
+            rows = np.array([[term in user_term for term in all_terms] for user_term in missing], dtype=bool)
+            rows = rows.reshape(len(missing), self.width)
+
+            # Semantic mode also accepts requirements that are close in embedding space
+            index = self.semantic_provider() if self.semantic_provider else None
+            named = [i for i, term in enumerate(missing) if term]
+            if index is not None and named and self.requirement_terms:
+                sims = index.similarity([missing[i] for i in named], self.requirement_terms)
+                rows[named, :len(self.requirement_terms)] |= sims >= index.threshold
+
+            # The result is built from `found`, never re-read from the cache, so evicting
+            # terms this call still needs is harmless
+            found.update(zip(missing, rows))
+            with self._lock:
+                for term, row in zip(missing, rows):
+                    self._term_cache[term] = row
+                    self._term_cache.move_to_end(term)
+                while len(self._term_cache) > self.max_cached_terms:
+                    self._term_cache.popitem(last=False)
+
+        return np.stack([found[t] for t in terms])
+
+    def encode(self, skill_lists: Iterable[Iterable[str]]) -> SkillProfiles:
+        """Turn N skill lists into boolean hit matrices."""
+        skill_lists = [list(skills) for skills in skill_lists]
+        flat: List[str] = []
+        offsets: List[int] = []
+        for skills in skill_lists:
+            # Each profile starts with an empty term so its segment is never empty
+            offsets.append(len(flat))
+            flat.append("")
+            flat.extend(s.lower() for s in skills if s)
+
+        if offsets:
+            hits = np.logical_or.reduceat(self._resolve_terms(flat), offsets, axis=0)
+        else:
+            hits = np.zeros((0, self.width), dtype=bool)
+        profiles = self._split(hits)
+        self._match_phrases(profiles, skill_lists)
+        return profiles
+
+    def _match_phrases(self, profiles: SkillProfiles, skill_lists: Iterable[Iterable[str]]):
+        """Add multi-word keyword hits that span two skills of the joined skill string."""
+        if not self.phrase_keywords:
+            return
+        for i, skills in enumerate(skill_lists):
+            joined = " ".join(skills).lower()
+            for k in self.phrase_keywords:
+                if not profiles.keywords[i, k] and self.keyword_terms[k] in joined:
+                    profiles.keywords[i, k] = True
+
+    def _split(self, hits: np.ndarray) -> SkillProfiles:
+        v = len(self.requirement_terms)
+        k = len(self.keyword_terms)
+        return SkillProfiles(hits[:, :v], hits[:, v:v + k], hits[:, v + k:])
+
+    # ---------- Scoring ----------
+
+    def role_scores(self, profiles: SkillProfiles, role_ids: Optional[List[int]] = None) -> np.ndarray:
+        """(N, M) match scores using the shared 30 + raw * 0.7 formula."""
+        matrix, sizes = self.role_matrix, self.role_sizes
+        if role_ids is not None:
+            matrix, sizes = matrix[:, role_ids], sizes[role_ids]
+        matched = profiles.requirements.astype(np.float64) @ matrix
+        return self._role_scores_from_matched(matched, sizes)
+
+    def _role_scores_from_matched(self, matched: np.ndarray, sizes: Optional[np.ndarray] = None) -> np.ndarray:
+        """Match scores from matched-requirement counts; roles without requirements score 0."""
+        sizes = self.role_sizes if sizes is None else sizes
+        raw = np.divide(matched, sizes, out=np.zeros_like(matched), where=sizes > 0) * 100
+        scores = np.where(sizes > 0, 30 + raw * 0.7, 0.0)
+        return np.round(scores, 1)
+
+    def region_scores(self, profiles: SkillProfiles, region_ids: Optional[List[int]] = None) -> Dict[str, np.ndarray]:
+        """Arbitrage scores (N, G) plus the dominant sector and average demand per profile."""
+        ids = slice(None) if region_ids is None else region_ids
+        demand, supply = self.demand[ids], self.supply[ids]
+
+        relevance = profiles.keywords.astype(np.float64) @ self.keyword_sector  # (N, S)
+        total = relevance.sum(axis=1, keepdims=True)
+        has_sector = total[:, 0] > 0
+        weights = np.where(has_sector[:, None], relevance / np.where(total > 0, total, 1), 1.0 / len(self.sectors))
+
+        avg_demand = weights @ demand.T  # (N, G)
+        avg_supply = weights @ supply.T
+        tightness = (avg_demand / avg_supply) ** 1.5
+
+        overlap = profiles.top_skills.astype(np.float64) @ self.region_top[:, ids]
+        scores = tightness * self.economic_value[ids] * (1.0 + overlap * 0.12) * self.remote_bonus[ids]
+
+        dominant = np.where(has_sector, relevance.argmax(axis=1), -1)
+        return {
+            "score": np.round(scores, 2),
+            "avg_demand": np.round(avg_demand, 1),
+            "dominant_sector": [self.sectors[d] if d >= 0 else "General Technology" for d in dominant],
+        }
+
+    # ---------- What-if ----------
+
+    def what_if(self, base_skills: Iterable[str], additions: List[str]) -> Dict:
+        """
+        Score changes from adding hypothetical skills to a base profile.
+
+        The base profile is encoded once; each addition only contributes the
+        requirement/keyword hits it newly covers, so role deltas are a single
+        (H, V) x (V, M) product. Rows are the individual additions followed by
+        one row with all additions combined.
+        """
+        base_skills = list(base_skills)
+        base = self.encode([base_skills])
+        base_hits = np.hstack([base.requirements, base.keywords, base.top_skills])
+        add_hits = self._resolve_terms([a.lower() for a in additions])
+        add_hits = np.vstack([add_hits, add_hits.any(axis=0, keepdims=True)])
+        new_hits = add_hits & ~base_hits
+        new_profiles = self._split(base_hits | add_hits)
+        self._match_phrases(new_profiles, [base_skills + [a] for a in additions] + [base_skills + list(additions)])
+
+        # Roles: incremental update of the matched-requirement counts
+        v = len(self.requirement_terms)
+        base_matched = base.requirements.astype(np.float64) @ self.role_matrix
+        gained = new_hits[:, :v].astype(np.float64) @ self.role_matrix
+        base_roles = self._role_scores_from_matched(base_matched)
+        new_roles = self._role_scores_from_matched(base_matched + gained)
+
+        # Regions: the arbitrage formula is non-linear, so re-evaluate it on the updated hit rows
+        base_regions = self.region_scores(base)["score"]
+        new_regions = self.region_scores(new_profiles)["score"]
+
+        return {
+            "base_role_scores": base_roles[0],
+            "base_region_scores": base_regions[0],
+            "role_deltas": np.round(new_roles - base_roles, 1),
+            "region_deltas": np.round(new_regions - base_regions, 2),
+            "newly_matched": [
+                [self.requirement_terms[j] for j in np.flatnonzero(row[:v])] for row in new_hits
+            ],
+        }
@@ -0,0 +1,177 @@
+"""
+Upload Stream - Single-pass streaming of multipart PDF uploads into the blob store
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from career_common.blob_store import BlobStore, BlobWriter
+
+logger = logging.getLogger(__name__)
+
+
+PDF_MAGIC = b"%PDF"
+# PDF readers accept the header anywhere in the first kilobyte
+MAGIC_WINDOW = 1024
+# Allowance for multipart boundaries, part headers and small form fields
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+def _too_large(max_bytes: int) -> "UploadRejected":
+    return UploadRejected(413, f"File too large (limit {max_bytes / (1024 * 1024):.1f} MB)")
+
+
+class UploadRejected(Exception):
+    """The upload was refused; carries the HTTP status and message for the client."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    filename: str
+    digest: str
+    deduplicated: bool
+    size: int
+
+
+class _PartEvents:
+    """Collects python-multipart callbacks as (kind, value) events for the async loop."""
+
+    def __init__(self):
+        self.events: List[Tuple[str, object]] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+
+    def callbacks(self) -> Dict:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field,
+            "on_header_value": self._header_value,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def _part_begin(self):
+        self._headers = {}
+
+    def _header_field(self, data: bytes, start: int, end: int):
+        self._field += data[start:end]
+
+    def _header_value(self, data: bytes, start: int, end: int):
+        self._value += data[start:end]
+
+    def _header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _headers_finished(self):
+        self.events.append(("headers", self._headers))
+
+    def _part_data(self, data: bytes, start: int, end: int):
+        self.events.append(("data", bytes(data[start:end])))
+
+    def _part_end(self):
+        self.events.append(("end", None))
+
+    def drain(self) -> List[Tuple[str, object]]:
+        events, self.events = self.events, []
+        return events
+
+
+class _FilePart:
+    def __init__(self, filename: str, writer: BlobWriter):
+        self.filename = filename
+        self.writer = writer
+        self.head = b""
+        self.checked = False
+        self.finished = False
+
+
+async def store_pdf_upload(request: Request, store: BlobStore, owner: Optional[str], max_bytes: int,
+                           field: str = "file") -> StoredUpload:
+    """
+    Stream the PDF in multipart field `field` straight from the socket into
+    `store`. One pass over the bytes checks the magic number, enforces
+    `max_bytes`, hashes and writes; disk writes run in the threadpool so the
+    event loop never blocks. Bad uploads are rejected as soon as they are
+    detected, before the rest of the body is read.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadRejected(400, "Expected a multipart/form-data upload")
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + FORM_OVERHEAD_BYTES:
+        raise _too_large(max_bytes)
+
+    collector = _PartEvents()
+    parser = MultipartParser(params[b"boundary"], collector.callbacks())
+    part: Optional[_FilePart] = None
+    in_file_part = False
+    received = 0
+
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes + FORM_OVERHEAD_BYTES:
+                raise _too_large(max_bytes)
+            parser.write(chunk)
+
+            pending = bytearray()
+            for kind, value in collector.drain():
+                if kind == "headers":
+                    _, disposition = parse_options_header(value.get(b"content-disposition", b""))
+                    in_file_part = part is None and disposition.get(b"name", b"").decode() == field
+                    if in_file_part:
+                        filename = disposition.get(b"filename", b"").decode("utf-8", "replace")
+                        if not filename.lower().endswith(".pdf"):
+                            raise UploadRejected(400, "Only PDF files are supported")
+                        part = _FilePart(filename, await run_in_threadpool(store.writer))
+                elif kind == "data" and in_file_part:
+                    pending += value
+                elif kind == "end" and in_file_part:
+                    part.finished = True
+                    in_file_part = False
+
+            if part is None or not pending:
+                continue
+            if not part.checked:
+                part.head += bytes(pending[:MAGIC_WINDOW])
+                if PDF_MAGIC in part.head[:MAGIC_WINDOW]:
+                    part.checked = True
+                elif len(part.head) >= MAGIC_WINDOW or part.finished:
+                    raise UploadRejected(400, "File is not a valid PDF")
+            if part.writer.size + len(pending) > max_bytes:
+                raise _too_large(max_bytes)
+            await run_in_threadpool(part.writer.write, bytes(pending))
+
+        parser.finalize()
+        if part is None or not part.finished:
+            raise UploadRejected(400, "No file uploaded")
+        if not part.checked:
+            raise UploadRejected(400, "File is not a valid PDF")
+        digest, deduplicated = await run_in_threadpool(part.writer.commit, owner)
+    except BaseException as e:
+        if part is not None:
+            await run_in_threadpool(part.writer.abort)
+        if isinstance(e, UploadRejected):
+            logger.warning(f"Upload rejected after {received} bytes: {e.detail}")
+        raise
+
+    return StoredUpload(part.filename, digest, deduplicated, part.writer.size)
@@ -0,0 +1 @@
+# Modules shared by the Career API (career_api) and the Django app (SAHAY_AI)
@@ -0,0 +1,222 @@
+"""
+Blob Store - Content-addressed file storage with references and garbage collection
+"""
+
+import os
+import time
+import hashlib
+import logging
+import tempfile
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+CHUNK_SIZE = 1024 * 1024
+HASH_ALGORITHM = "sha256"
+
+
+def is_digest(value: str) -> bool:
+    return len(value) == 64 and all(c in "0123456789abcdef" for c in value)
+
+
+class BlobWriter:
+    """
+    Streams one upload into the store, hashing it as it is written. Call
+    ``write`` for each chunk, then ``commit`` (or ``abort`` on error).
+    """
+
+    def __init__(self, store: "BlobStore"):
+        self.store = store
+        self.hasher = hashlib.new(HASH_ALGORITHM)
+        self.size = 0
+        fd, self.tmp_path = tempfile.mkstemp(dir=store.tmp_dir, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        self.hasher.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def abort(self):
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def commit(self, owner: Optional[str] = None) -> Tuple[str, bool]:
+        """Publish the blob. Returns (digest, deduplicated)."""
+        self._file.close()
+        digest = self.hasher.hexdigest()
+        path = self.store.path(digest)
+        try:
+            # Same content already stored: refresh the existing blob, drop the copy
+            os.utime(path, None)
+            os.remove(self.tmp_path)
+            deduplicated = True
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self.tmp_path, path)
+            deduplicated = False
+        if owner:
+            self.store.add_reference(digest, owner)
+        return digest, deduplicated
+
+
+class BlobStore:
+    """
+    Files stored once per distinct content under ``blobs/<aa>/<sha256><suffix>``.
+
+    Each upload also records a zero-byte reference file
+    ``refs/<sha256>/<owner>`` (a session token, say), so uploading the same
+    file again costs only that marker. ``collect_garbage`` deletes blobs
+    that no live owner or caller-supplied digest still needs, once they
+    have gone untouched for the retention window.
+    """
+
+    def __init__(self, root: str, suffix: str = ""):
+        self.root = root
+        self.suffix = suffix
+        self.blob_dir = os.path.join(root, "blobs")
+        self.ref_dir = os.path.join(root, "refs")
+        self.tmp_dir = os.path.join(root, "tmp")
+        for path in (self.blob_dir, self.ref_dir, self.tmp_dir):
+            os.makedirs(path, exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest + self.suffix)
+
+    def digest_for_path(self, path: str) -> Optional[str]:
+        """The digest of a path inside this store, or None for any other file."""
+        name = os.path.basename(path)
+        if self.suffix and name.endswith(self.suffix):
+            name = name[:-len(self.suffix)]
+        if is_digest(name) and os.path.abspath(path) == os.path.abspath(self.path(name)):
+            return name
+        return None
+
+    def exists(self, digest: str) -> bool:
+        return is_digest(digest) and os.path.exists(self.path(digest))
+
+    def writer(self) -> BlobWriter:
+        return BlobWriter(self)
+
+    def put(self, stream: BinaryIO, owner: Optional[str] = None) -> Tuple[str, bool]:
+        """Copy a file object into the store. Returns (digest, deduplicated)."""
+        writer = self.writer()
+        try:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.commit(owner)
+
+    def add_reference(self, digest: str, owner: str):
+        ref_dir = os.path.join(self.ref_dir, digest)
+        os.makedirs(ref_dir, exist_ok=True)
+        ref_path = os.path.join(ref_dir, owner)
+        with open(ref_path, "a"):
+            os.utime(ref_path, None)
+
+    def owners(self, digest: str) -> List[str]:
+        try:
+            return os.listdir(os.path.join(self.ref_dir, digest))
+        except FileNotFoundError:
+            return []
+
+    def iter_blobs(self) -> Iterator[Tuple[str, os.stat_result]]:
+        for shard in os.listdir(self.blob_dir):
+            shard_dir = os.path.join(self.blob_dir, shard)
+            for name in os.listdir(shard_dir):
+                digest = name[:-len(self.suffix)] if self.suffix else name
+                if is_digest(digest):
+                    yield digest, os.stat(os.path.join(shard_dir, name))
+
+    def _remove_if_unchanged(self, digest: str, st: os.stat_result) -> bool:
+        """
+        Delete a blob judged unreferenced from the `st` snapshot, unless an
+        upload of the same content touched it or referenced it since.
+        """
+        path = self.path(digest)
+        ref_dir = os.path.join(self.ref_dir, digest)
+        try:
+            if os.stat(path).st_mtime_ns != st.st_mtime_ns or self.owners(digest):
+                return False
+        except FileNotFoundError:
+            return False
+        # Move it aside first: an upload committing from here on finds no blob and stores a fresh
+        # copy, and one that refreshed it just before the move shows up in the tombstone's mtime
+        tombstone = os.path.join(self.tmp_dir, f"{digest}.gc")
+        try:
+            os.rename(path, tombstone)
+        except FileNotFoundError:
+            return False
+        if os.stat(tombstone).st_mtime_ns != st.st_mtime_ns or self.owners(digest):
+            if not os.path.exists(path):
+                os.rename(tombstone, path)
+            else:
+                os.remove(tombstone)  # a new upload already stored the same content again
+            return False
+        os.remove(tombstone)
+        try:
+            os.rmdir(ref_dir)
+        except OSError:
+            pass  # gone already, or a reference arrived meanwhile (the upload re-stored the blob)
+        return True
+
+    def collect_garbage(self, owner_alive: Callable[[str, str], bool], pinned: Iterable[str] = (),
+                        retention_seconds: float = 7 * 86400) -> Dict[str, int]:
+        """
+        Delete unreferenced blobs.
+
+        ``owner_alive(digest, owner)`` says whether a reference still holds the
+        blob (e.g. the owner's session still points at it); dead references
+        are removed. Digests in ``pinned`` (e.g. from queued jobs) are always
+        kept, as is anything touched within ``retention_seconds``.
+        """
+        pinned = set(pinned)
+        cutoff = time.time() - retention_seconds
+        stats = {"blobs": 0, "deleted": 0, "freed_bytes": 0, "dropped_references": 0}
+
+        for digest, st in list(self.iter_blobs()):
+            stats["blobs"] += 1
+            live = digest in pinned
+            owners = self.owners(digest)
+            for owner in owners:
+                ref_path = os.path.join(self.ref_dir, digest, owner)
+                if owner_alive(digest, owner):
+                    live = True
+                else:
+                    try:
+                        if os.stat(ref_path).st_mtime < cutoff:
+                            os.remove(ref_path)
+                            stats["dropped_references"] += 1
+                        else:
+                            live = True
+                    except FileNotFoundError:
+                        pass
+            if live or st.st_mtime >= cutoff:
+                continue
+            if not self._remove_if_unchanged(digest, st):
+                continue
+            try:
+                os.rmdir(os.path.dirname(self.path(digest)))
+            except OSError:
+                pass  # shard still holds other blobs
+            stats["deleted"] += 1
+            stats["freed_bytes"] += st.st_size
+
+        # Partial writes left behind by crashed uploads
+        for name in os.listdir(self.tmp_dir):
+            tmp_path = os.path.join(self.tmp_dir, name)
+            try:
+                if os.stat(tmp_path).st_mtime < cutoff:
+                    os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+
+        logger.info(f"Blob GC: {stats}")
+        return stats
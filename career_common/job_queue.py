@@ -0,0 +1,290 @@
+"""
+Job Queue - Persistent SQLite job queue with a background worker pool
+"""
+
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Callable, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    owner TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    stage TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority DESC, created_at);
+"""
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+class JobContext:
+    """Handed to a job handler: the job's payload plus progress reporting."""
+
+    def __init__(self, queue: "JobQueue", job_id: str, payload: Dict, attempt: int):
+        self.queue = queue
+        self.job_id = job_id
+        self.payload = payload
+        self.attempt = attempt
+
+    def report(self, stage: str, progress: float):
+        """Record the current stage and progress (0-1); also renews the job's lease."""
+        self.queue._update(self.job_id, stage=stage, progress=progress,
+                           lease_until=time.time() + self.queue.lease_seconds)
+
+    @contextmanager
+    def heartbeat(self, interval: Optional[float] = None):
+        """Keep renewing the lease while a long step that cannot report progress runs."""
+        interval = interval or self.queue.lease_seconds / 3
+        done = threading.Event()
+
+        def beat():
+            try:
+                while not done.wait(interval):
+                    try:
+                        self.queue._update(self.job_id, lease_until=time.time() + self.queue.lease_seconds)
+                    except sqlite3.Error as e:
+                        logger.warning(f"Could not renew lease of job {self.job_id}: {e}")
+            finally:
+                self.queue.close()
+
+        thread = threading.Thread(target=beat, name=f"job-heartbeat-{self.job_id[:8]}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict:
+    return {
+        "job_id": row["id"],
+        "kind": row["kind"],
+        "status": row["status"],
+        "stage": row["stage"],
+        "progress": row["progress"],
+        "priority": row["priority"],
+        "attempts": row["attempts"],
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+    }
+
+
+class JobQueue:
+    """
+    Jobs are rows in a SQLite database, so they survive restarts and can be
+    shared by several worker processes. Each process runs a small pool of
+    threads that claim the highest-priority queued job, run its registered
+    handler and store the result.
+
+    A running job holds a lease that is renewed whenever it reports progress
+    (or continuously inside ``JobContext.heartbeat``). If its process dies, the lease expires and another worker picks the job
+    up again, up to ``max_attempts`` times.
+    """
+
+    def __init__(self, db_path: str, workers: int = 2, lease_seconds: float = 300,
+                 max_attempts: int = 3, poll_interval: float = 1.0, retention_seconds: float = 7 * 86400):
+        self.db_path = db_path
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self._handlers: Dict[str, Callable[[JobContext], Any]] = {}
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close this thread's connection; it reopens on next use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ---------- Producer side ----------
+
+    def register(self, kind: str, handler: Callable[[JobContext], Any]):
+        """Handle jobs of `kind`; the handler's return value becomes the job result."""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload: Dict, priority: int = 0, owner: Optional[str] = None,
+               job_id: Optional[str] = None) -> str:
+        """
+        Queue a job and return its id. Higher priority runs first. Pass a
+        `job_id` from new_job_id() when the id must be recorded elsewhere
+        before a worker can pick the job up.
+        """
+        job_id = job_id or new_job_id()
+        self._conn().execute(
+            "INSERT INTO jobs (id, kind, payload, owner, priority, status, stage, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), owner, priority, QUEUED, QUEUED, time.time()),
+        )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str, owner: Optional[str] = None) -> Optional[Dict]:
+        """Job status, or None if it does not exist (or belongs to another owner)."""
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or (owner is not None and row["owner"] != owner):
+            return None
+        job = _row_to_job(row)
+        if job["status"] == QUEUED:
+            job["queue_position"] = self._conn().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND (priority > ? OR (priority = ? AND created_at < ?))",
+                (QUEUED, row["priority"], row["priority"], row["created_at"]),
+            ).fetchone()[0]
+        return job
+
+    def active_payloads(self, kind: Optional[str] = None) -> List[Dict]:
+        """Payloads of jobs that are still queued or running."""
+        query = "SELECT payload FROM jobs WHERE status IN (?, ?)"
+        params = [QUEUED, RUNNING]
+        if kind is not None:
+            query += " AND kind = ?"
+            params.append(kind)
+        return [json.loads(row[0]) for row in self._conn().execute(query, params).fetchall()]
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    # ---------- Worker side ----------
+
+    def _update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._conn().execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Atomically take the next queued job, or one whose worker's lease expired."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? OR (status = ? AND lease_until < ?) "
+                "ORDER BY priority DESC, created_at LIMIT 1",
+                (QUEUED, RUNNING, now),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, attempts = attempts + 1, started_at = ?, lease_until = ? "
+                    "WHERE id = ?",
+                    (RUNNING, "starting", now, now + self.lease_seconds, row["id"]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def _run(self, row: sqlite3.Row):
+        job_id, attempt = row["id"], row["attempts"] + 1
+        handler = self._handlers.get(row["kind"])
+        if handler is None:
+            self._update(job_id, status=FAILED, error=f"No handler for job kind '{row['kind']}'", finished_at=time.time())
+            return
+        if attempt > self.max_attempts:
+            self._update(job_id, status=FAILED, error="Worker stopped repeatedly while running this job",
+                         finished_at=time.time())
+            return
+
+        start = time.time()
+        try:
+            result = handler(JobContext(self, job_id, json.loads(row["payload"]), attempt))
+        except Exception as e:
+            logger.error(f"Job {job_id} ({row['kind']}) failed: {e}")
+            self._update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+            return
+        self._update(job_id, status=SUCCEEDED, stage="done", progress=1.0, result=json.dumps(result),
+                     finished_at=time.time())
+        logger.info(f"Job {job_id} ({row['kind']}) finished in {time.time() - start:.2f}s")
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                row = self._claim()
+            except sqlite3.Error as e:
+                logger.error(f"Job queue claim failed: {e}")
+                row = None
+            if row is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run(row)
+
+    def purge_finished(self) -> int:
+        """Delete finished jobs older than the retention period."""
+        cutoff = time.time() - self.retention_seconds
+        return self._conn().execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (SUCCEEDED, FAILED, cutoff)
+        ).rowcount
+
+    def start(self):
+        """Start the worker threads (idempotent). Jobs left over from a previous run are resumed."""
+        with self._start_lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            purged = self.purge_finished()
+            if purged:
+                logger.info(f"Purged {purged} finished jobs")
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            logger.info(f"Job queue started with {self.workers} workers ({self.counts()})")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop claiming new jobs and wait briefly for running ones."""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
@@ -128,8 +128,65 @@ export async function checkCareerApiHealth(): Promise<HealthCheck | null> {
     }
 }
 
-// Upload and parse resume
-export async function uploadResume(file: File): Promise<ResumeUploadResponse> {
+export interface ResumeUploadJob {
+    success: boolean;
+    message: string;
+    filename: string;
+    job_id: string;
+    status: string;
+    status_url: string;
+}
+
+export interface JobStatus<T> {
+    job_id: string;
+    kind: string;
+    status: 'queued' | 'running' | 'succeeded' | 'failed';
+    stage: string | null;
+    progress: number;
+    queue_position?: number;
+    result: T | null;
+    error: string | null;
+}
+
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+// Get the status of a background job
+export async function getJobStatus<T>(jobId: string): Promise<JobStatus<T>> {
+    const response = await fetch(`${CAREER_API_URL}/jobs/${jobId}`);
+
+    if (!response.ok) {
+        throw new Error('Failed to fetch job status');
+    }
+
+    return await response.json();
+}
+
+// Poll a background job until it finishes and return its result
+export async function waitForJob<T>(
+    jobId: string,
+    onProgress?: (status: JobStatus<T>) => void
+): Promise<T> {
+    const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+        const status = await getJobStatus<T>(jobId);
+        onProgress?.(status);
+        if (status.status === 'succeeded' && status.result) {
+            return status.result;
+        }
+        if (status.status === 'failed') {
+            throw new Error(status.error || 'Resume processing failed');
+        }
+        await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+    throw new Error('Resume processing is taking longer than expected. Please try again later.');
+}
+
+// Upload a resume and wait for the background parse to finish
+export async function uploadResume(
+    file: File,
+    onProgress?: (status: JobStatus<ResumeUploadResponse>) => void
+): Promise<ResumeUploadResponse> {
     const formData = new FormData();
     formData.append('file', file);
 
@@ -149,7 +206,8 @@ export async function uploadResume(file: File): Promise<ResumeUploadResponse> {
         throw new Error(errorDetail);
     }
 
-    return await response.json();
+    const job: ResumeUploadJob = await response.json();
+    return await waitForJob<ResumeUploadResponse>(job.job_id, onProgress);
 }
 
 // Extract and parse from LinkedIn URL